@@ -17,9 +17,6 @@ import dj_database_url
 from corsheaders.middleware import CorsMiddleware
 from dotenv import load_dotenv
 
-import firebase_admin
-from firebase_admin import credentials
-
 load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -88,7 +85,39 @@ WSGI_APPLICATION = "content_chronicle.wsgi.application"
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-DATABASES = {"default": dj_database_url.parse(DATABASE_URL)}
+# Connections close at the end of each request by default. WSGI deployments
+# can set DB_CONN_MAX_AGE (e.g. 60) to keep them for that many seconds,
+# checked before reuse; leave it at 0 under ASGI, where persistent
+# connections leak across event-loop threads. With DB_POOL=True (Postgres
+# only) each process instead keeps a psycopg pool, which Django requires
+# CONN_MAX_AGE=0 for. Size the pool for a web worker's threads, or for the
+# scheduler's dispatch workers plus its timer.
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "0"))
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True"
+DB_POOL = os.getenv("DB_POOL", "False") == "True"
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+
+DATABASES = {
+    "default": dj_database_url.parse(
+        DATABASE_URL,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
+}
+if DB_POOL and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    # CONN_HEALTH_CHECKS makes Django check pooled connections on checkout.
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": DB_POOL_MIN_SIZE,
+        "max_size": DB_POOL_MAX_SIZE,
+        "timeout": DB_POOL_TIMEOUT,
+        "max_idle": DB_POOL_MAX_IDLE,
+        "max_lifetime": DB_POOL_MAX_LIFETIME,
+    }
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -134,10 +163,29 @@ REST_FRAMEWORK = {
     # or allow read-only access for unauthenticated users.
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "main.authentication.CachedTokenAuthentication",
     ],
 }
 
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+if os.getenv("REDIS_URL"):
+    # Shared between processes; needs the redis package.
+    CACHES["shared"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+    }
+
+# Token authentication cache. The shared tier is used when it names a cache
+# alias; the local TTL bounds how stale another process's copy can be.
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+AUTH_TOKEN_LOCAL_TTL = float(os.getenv("AUTH_TOKEN_LOCAL_TTL", "30"))
+AUTH_TOKEN_SHARED_TTL = float(os.getenv("AUTH_TOKEN_SHARED_TTL", "300"))
+AUTH_TOKEN_SHARED_CACHE = os.getenv(
+    "AUTH_TOKEN_SHARED_CACHE", "shared" if "shared" in CACHES else ""
+)
+
 MEDIA_ROOT = "media"
 STATIC_ROOT = "staticfiles"
 MEDIA_URL = "/media/"
@@ -145,14 +193,36 @@ MEDIA_URL = "/media/"
 if DEBUG:
     CORS_ALLOW_ALL_ORIGINS = True
     ALLOWED_HOSTS = ["*"]
-    STORAGES = {
-        "default": {
-            "BACKEND": "django.core.files.storage.FileSystemStorage",
-        },
-        "staticfiles": {
-            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
-        },
-    }
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    # Post images, videos and image variants, named by the SHA-256 of their bytes
+    "media": {
+        "BACKEND": "main.media_storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+# Unreferenced media is only deleted after this many seconds, so a concurrent
+# upload of the same bytes can still claim it.
+MEDIA_GC_GRACE = float(os.getenv("MEDIA_GC_GRACE", "3600"))
+
+# Media is served by main.views.MediaView to workspace members only. Media
+# URLs are plain, stable content-addressed paths; browsers authenticate
+# <img src> requests with the MEDIA_AUTH_COOKIE that login sets (scoped to
+# MEDIA_URL), other clients with the usual Authorization header.
+MEDIA_AUTH_COOKIE = os.getenv("MEDIA_AUTH_COOKIE", "media_token")
+
+# "django" streams files from Python; "x-accel" (nginx) and "x-sendfile"
+# (Apache/lighttpd) leave the body to the web server. For x-accel, map
+# MEDIA_ACCEL_PREFIX to MEDIA_ROOT in an `internal` nginx location.
+MEDIA_SERVE_MODE = os.getenv("MEDIA_SERVE_MODE", "django")
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "/protected-media/")
+MEDIA_ACCESS_CACHE_SIZE = int(os.getenv("MEDIA_ACCESS_CACHE_SIZE", "10000"))
+MEDIA_ACCESS_CACHE_TTL = float(os.getenv("MEDIA_ACCESS_CACHE_TTL", "60"))
 
 AUTH_USER_MODEL = "main.User"
 
@@ -179,6 +249,85 @@ AUTH_USER_MODEL = "main.User"
 # }
 
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
-
-cred = credentials.Certificate('firebase-service-account.json')
-firebase_admin.initialize_app(cred)
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+FIREBASE_CREDENTIALS = os.getenv(
+    "FIREBASE_CREDENTIALS", "firebase-service-account.json"
+)
+
+# Reminder dispatch
+REMINDER_DISPATCH_CHUNK_SIZE = int(os.getenv("REMINDER_DISPATCH_CHUNK_SIZE", "500"))
+REMINDER_DISPATCH_WORKERS = int(os.getenv("REMINDER_DISPATCH_WORKERS", "4"))
+NOTIFICATION_TRANSPORT = os.getenv(
+    "NOTIFICATION_TRANSPORT", "main.notification_transport.FirebaseTransport"
+)
+FAKE_NOTIFICATION_LATENCY = float(os.getenv("FAKE_NOTIFICATION_LATENCY", "0.05"))
+# Deadlines held in memory by the reminder timer, and how often (seconds) that
+# window is re-read; LISTEN/NOTIFY keeps it current in between on Postgres.
+REMINDER_TIMER_HORIZON = float(os.getenv("REMINDER_TIMER_HORIZON", "600"))
+REMINDER_TIMER_RELOAD_INTERVAL = float(
+    os.getenv("REMINDER_TIMER_RELOAD_INTERVAL", "60")
+)
+
+# Outbound HTTP (image downloads etc.)
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+
+# Demo post generator
+FAKE_POSTS_MAX_COUNT = int(os.getenv("FAKE_POSTS_MAX_COUNT", "10000"))
+
+# AI image generation
+IMAGE_PROVIDER = os.getenv("IMAGE_PROVIDER", "main.image_generation.OpenAIImageProvider")
+IMAGE_GENERATION_CONCURRENCY = int(os.getenv("IMAGE_GENERATION_CONCURRENCY", "4"))
+# Images still pending or running this many seconds after they were queued
+# or started were lost with their process; idle generation workers
+# (start_generation_workers) render them again.
+IMAGE_GENERATION_STALE_AFTER = float(
+    os.getenv("IMAGE_GENERATION_STALE_AFTER", "600")
+)
+
+# Generated images reused for the same normalized prompt, model and size.
+# Entries expire after IMAGE_CACHE_MAX_AGE seconds; beyond IMAGE_CACHE_MAX_BYTES
+# the least recently used are evicted.
+IMAGE_CACHE_ENABLED = os.getenv("IMAGE_CACHE_ENABLED", "True") == "True"
+IMAGE_CACHE_MAX_AGE = float(os.getenv("IMAGE_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(1024**3)))
+
+# Thumbnail/medium/WebP copies of post images, encoded in a process pool
+IMAGE_VARIANT_PROCESSES = int(os.getenv("IMAGE_VARIANT_PROCESSES", "2"))
+# Posts left without variants this many seconds after their last save lost
+# their build with the web process; idle generation workers build them, and
+# retry failed ones at most this often.
+IMAGE_VARIANT_STALE_AFTER = float(os.getenv("IMAGE_VARIANT_STALE_AFTER", "600"))
+
+# AI post generation jobs
+GENERATION_BACKEND = os.getenv(
+    "GENERATION_BACKEND", "main.generation_backends.GeminiBackend"
+)
+GENERATION_MODEL_CACHE_SIZE = int(os.getenv("GENERATION_MODEL_CACHE_SIZE", "128"))
+GENERATION_HISTORY_WINDOW = int(os.getenv("GENERATION_HISTORY_WINDOW", "4"))
+GENERATION_HISTORY_SUMMARY_CHARS = int(
+    os.getenv("GENERATION_HISTORY_SUMMARY_CHARS", "4000")
+)
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "4"))
+# Seconds each FakeBackend call takes, to load test without calling Gemini.
+FAKE_GENERATION_LATENCY = float(os.getenv("FAKE_GENERATION_LATENCY", "0"))
+GENERATION_JOB_POLL_INTERVAL = float(os.getenv("GENERATION_JOB_POLL_INTERVAL", "1"))
+GENERATION_JOB_STREAM_TIMEOUT = float(
+    os.getenv("GENERATION_JOB_STREAM_TIMEOUT", "300")
+)
+# A job still running this many seconds after it was claimed is assumed lost
+# with its worker and requeued, until it has been claimed
+# GENERATION_JOB_MAX_ATTEMPTS times. Keep it above the slowest model call.
+GENERATION_JOB_STALE_AFTER = float(os.getenv("GENERATION_JOB_STALE_AFTER", "900"))
+GENERATION_JOB_MAX_ATTEMPTS = int(os.getenv("GENERATION_JOB_MAX_ATTEMPTS", "3"))
+# Exact-match cache of Gemini responses, keyed on model, system instruction,
+# replayed history and prompt. A size of 0 disables the local tier.
+LLM_RESPONSE_CACHE_SIZE = int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "512"))
+LLM_RESPONSE_CACHE_TTL = float(os.getenv("LLM_RESPONSE_CACHE_TTL", "600"))
+LLM_RESPONSE_CACHE_SHARED = os.getenv(
+    "LLM_RESPONSE_CACHE_SHARED", "shared" if "shared" in CACHES else ""
+)
@@ -15,17 +15,19 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from main.views import MediaView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("main.urls")),
+    # media files, checked against workspace membership
+    path(
+        f"{settings.MEDIA_URL.strip('/')}/<path:name>",
+        MediaView.as_view(),
+        name="media",
+    ),
 ]
-
-
-# media files
-from django.conf import settings
-from django.conf.urls.static import static
-
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "main"
+
+    def ready(self):
+        # Connects the token cache invalidation and media reference count
+        # signals in every process, not just the ones that have served a request.
+        from main import authentication, media_refs  # noqa: F401
@@ -0,0 +1,109 @@
+import copy
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from main.lru_cache import LRUCache
+from main.models import User
+
+# Process-local tier. Its TTL bounds how long another process can keep
+# accepting a token after logout when there is no shared tier to clear.
+token_cache = LRUCache(
+    settings.AUTH_TOKEN_CACHE_SIZE, ttl=settings.AUTH_TOKEN_LOCAL_TTL
+)
+
+
+def shared_cache():
+    alias = settings.AUTH_TOKEN_SHARED_CACHE
+    return caches[alias] if alias else None
+
+
+def shared_key(key: str) -> str:
+    return f"auth-token:{key}"
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that looks tokens up in a local LRU, then in the
+    optional shared cache, and only queries the database on a miss. Each
+    request gets its own copy of the cached token and user, since views
+    modify ``request.user`` in place.
+    """
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            cache = shared_cache()
+            token = cache.get(shared_key(key)) if cache is not None else None
+            if token is None:
+                _, token = super().authenticate_credentials(key)
+                if cache is not None:
+                    cache.set(
+                        shared_key(key), token, settings.AUTH_TOKEN_SHARED_TTL
+                    )
+            token_cache.set(key, token)
+        token = copy.deepcopy(token)
+        return token.user, token
+
+
+class MediaCookieAuthentication(CachedTokenAuthentication):
+    """
+    Reads the token from the MEDIA_AUTH_COOKIE, which browsers send with
+    <img src> and <video src> requests that cannot carry an Authorization
+    header. Only used by main.views.MediaView, which is read-only.
+    """
+
+    def authenticate(self, request):
+        key = request.COOKIES.get(settings.MEDIA_AUTH_COOKIE)
+        if not key:
+            return None
+        return self.authenticate_credentials(key)
+
+
+def set_media_cookie(response, key: str):
+    response.set_cookie(
+        settings.MEDIA_AUTH_COOKIE,
+        key,
+        path=settings.MEDIA_URL,
+        secure=not settings.DEBUG,
+        httponly=True,
+        samesite="Lax",
+    )
+    return response
+
+
+def delete_media_cookie(response):
+    response.delete_cookie(
+        settings.MEDIA_AUTH_COOKIE, path=settings.MEDIA_URL, samesite="Lax"
+    )
+    return response
+
+
+def invalidate_tokens(keys):
+    keys = list(keys)
+    for key in keys:
+        token_cache.pop(key)
+    cache = shared_cache()
+    if cache is not None and keys:
+        cache.delete_many([shared_key(key) for key in keys])
+
+
+def _user_saved(sender, instance: User, created, **kwargs):
+    # Covers profile updates, password changes and deactivation.
+    if not created:
+        invalidate_tokens(
+            Token.objects.filter(user_id=instance.id).values_list("key", flat=True)
+        )
+
+
+def _token_deleted(sender, instance: Token, **kwargs):
+    invalidate_tokens([instance.key])
+
+
+post_save.connect(_user_saved, sender=User, dispatch_uid="auth_token_user_saved")
+post_delete.connect(
+    _token_deleted, sender=Token, dispatch_uid="auth_token_token_deleted"
+)
@@ -0,0 +1,93 @@
+import asyncio
+import functools
+import threading
+import weakref
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+_missing = object()
+
+
+def lazy_client(factory):
+    """
+    Builds the value on the first call and returns the same one afterwards.
+    SDK clients are created this way so commands and workers that never use
+    an SDK neither import it nor need its credentials.
+    """
+    lock = threading.Lock()
+    value = _missing
+
+    @functools.wraps(factory)
+    def get():
+        nonlocal value
+        if value is _missing:
+            with lock:
+                if value is _missing:
+                    value = factory()
+        return value
+
+    def reset():
+        nonlocal value
+        value = _missing
+
+    get.reset = reset
+    return get
+
+
+@lazy_client
+def get_firebase_app():
+    import firebase_admin
+    from firebase_admin import credentials
+
+    try:
+        return firebase_admin.get_app()
+    except ValueError:
+        pass
+    return firebase_admin.initialize_app(
+        credentials.Certificate(settings.FIREBASE_CREDENTIALS)
+    )
+
+
+@lazy_client
+def get_gemini():
+    """The ``google.generativeai`` module, configured with the API key."""
+    import google.generativeai as genai
+
+    if not settings.GEMINI_API_KEY:
+        raise ImproperlyConfigured("GEMINI_API_KEY is not set.")
+    genai.configure(api_key=settings.GEMINI_API_KEY)
+    return genai
+
+
+@lazy_client
+def get_openai_client():
+    import openai
+
+    return openai.Client(api_key=settings.OPENAI_KEY)
+
+
+def per_event_loop(factory):
+    """
+    Like ``lazy_client`` but keeps one value per running event loop. Async
+    SDK clients hold connection pools bound to the loop that created them,
+    and under WSGI each async view runs on a loop of its own.
+    """
+    clients = weakref.WeakKeyDictionary()
+
+    @functools.wraps(factory)
+    def get():
+        loop = asyncio.get_running_loop()
+        client = clients.get(loop)
+        if client is None:
+            client = clients[loop] = factory()
+        return client
+
+    return get
+
+
+@per_event_loop
+def get_async_openai_client():
+    import openai
+
+    return openai.AsyncOpenAI(api_key=settings.OPENAI_KEY)
@@ -0,0 +1,34 @@
+import logging
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+def get_pool():
+    # Only the Postgres backend has a pool, and only with OPTIONS["pool"].
+    return getattr(connection, "pool", None)
+
+
+def get_database_stats() -> dict:
+    settings_dict = connection.settings_dict
+    pool = get_pool()
+    return {
+        "vendor": connection.vendor,
+        "conn_max_age": settings_dict["CONN_MAX_AGE"],
+        "conn_health_checks": settings_dict["CONN_HEALTH_CHECKS"],
+        "pool": pool.get_stats() if pool is not None else None,
+    }
+
+
+def check_pool_size(threads: int, process: str):
+    """Warns when ``threads`` could hold more connections than the pool has."""
+    pool = get_pool()
+    if pool is not None and threads > pool.max_size:
+        logger.warning(
+            "%s runs %d threads using the database but DB_POOL_MAX_SIZE is %d; "
+            "threads will wait up to DB_POOL_TIMEOUT for a connection.",
+            process,
+            threads,
+            pool.max_size,
+        )
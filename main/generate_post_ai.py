@@ -1,121 +1,120 @@
 import json
-import os
 
-import openai
-import requests
-from django.core.files.base import ContentFile
-from google.ai.generativelanguage_v1beta.types import content
-import google.generativeai as genai
+from asgiref.sync import sync_to_async
 
-from content_chronicle.settings import OPENAI_KEY
+from main.clients import get_gemini, lazy_client
+from main.llm_cache import response_cache, response_key
 from main.models import Workspace, User, PostGenerationSession, Post
-
-genai.configure(api_key=os.environ["GEMINI_API_KEY"])
-
-# Create the model
-generation_config = {
-    "temperature": 1,
-    "top_p": 0.95,
-    "top_k": 64,
-    "max_output_tokens": 8192,
-    "response_schema": content.Schema(
-        type=content.Type.OBJECT,
-        enum=[],
-        required=["response"],
-        properties={
-            "response": content.Schema(
-                type=content.Type.ARRAY,
-                items=content.Schema(
-                    type=content.Type.OBJECT,
-                    enum=[],
-                    required=[
-                        "descr",
-                        "cap",
-                        "post_time",
-                        "img_prompt",
-                        "vid_prompt",
-                        "assignee_id",
-                    ],
-                    properties={
-                        "descr": content.Schema(
-                            type=content.Type.STRING,
-                        ),
-                        "cap": content.Schema(
-                            type=content.Type.STRING,
-                        ),
-                        "post_time": content.Schema(
-                            type=content.Type.STRING,
-                        ),
-                        "img_prompt": content.Schema(
-                            type=content.Type.STRING,
-                        ),
-                        "vid_prompt": content.Schema(
-                            type=content.Type.STRING,
-                        ),
-                        "assignee_id": content.Schema(
-                            type=content.Type.STRING,
-                        ),
-                    },
+from main.session_history import build_chat_history
+from main.workspace_roster import (
+    get_roster,
+    model_cache,
+    roster_key,
+    system_instruction_cache,
+)
+
+
+# The response schema is built on first use; constructing it needs the
+# Gemini SDK's protobuf types, which are slow to import.
+@lazy_client
+def get_generation_config() -> dict:
+    from google.ai.generativelanguage_v1beta.types import content
+
+    return {
+        "temperature": 1,
+        "top_p": 0.95,
+        "top_k": 64,
+        "max_output_tokens": 8192,
+        "response_schema": content.Schema(
+            type=content.Type.OBJECT,
+            enum=[],
+            required=["response"],
+            properties={
+                "response": content.Schema(
+                    type=content.Type.ARRAY,
+                    items=content.Schema(
+                        type=content.Type.OBJECT,
+                        enum=[],
+                        required=[
+                            "descr",
+                            "cap",
+                            "post_time",
+                            "img_prompt",
+                            "vid_prompt",
+                            "assignee_id",
+                        ],
+                        properties={
+                            "descr": content.Schema(
+                                type=content.Type.STRING,
+                            ),
+                            "cap": content.Schema(
+                                type=content.Type.STRING,
+                            ),
+                            "post_time": content.Schema(
+                                type=content.Type.STRING,
+                            ),
+                            "img_prompt": content.Schema(
+                                type=content.Type.STRING,
+                            ),
+                            "vid_prompt": content.Schema(
+                                type=content.Type.STRING,
+                            ),
+                            "assignee_id": content.Schema(
+                                type=content.Type.STRING,
+                            ),
+                        },
+                    ),
                 ),
-            ),
-        },
-    ),
-    "response_mime_type": "application/json",
-}
+            },
+        ),
+        "response_mime_type": "application/json",
+    }
 
 
-def generate_posts_ai(
-    workspace: Workspace,
-    user: User,
-    session: PostGenerationSession | None = None,
-    custom_instructions: str | None = None,
-    range_start: str | None = None,
-    range_end: str | None = None,
-):
-    user_roles = workspace.members.all().values("id", "email", "role")
+MODEL_NAME = "gemini-1.5-flash"
 
-    system_instruction = (
-        "generate the content for professional social media marketing\n"
-        f"users: {list(user_roles)}\n"
-        f"select assignee for each post based on their roles.\n"
-        f"generate multiple posts if there are multiple events, generate at least 3 posts."
-    )
-    model = genai.GenerativeModel(
-        model_name="gemini-1.5-flash",
-        generation_config=generation_config,
-        system_instruction=system_instruction,
+
+def get_system_instruction(workspace: Workspace, kind: str = "generate") -> str:
+    def build():
+        user_roles = get_roster(workspace)
+        system_instruction = (
+            "generate the content for professional social media marketing\n"
+            f"users: {user_roles}\n"
+            f"select assignee for each post based on their roles.\n"
+        )
+        if kind == "generate":
+            system_instruction += "generate multiple posts if there are multiple events, generate at least 3 posts."
+        else:
+            system_instruction += "generate a single post in replacement of the given post."
+        return system_instruction
+
+    return system_instruction_cache.get_or_set(roster_key(workspace, kind), build)
+
+
+def get_model(workspace: Workspace, kind: str = "generate"):
+    return model_cache.get_or_set(
+        roster_key(workspace, kind),
+        lambda: get_gemini().GenerativeModel(
+            model_name=MODEL_NAME,
+            generation_config=get_generation_config(),
+            system_instruction=get_system_instruction(workspace, kind),
+        ),
     )
 
-    history = []
-    if session is not None:
-        session_history = session.history.all().values("prompt", "response")
-        history = [
-            [
-                {"role": "user", "parts": [x["prompt"]]},
-                {"role": "model", "parts": [x["response"]]},
-            ]
-            for x in session_history
-        ]
-        history = [item for sublist in history for item in sublist]
-    chat_session = model.start_chat(history=history)
 
+def build_generation_prompt(
+    custom_instructions: str | None, range_start: str | None, range_end: str | None
+) -> str:
     prompt = ""
     if custom_instructions:
         prompt += custom_instructions + "\n"
     prompt += (
         f"Generate social media content for date between {range_start} and {range_end}"
     )
-    response = chat_session.send_message(prompt)
-    return json.loads(response.text), prompt
+    return prompt
 
 
-def regenerate_posts_ai(
-    workspace: Workspace,
-    prompt: str,
-    post: Post,
-    session: PostGenerationSession | None = None,
-):
-    user_roles = workspace.members.all().values("id", "email", "role")
+def build_regeneration_prompt(prompt: str, post: Post) -> str:
     post_data = {
         "descr": post.description,
         "cap": post.post_text,
@@ -124,41 +123,119 @@ def regenerate_posts_ai(
         "vid_prompt": post.vid_prompt,
         "assignee_id": post.assignee_id,
     }
-    system_instruction = (
-        f"generate the content for professional social media marketing\n"
-        f"users: {list(user_roles)}\n"
-        f"select assignee for each post based on their roles.\n"
-        f"generate a single post in replacement of the post {post_data}"
-    )
+    # The post being replaced goes into the prompt rather than the system
+    # instruction, so the model can be shared by every post in the workspace.
+    return f"replace the post {post_data}\n{prompt}"
 
-    model = genai.GenerativeModel(
-        model_name="gemini-1.5-flash",
-        generation_config=generation_config,
-        system_instruction=system_instruction,
+
+def start_chat(
+    workspace: Workspace,
+    session: PostGenerationSession | None,
+    prompt: str,
+    kind: str = "generate",
+):
+    """Returns the chat session and the response cache key for ``prompt``."""
+    history = build_chat_history(session)
+    key = response_key(
+        MODEL_NAME, get_system_instruction(workspace, kind), history, prompt
     )
+    return get_model(workspace, kind).start_chat(history=history), key
+
+
+def send_message(chat_session, key: str, prompt: str, use_cache: bool = True) -> dict:
+    text = response_cache.get(key, use_cache)
+    if text is None:
+        text = chat_session.send_message(prompt).text
+        response_cache.set(key, text)
+    return json.loads(text)
+
+
+async def asend_message(
+    chat_session, key: str, prompt: str, use_cache: bool = True
+) -> dict:
+    text = await response_cache.aget(key, use_cache)
+    if text is None:
+        text = (await chat_session.send_message_async(prompt)).text
+        await response_cache.aset(key, text)
+    return json.loads(text)
+
+
+def generate_posts_ai(
+    workspace: Workspace,
+    user: User,
+    session: PostGenerationSession | None = None,
+    custom_instructions: str | None = None,
+    range_start: str | None = None,
+    range_end: str | None = None,
+    use_cache: bool = True,
+):
+    prompt = build_generation_prompt(custom_instructions, range_start, range_end)
+    chat_session, key = start_chat(workspace, session, prompt)
+    return send_message(chat_session, key, prompt, use_cache), prompt
 
-    history = []
-    if session is not None:
-        session_history = session.history.all().values("prompt", "response")
-        history = [
-            [
-                {"role": "user", "parts": [x["prompt"]]},
-                {"role": "model", "parts": [x["response"]]},
-            ]
-            for x in session_history
-        ]
-        history = [item for sublist in history for item in sublist]
-    chat_session = model.start_chat(history=history)
-
-    response = chat_session.send_message(prompt)
-    return json.loads(response.text), prompt
-
-
-def generate_post_image(post: Post, prompt: str):
-    client = openai.Client(api_key=OPENAI_KEY)
-    response = client.images.generate(
-        model="dall-e-2", prompt=prompt, size="512x512", response_format="url", n=1
+
+async def agenerate_posts_ai(
+    workspace: Workspace,
+    user: User,
+    session: PostGenerationSession | None = None,
+    custom_instructions: str | None = None,
+    range_start: str | None = None,
+    range_end: str | None = None,
+    use_cache: bool = True,
+):
+    prompt = build_generation_prompt(custom_instructions, range_start, range_end)
+    # Only the roster and history lookups touch the database.
+    chat_session, key = await sync_to_async(start_chat)(workspace, session, prompt)
+    return await asend_message(chat_session, key, prompt, use_cache), prompt
+
+
+def stream_generate_posts_ai(
+    workspace: Workspace,
+    user: User,
+    session: PostGenerationSession | None = None,
+    custom_instructions: str | None = None,
+    range_start: str | None = None,
+    range_end: str | None = None,
+    use_cache: bool = True,
+):
+    prompt = build_generation_prompt(custom_instructions, range_start, range_end)
+    chat_session, key = start_chat(workspace, session, prompt)
+    text = response_cache.get(key, use_cache)
+    if text is not None:
+        return iter([text]), prompt
+
+    def stream():
+        chunks = []
+        for chunk in chat_session.send_message(prompt, stream=True):
+            chunks.append(chunk.text)
+            yield chunk.text
+        # Only complete responses are cached.
+        response_cache.set(key, "".join(chunks))
+
+    return stream(), prompt
+
+
+def regenerate_posts_ai(
+    workspace: Workspace,
+    prompt: str,
+    post: Post,
+    session: PostGenerationSession | None = None,
+    use_cache: bool = True,
+):
+    prompt = build_regeneration_prompt(prompt, post)
+    chat_session, key = start_chat(workspace, session, prompt, kind="regenerate")
+    return send_message(chat_session, key, prompt, use_cache), prompt
+
+
+async def aregenerate_posts_ai(
+    workspace: Workspace,
+    prompt: str,
+    post: Post,
+    session: PostGenerationSession | None = None,
+    use_cache: bool = True,
+):
+    prompt = build_regeneration_prompt(prompt, post)
+    chat_session, key = await sync_to_async(start_chat)(
+        workspace, session, prompt, kind="regenerate"
     )
-    img_data = requests.get(response.data[0].url).content
-    post.post_image.save(f"{post.id}.png", ContentFile(img_data))
-    post.save()
+    return await asend_message(chat_session, key, prompt, use_cache), prompt
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import time
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from main.models import Workspace, User, PostGenerationSession, Post
+
+
+class GenerationBackend:
+    """
+    Produces post plans for a workspace. Implementations return the decoded
+    model response (``{"response": [...]}``) together with the prompt that was
+    sent, so the caller can record it in the session history.
+    """
+
+    def generate_posts(
+        self,
+        workspace: Workspace,
+        user: User,
+        session: PostGenerationSession | None = None,
+        custom_instructions: str | None = None,
+        range_start: str | None = None,
+        range_end: str | None = None,
+        use_cache: bool = True,
+    ) -> tuple[dict, str]:
+        """``use_cache=False`` skips any cached response for identical calls."""
+        raise NotImplementedError
+
+    def stream_generate_posts(
+        self,
+        workspace: Workspace,
+        user: User,
+        session: PostGenerationSession | None = None,
+        custom_instructions: str | None = None,
+        range_start: str | None = None,
+        range_end: str | None = None,
+        use_cache: bool = True,
+    ) -> tuple[Iterator[str], str]:
+        """
+        Same as ``generate_posts`` but returns an iterator over the raw JSON
+        text chunks as the model produces them.
+        """
+        raise NotImplementedError
+
+    def regenerate_post(
+        self,
+        workspace: Workspace,
+        prompt: str,
+        post: Post,
+        session: PostGenerationSession | None = None,
+        use_cache: bool = True,
+    ) -> tuple[dict, str]:
+        raise NotImplementedError
+
+    # Async variants for the ASGI views. By default they run the sync method
+    # in a worker thread; backends with an async client override them.
+
+    async def agenerate_posts(self, workspace, user, session=None, **kwargs):
+        return await sync_to_async(self.generate_posts)(
+            workspace, user, session, **kwargs
+        )
+
+    async def aregenerate_post(
+        self, workspace, prompt, post, session=None, use_cache=True
+    ):
+        return await sync_to_async(self.regenerate_post)(
+            workspace, prompt, post, session, use_cache
+        )
+
+
+class GeminiBackend(GenerationBackend):
+    def generate_posts(self, workspace, user, session=None, **kwargs):
+        from main.generate_post_ai import generate_posts_ai
+
+        return generate_posts_ai(workspace, user, session, **kwargs)
+
+    def stream_generate_posts(self, workspace, user, session=None, **kwargs):
+        from main.generate_post_ai import stream_generate_posts_ai
+
+        return stream_generate_posts_ai(workspace, user, session, **kwargs)
+
+    def regenerate_post(self, workspace, prompt, post, session=None, use_cache=True):
+        from main.generate_post_ai import regenerate_posts_ai
+
+        return regenerate_posts_ai(
+            workspace=workspace,
+            prompt=prompt,
+            post=post,
+            session=session,
+            use_cache=use_cache,
+        )
+
+    async def agenerate_posts(self, workspace, user, session=None, **kwargs):
+        from main.generate_post_ai import agenerate_posts_ai
+
+        return await agenerate_posts_ai(workspace, user, session, **kwargs)
+
+    async def aregenerate_post(
+        self, workspace, prompt, post, session=None, use_cache=True
+    ):
+        from main.generate_post_ai import aregenerate_posts_ai
+
+        return await aregenerate_posts_ai(
+            workspace=workspace,
+            prompt=prompt,
+            post=post,
+            session=session,
+            use_cache=use_cache,
+        )
+
+
+class FakeBackend(GenerationBackend):
+    """
+    Local stand-in for the LLM, returning deterministic posts in the same shape
+    as the Gemini response schema. Used for tests and offline load testing;
+    each call waits ``FAKE_GENERATION_LATENCY`` seconds like a model would.
+    """
+
+    posts_per_plan = 3
+    stream_chunk_size = 64
+
+    def __init__(self):
+        self.latency = settings.FAKE_GENERATION_LATENCY
+
+    # Plans are computed, not cached, so use_cache is accepted and ignored.
+
+    def generate_posts(self, workspace, user, session=None, use_cache=True, **kwargs):
+        time.sleep(self.latency)
+        return self.plan(workspace, user, **kwargs)
+
+    async def agenerate_posts(
+        self, workspace, user, session=None, use_cache=True, **kwargs
+    ):
+        await asyncio.sleep(self.latency)
+        return await sync_to_async(self.plan)(workspace, user, **kwargs)
+
+    def plan(
+        self,
+        workspace,
+        user,
+        custom_instructions=None,
+        range_start=None,
+        range_end=None,
+    ):
+        prompt = ""
+        if custom_instructions:
+            prompt += custom_instructions + "\n"
+        prompt += (
+            f"Generate social media content for date between {range_start} and {range_end}"
+        )
+        start = self._parse_date(range_start) or timezone.now()
+        end = self._parse_date(range_end) or start + timedelta(days=7)
+        step = (end - start) / self.posts_per_plan
+        assignee_ids = list(workspace.members.values_list("id", flat=True))
+        return {
+            "response": [
+                self._post(
+                    i,
+                    start + step * i,
+                    assignee_ids[i % len(assignee_ids)] if assignee_ids else user.id,
+                )
+                for i in range(self.posts_per_plan)
+            ]
+        }, prompt
+
+    def stream_generate_posts(self, workspace, user, session=None, **kwargs):
+        response, prompt = self.generate_posts(workspace, user, session, **kwargs)
+        text = json.dumps(response)
+        chunks = (
+            text[i : i + self.stream_chunk_size]
+            for i in range(0, len(text), self.stream_chunk_size)
+        )
+        return chunks, prompt
+
+    def regenerate_post(self, workspace, prompt, post, session=None, use_cache=True):
+        time.sleep(self.latency)
+        return self.replan(prompt, post)
+
+    async def aregenerate_post(
+        self, workspace, prompt, post, session=None, use_cache=True
+    ):
+        await asyncio.sleep(self.latency)
+        return self.replan(prompt, post)
+
+    def replan(self, prompt, post):
+        return {
+            "response": [self._post(0, post.schedule_time, post.assignee_id, prompt)]
+        }, prompt
+
+    @staticmethod
+    def _parse_date(value):
+        if not value:
+            return None
+        if isinstance(value, str):
+            value = date.fromisoformat(value)
+        if not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day, hour=10)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+    @staticmethod
+    def _post(index, post_time, assignee_id, hint=""):
+        return {
+            "descr": f"Generated post {index + 1} {hint}".strip(),
+            "cap": f"Caption for post {index + 1}",
+            "post_time": post_time.isoformat(),
+            "img_prompt": f"Illustration for post {index + 1}",
+            "vid_prompt": f"Short clip for post {index + 1}",
+            "assignee_id": str(assignee_id),
+        }
+
+
+_backend: GenerationBackend | None = None
+
+
+def get_generation_backend() -> GenerationBackend:
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.GENERATION_BACKEND)()
+    return _backend
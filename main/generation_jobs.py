@@ -0,0 +1,163 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction, close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from main.generation_backends import get_generation_backend
+from main.generation_persistence import save_generated_posts
+from main.image_generation import requeue_stale_images
+from main.image_variants import requeue_missing_variants
+from main.models import (
+    GenerationJobStatus,
+    PostGenerationJob,
+    PostGenerationSession,
+    User,
+    Workspace,
+)
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = (GenerationJobStatus.succeeded, GenerationJobStatus.failed)
+
+
+def enqueue_generation_job(
+    workspace: Workspace,
+    user: User,
+    session: PostGenerationSession,
+    custom_instructions: str | None = None,
+    range_start: str | None = None,
+    range_end: str | None = None,
+    use_cache: bool = True,
+) -> PostGenerationJob:
+    return PostGenerationJob.objects.create(
+        workspace=workspace,
+        creator=user,
+        session=session,
+        params={
+            "custom_instructions": custom_instructions,
+            "range_start": range_start,
+            "range_end": range_end,
+            "use_cache": use_cache,
+        },
+    )
+
+
+def claim_next_job() -> PostGenerationJob | None:
+    """
+    Atomically moves the oldest queued job to ``running``. Rows locked by other
+    workers are skipped, so any number of workers can poll the same table.
+    """
+    while True:
+        with transaction.atomic():
+            job = (
+                PostGenerationJob.objects.select_for_update(skip_locked=True)
+                .filter(status=GenerationJobStatus.queued)
+                .order_by("created_at")
+                .first()
+            )
+            if job is None:
+                return None
+            # Backends without SKIP LOCKED (SQLite) ignore it, so two workers
+            # can read the same job; only the one whose update matches runs it.
+            now = timezone.now()
+            claimed = PostGenerationJob.objects.filter(
+                pk=job.pk, status=GenerationJobStatus.queued
+            ).update(
+                status=GenerationJobStatus.running,
+                attempts=F("attempts") + 1,
+                started_at=now,
+                updated_at=now,
+            )
+        if claimed:
+            job.status = GenerationJobStatus.running
+            job.attempts += 1
+            job.started_at = job.updated_at = now
+            return job
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Puts jobs whose worker died mid-run (still ``running`` past
+    GENERATION_JOB_STALE_AFTER) back in the queue, or fails them once they
+    have been claimed GENERATION_JOB_MAX_ATTEMPTS times. Returns the number
+    requeued.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.GENERATION_JOB_STALE_AFTER)
+    stale = PostGenerationJob.objects.filter(
+        status=GenerationJobStatus.running, started_at__lt=cutoff
+    )
+    failed = stale.filter(attempts__gte=settings.GENERATION_JOB_MAX_ATTEMPTS).update(
+        status=GenerationJobStatus.failed,
+        error="The worker running this job stopped.",
+        finished_at=now,
+        updated_at=now,
+    )
+    requeued = stale.update(
+        status=GenerationJobStatus.queued, started_at=None, updated_at=now
+    )
+    if failed or requeued:
+        logger.warning(
+            "Requeued %d and failed %d stale generation jobs", requeued, failed
+        )
+    return requeued
+
+
+def run_job(job: PostGenerationJob):
+    try:
+        response, prompt = get_generation_backend().generate_posts(
+            job.workspace,
+            job.creator,
+            job.session,
+            **job.params,
+        )
+        posts = save_generated_posts(
+            response, prompt, job.session, job.workspace, job.creator
+        )
+        job.post_ids = [post.id for post in posts]
+        job.status = GenerationJobStatus.succeeded
+    except Exception as e:
+        logger.exception("Generation job %s failed", job.id)
+        job.status = GenerationJobStatus.failed
+        job.error = str(e)
+    job.finished_at = job.updated_at = timezone.now()
+    # A job that overran GENERATION_JOB_STALE_AFTER may have been requeued and
+    # claimed again; only the latest claim records its result.
+    finished = PostGenerationJob.objects.filter(
+        pk=job.pk, status=GenerationJobStatus.running, started_at=job.started_at
+    ).update(
+        status=job.status,
+        post_ids=job.post_ids,
+        error=job.error,
+        finished_at=job.finished_at,
+        updated_at=job.updated_at,
+    )
+    if not finished:
+        logger.warning("Generation job %s was reclaimed while it ran", job.id)
+
+
+def work(stop_event: threading.Event, poll_interval: float | None = None):
+    """
+    Worker loop: claims and runs jobs until ``stop_event`` is set, sleeping for
+    ``poll_interval`` seconds whenever the queue is empty.
+    """
+    if poll_interval is None:
+        poll_interval = settings.GENERATION_JOB_POLL_INTERVAL
+    while not stop_event.is_set():
+        close_old_connections()
+        job = claim_next_job()
+        if job is None:
+            # Idle workers also recover images and variants lost with a web
+            # process.
+            requeue_stale_images()
+            requeue_missing_variants()
+            if not requeue_stale_jobs():
+                stop_event.wait(poll_interval)
+            continue
+        logger.info("Running generation job %s", job.id)
+        run_job(job)
+    close_old_connections()
@@ -0,0 +1,134 @@
+import json
+
+from django.db import transaction
+from rest_framework import serializers
+
+from main.models import (
+    Post,
+    PostGenerationSession,
+    PostGenerationSessionHistory,
+    PostType,
+    User,
+    Workspace,
+)
+from main.session_history import compact_session_history
+
+
+class GeneratedPostSerializer(serializers.Serializer):
+    descr = serializers.CharField(allow_blank=True)
+    cap = serializers.CharField(allow_blank=True)
+    post_time = serializers.DateTimeField()
+    img_prompt = serializers.CharField(allow_blank=True)
+    vid_prompt = serializers.CharField(allow_blank=True)
+    assignee_id = serializers.IntegerField()
+
+
+def get_member_ids(workspace: Workspace) -> set[int]:
+    return set(workspace.members.values_list("id", flat=True))
+
+
+def validate_generated_posts(
+    items: list[dict], workspace: Workspace, member_ids: set[int] | None = None
+) -> list[dict]:
+    """
+    Validates raw LLM items before anything is written. Times are parsed and
+    assignees are checked against the workspace roster with a single query.
+    """
+    serializer = GeneratedPostSerializer(data=items, many=True)
+    serializer.is_valid(raise_exception=True)
+    validated = serializer.validated_data
+
+    if member_ids is None:
+        member_ids = get_member_ids(workspace)
+    for item in validated:
+        if item["assignee_id"] not in member_ids:
+            raise serializers.ValidationError(
+                f"Assignee {item['assignee_id']} is not a member of this workspace"
+            )
+    return validated
+
+
+def build_post(
+    item: dict, session: PostGenerationSession, workspace: Workspace, user: User
+) -> Post:
+    return Post(
+        description=item["descr"],
+        img_prompt=item["img_prompt"],
+        vid_prompt=item["vid_prompt"],
+        schedule_time=item["post_time"],
+        assignee_id=item["assignee_id"],
+        post_text=item["cap"],
+        session=session,
+        post_type=PostType.image,
+        creator=user,
+        workspace=workspace,
+    )
+
+
+def save_session_turn(session: PostGenerationSession, prompt: str, response: str):
+    PostGenerationSessionHistory.objects.create(
+        session=session, prompt=prompt, response=response
+    )
+    compact_session_history(session)
+
+
+def save_generated_posts(
+    response: dict,
+    prompt: str,
+    session: PostGenerationSession,
+    workspace: Workspace,
+    user: User,
+) -> list[Post]:
+    items = validate_generated_posts(response["response"], workspace)
+    posts = [build_post(i, session, workspace, user) for i in items]
+    with transaction.atomic():
+        posts = Post.objects.bulk_create(posts)
+        PostGenerationSessionHistory.objects.bulk_create(
+            [
+                PostGenerationSessionHistory(
+                    session=session, prompt=prompt, response=json.dumps(response)
+                )
+            ]
+        )
+    compact_session_history(session)
+    return posts
+
+
+def save_regenerated_post(
+    response: dict, prompt: str, post: Post, workspace: Workspace
+) -> Post:
+    items = validate_generated_posts(response["response"][:1], workspace)
+    if not items:
+        raise serializers.ValidationError("The model did not return a post")
+    item = items[0]
+    post.description = item["descr"]
+    post.img_prompt = item["img_prompt"]
+    post.vid_prompt = item["vid_prompt"]
+    post.schedule_time = item["post_time"]
+    post.assignee_id = item["assignee_id"]
+    post.post_text = item["cap"]
+    with transaction.atomic():
+        post.save(
+            update_fields=[
+                "description",
+                "img_prompt",
+                "vid_prompt",
+                "schedule_time",
+                "assignee_id",
+                "post_text",
+                "updated_at",
+            ]
+        )
+        if post.session_id is not None:
+            PostGenerationSessionHistory.objects.bulk_create(
+                [
+                    PostGenerationSessionHistory(
+                        session_id=post.session_id,
+                        prompt=prompt,
+                        response=json.dumps(response),
+                    )
+                ]
+            )
+    if post.session_id is not None:
+        compact_session_history(post.session)
+    return post
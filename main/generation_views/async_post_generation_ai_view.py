@@ -0,0 +1,105 @@
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404
+from rest_framework.response import Response
+
+from main.async_api_view import AsyncAPIView
+from main.generation_backends import get_generation_backend
+from main.generation_persistence import save_generated_posts, save_regenerated_post
+from main.generation_views.post_generation_ai_view import (
+    GeneratePostImageViewAI,
+    GeneratePostsViewAI,
+    RegeneratePostViewAI,
+)
+from main.image_generation import agenerate_post_image
+from main.models import Post, PostGenerationSession, Workspace
+from main.serializers.post_serializer import PostSerializer
+
+# Async counterparts of the AI views for ASGI deployments. The model, image
+# and download calls are awaited, so an ASGI worker can hold many requests
+# in flight at once. The ORM work around them runs through sync_to_async.
+
+
+class AsyncGeneratePostsViewAI(AsyncAPIView):
+    """
+    Generates posts inline and returns them, instead of queueing a job like
+    GeneratePostsViewAI.
+    """
+
+    ParamSerializer = GeneratePostsViewAI.ParamSerializer
+
+    async def post(self, request, workspace_id):
+        workspace = await aget_object_or_404(Workspace, id=workspace_id)
+        serializer = self.ParamSerializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        data = serializer.validated_data
+        session = data.get("session_id")
+        if session is None:
+            session = await PostGenerationSession.objects.acreate(
+                workspace=workspace, creator=request.user
+            )
+        response, prompt = await get_generation_backend().agenerate_posts(
+            workspace,
+            request.user,
+            session,
+            range_start=data["range_start"].isoformat(),
+            range_end=data["range_end"].isoformat(),
+            custom_instructions=data.get("custom_instructions"),
+            use_cache=data["use_cache"],
+        )
+
+        def save():
+            posts = save_generated_posts(
+                response, prompt, session, workspace, request.user
+            )
+            return PostSerializer(
+                posts, many=True, context=self.get_serializer_context()
+            ).data
+
+        return Response(await sync_to_async(save)())
+
+    def get_serializer_context(self):
+        return {"request": self.request}
+
+
+class AsyncRegeneratePostViewAI(AsyncAPIView):
+    Serializer = RegeneratePostViewAI.Serializer
+
+    async def post(self, request, workspace_id, post_id):
+        workspace = await aget_object_or_404(Workspace, id=workspace_id)
+        post = await aget_object_or_404(
+            Post.objects.select_related("session"), id=post_id, workspace=workspace
+        )
+        serializer = self.Serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        response, prompt = await get_generation_backend().aregenerate_post(
+            workspace=workspace,
+            prompt=serializer.validated_data["prompt"],
+            session=post.session,
+            post=post,
+            use_cache=serializer.validated_data["use_cache"],
+        )
+
+        def save():
+            save_regenerated_post(response, prompt, post, workspace)
+            return PostSerializer(post, context={"request": request}).data
+
+        return Response(await sync_to_async(save)())
+
+
+class AsyncGeneratePostImageViewAI(AsyncAPIView):
+    Serializer = GeneratePostImageViewAI.Serializer
+
+    async def post(self, request, workspace_id, post_id):
+        post = await aget_object_or_404(
+            Post.objects.select_related("workspace"),
+            id=post_id,
+            workspace_id=workspace_id,
+        )
+        serializer = self.Serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        await agenerate_post_image(post, serializer.validated_data["prompt"])
+        return Response(
+            await sync_to_async(
+                lambda: PostSerializer(post, context={"request": request}).data
+            )()
+        )
@@ -1,21 +1,34 @@
 import json
 from datetime import datetime, timedelta
-from idlelib.history import History
 
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import serializers
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 
-from main.generate_post_ai import generate_posts_ai, regenerate_posts_ai, generate_post_image
+from content_chronicle import logger
+from main.generation_backends import get_generation_backend
+from main.generation_jobs import enqueue_generation_job
+from main.generation_persistence import (
+    build_post,
+    get_member_ids,
+    save_regenerated_post,
+    save_session_turn,
+    validate_generated_posts,
+)
+from main.image_generation import enqueue_post_images, generate_post_image
+from main.llm_cache import response_cache
 from main.models import (
     PostGenerationSession,
     Workspace,
     Post,
-    PostType,
-    PostGenerationSessionHistory,
 )
+from main.serializers.generation_job_serializer import PostGenerationJobSerializer
 from main.serializers.post_serializer import PostSerializer
+from main.stream_parser import ResponseArrayParser
 
 
 class GeneratePostsViewAI(APIView):
@@ -32,55 +45,113 @@ class GeneratePostsViewAI(APIView):
             required=False,
             allow_null=True,
         )
+        # False re-runs the model even if an identical request was answered.
+        use_cache = serializers.BooleanField(default=True)
 
     def post(self, request, workspace_id):
         workspace = get_object_or_404(Workspace, id=workspace_id)
         serializers = self.ParamSerializer(data=request.data)
         serializers.is_valid(raise_exception=True)
         data = serializers.validated_data
-        posts = []
-        session = data.get(
-            "session_id",
-            PostGenerationSession.objects.create(
-                workspace=workspace, creator=request.user
-            ),
+        session = data.get("session_id") or PostGenerationSession.objects.create(
+            workspace=workspace, creator=request.user
         )
-        response, prompt = generate_posts_ai(
+        job = enqueue_generation_job(
             workspace,
             request.user,
             session,
             range_start=data["range_start"].isoformat(),
             range_end=data["range_end"].isoformat(),
             custom_instructions=data.get("custom_instructions"),
-        )
-        for i in response["response"]:
-            post = Post.objects.create(
-                description=i["descr"],
-                img_prompt=i["img_prompt"],
-                vid_prompt=i["vid_prompt"],
-                schedule_time=i["post_time"],
-                assignee_id=i["assignee_id"],
-                post_text=i["cap"],
-                session=session,
-                post_type=PostType.image,
-                creator=request.user,
-                workspace=workspace,
-            )
-            posts.append(post)
-        PostGenerationSessionHistory.objects.create(
-            session=session, prompt=prompt, response=json.dumps(response)
+            use_cache=data["use_cache"],
         )
         return Response(
-            PostSerializer(posts, context=self.get_serializer_context(), many=True).data
+            PostGenerationJobSerializer(
+                job, context=self.get_serializer_context()
+            ).data,
+            status=status.HTTP_202_ACCEPTED,
         )
 
     def get_serializer_context(self):
         return {"request": self.request}
 
 
+class GeneratePostsStreamViewAI(GeneratePostsViewAI):
+    """
+    Streams newline-delimited JSON events: the session first, then each post
+    as soon as the model has produced it and it has been saved, then ``done``.
+    """
+
+    def post(self, request, workspace_id):
+        workspace = get_object_or_404(Workspace, id=workspace_id)
+        serializers = self.ParamSerializer(data=request.data)
+        serializers.is_valid(raise_exception=True)
+        data = serializers.validated_data
+        session = data.get("session_id") or PostGenerationSession.objects.create(
+            workspace=workspace, creator=request.user
+        )
+        chunks, prompt = get_generation_backend().stream_generate_posts(
+            workspace,
+            request.user,
+            session,
+            range_start=data["range_start"].isoformat(),
+            range_end=data["range_end"].isoformat(),
+            custom_instructions=data.get("custom_instructions"),
+            use_cache=data["use_cache"],
+        )
+        response = StreamingHttpResponse(
+            self.stream(chunks, prompt, workspace, session),
+            content_type="application/x-ndjson",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def stream(self, chunks, prompt, workspace, session):
+        yield self.event("session", session_id=session.id)
+        parser = ResponseArrayParser()
+        member_ids = get_member_ids(workspace)
+        context = self.get_serializer_context()
+        post_ids = []
+        try:
+            for chunk in chunks:
+                for item in parser.feed(chunk):
+                    item = validate_generated_posts([item], workspace, member_ids)[0]
+                    post = build_post(item, session, workspace, self.request.user)
+                    post.save()
+                    post_ids.append(post.id)
+                    yield self.event(
+                        "post", post=PostSerializer(post, context=context).data
+                    )
+        except Exception as e:
+            logger.exception("Streaming generation failed for session %s", session.id)
+            yield self.event("error", detail=str(e), post_ids=post_ids)
+            return
+        save_session_turn(session, prompt, parser.get_text())
+        yield self.event("done", post_ids=post_ids)
+
+    @staticmethod
+    def event(name, **data):
+        return json.dumps({"event": name, **data}, cls=JSONEncoder) + "\n"
+
+
+class LLMResponseCacheView(APIView):
+    """Hit/miss counters of this process's LLM response cache; DELETE clears it."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.stats())
+
+    def delete(self, request):
+        response_cache.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class RegeneratePostViewAI(APIView):
     class Serializer(serializers.Serializer):
         prompt = serializers.CharField()
+        use_cache = serializers.BooleanField(default=True)
 
     def post(self, request, workspace_id, post_id):
         workspace = get_object_or_404(Workspace, id=workspace_id)
@@ -88,23 +159,14 @@ class RegeneratePostViewAI(APIView):
         serializer = self.Serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
-        response, prompt = regenerate_posts_ai(
+        response, prompt = get_generation_backend().regenerate_post(
             workspace=workspace,
             prompt=data["prompt"],
             session=post.session,
             post=post,
+            use_cache=data["use_cache"],
         )
-        post.description = response["response"][0]["descr"]
-        post.img_prompt = response["response"][0]["img_prompt"]
-        post.vid_prompt = response["response"][0]["vid_prompt"]
-        post.schedule_time = response["response"][0]["post_time"]
-        post.assignee_id = response["response"][0]["assignee_id"]
-        post.post_text = response["response"][0]["cap"]
-        post.save()
-        if post.session is not None:
-            PostGenerationSessionHistory.objects.create(
-                session=post.session, prompt=prompt, response=response
-            )
+        save_regenerated_post(response, prompt, post, workspace)
         return Response(
             PostSerializer(post, context={'request': request}).data
         )
@@ -129,4 +191,34 @@ class GeneratePostImageViewAI(APIView):
         generate_post_image(post, data["prompt"])
         return Response(
             PostSerializer(post, context={'request': request}).data
-        )
\ No newline at end of file
+        )
+
+
+class GenerateSessionImagesViewAI(APIView):
+    """
+    Generates images for every post of a generation session (or the given
+    subset) in the background and returns the posts with their image status.
+    """
+
+    class Serializer(serializers.Serializer):
+        post_ids = serializers.ListField(
+            child=serializers.IntegerField(), required=False, allow_empty=False
+        )
+
+    def post(self, request, workspace_id, session_id):
+        session = get_object_or_404(
+            PostGenerationSession,
+            id=session_id,
+            workspace_id=workspace_id,
+            workspace__members=request.user,
+        )
+        serializer = self.Serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        posts = session.posts.filter(is_deleted=False)
+        if "post_ids" in serializer.validated_data:
+            posts = posts.filter(id__in=serializer.validated_data["post_ids"])
+        posts = enqueue_post_images(list(posts))
+        return Response(
+            PostSerializer(posts, many=True, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
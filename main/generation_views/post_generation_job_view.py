@@ -0,0 +1,76 @@
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import APIView
+
+from main.async_api_view import AsyncAPIView
+from main.generation_jobs import TERMINAL_STATUSES
+from main.models import PostGenerationJob
+from main.serializers.generation_job_serializer import PostGenerationJobSerializer
+
+
+class GenerationJobMixin:
+    def get_object(self, workspace_id, job_id):
+        return get_object_or_404(
+            PostGenerationJob,
+            id=job_id,
+            workspace_id=workspace_id,
+            workspace__members=self.request.user,
+        )
+
+
+class GenerationJobView(GenerationJobMixin, APIView):
+    def get(self, request, workspace_id, job_id):
+        job = self.get_object(workspace_id, job_id)
+        return Response(
+            PostGenerationJobSerializer(job, context={"request": request}).data
+        )
+
+
+class GenerationJobEventsView(GenerationJobMixin, AsyncAPIView):
+    """
+    Server-sent events stream of a job's status. An event is emitted whenever
+    the status changes and the stream closes once the job has finished. The
+    stream waits on the event loop, so under ASGI an open stream holds no
+    worker thread; each poll reads only the status column.
+    """
+
+    async def get(self, request, workspace_id, job_id):
+        job = await sync_to_async(self.get_object)(workspace_id, job_id)
+        response = StreamingHttpResponse(
+            self.stream(job), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def serialize(self, job) -> str:
+        data = PostGenerationJobSerializer(job, context={"request": self.request}).data
+        return json.dumps(data, cls=JSONEncoder)
+
+    async def stream(self, job):
+        deadline = time.monotonic() + settings.GENERATION_JOB_STREAM_TIMEOUT
+        while True:
+            data = await sync_to_async(self.serialize)(job)
+            yield f"event: status\ndata: {data}\n\n"
+            if job.status in TERMINAL_STATUSES:
+                return
+            last_status = job.status
+            while job.status == last_status:
+                if time.monotonic() >= deadline:
+                    yield "event: timeout\ndata: {}\n\n"
+                    return
+                await asyncio.sleep(settings.GENERATION_JOB_POLL_INTERVAL)
+                job.status = await (
+                    PostGenerationJob.objects.filter(pk=job.pk)
+                    .values_list("status", flat=True)
+                    .aget()
+                )
+            await job.arefresh_from_db()
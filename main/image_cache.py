@@ -0,0 +1,98 @@
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from main.media_refs import release, retain
+from main.models import ImageCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    # Case and whitespace differences do not change what is rendered.
+    return " ".join(prompt.split()).casefold()
+
+
+def image_cache_key(prompt: str, model: str, size: str) -> str:
+    payload = f"{model}\n{size}\n{normalize_prompt(prompt)}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def provider_identity(provider) -> tuple[str, str]:
+    return provider.model, str(provider.size)
+
+
+def get_cached_image(provider, prompt: str) -> str | None:
+    """Storage name of an image already rendered for ``prompt``, if fresh."""
+    if not settings.IMAGE_CACHE_ENABLED:
+        return None
+    key = image_cache_key(prompt, *provider_identity(provider))
+    cutoff = timezone.now() - timedelta(seconds=settings.IMAGE_CACHE_MAX_AGE)
+    entries = ImageCacheEntry.objects.filter(key=key, created_at__gte=cutoff)
+    image = entries.values_list("image", flat=True).first()
+    if image is not None:
+        entries.update(hits=F("hits") + 1, last_used_at=timezone.now())
+    return image
+
+
+def cache_image(provider, prompt: str, image: str, size: int):
+    """Remembers ``image`` for ``prompt`` and evicts entries past the limits."""
+    if not settings.IMAGE_CACHE_ENABLED:
+        return
+    model, dimensions = provider_identity(provider)
+    key = image_cache_key(prompt, model, dimensions)
+    # A stale entry under the same key is replaced.
+    evict(ImageCacheEntry.objects.filter(key=key))
+    try:
+        with transaction.atomic():
+            ImageCacheEntry.objects.create(
+                key=key,
+                prompt=prompt,
+                model=model,
+                size=dimensions,
+                image=image,
+                bytes=size,
+            )
+    except IntegrityError:
+        # A concurrent render of the same prompt was cached first.
+        return
+    # The entry holds its own reference, so the file outlives the posts.
+    retain([image])
+    evict_expired()
+
+
+def evict(entries) -> int:
+    entries = list(entries.values_list("key", "image"))
+    if not entries:
+        return 0
+    ImageCacheEntry.objects.filter(key__in=[key for key, _ in entries]).delete()
+    release([image for _, image in entries])
+    return len(entries)
+
+
+def evict_expired() -> int:
+    """
+    Drops entries older than IMAGE_CACHE_MAX_AGE, then the least recently used
+    ones until the rest fit in IMAGE_CACHE_MAX_BYTES.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.IMAGE_CACHE_MAX_AGE)
+    evicted = evict(ImageCacheEntry.objects.filter(created_at__lt=cutoff))
+    total = ImageCacheEntry.objects.aggregate(total=Sum("bytes"))["total"] or 0
+    excess = total - settings.IMAGE_CACHE_MAX_BYTES
+    if excess > 0:
+        victims = []
+        lru = ImageCacheEntry.objects.order_by("last_used_at")
+        for key, size in lru.values_list("key", "bytes").iterator():
+            victims.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        evicted += evict(ImageCacheEntry.objects.filter(key__in=victims))
+    if evicted:
+        logger.info("Evicted %d cached images", evicted)
+    return evicted
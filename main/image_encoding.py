@@ -0,0 +1,31 @@
+import io
+
+from PIL import Image, ImageOps
+
+# Runs inside the image variant process pool, so it only depends on Pillow:
+# workers never import Django or touch the database.
+
+
+def encode_variant(image: Image.Image, max_side: int | None, fmt: str) -> bytes:
+    if max_side is not None:
+        image = image.copy()
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    if fmt == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, quality=80, optimize=fmt == "JPEG")
+    return buffer.getvalue()
+
+
+def encode_variants(
+    data: bytes, specs: dict[str, tuple[int | None, str]]
+) -> dict[str, bytes]:
+    """Encodes ``data`` once per ``specs`` entry of (longest side, format)."""
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        return {
+            name: encode_variant(image, max_side, fmt)
+            for name, (max_side, fmt) in specs.items()
+        }
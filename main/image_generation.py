@@ -0,0 +1,222 @@
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image
+
+from main.clients import get_async_openai_client, get_openai_client
+from main.image_cache import cache_image, get_cached_image
+from main.image_variants import enqueue_image_variants
+from main.models import Post, ImageStatus
+from main.outbound_http import adownload_to_temp_file, download_to_temp_file
+
+logger = logging.getLogger(__name__)
+
+
+class ImageProvider:
+    # Identify the rendering for the image cache.
+    model = ""
+    size = ""
+
+    def generate(self, prompt: str) -> File:
+        """Returns the rendered image; the caller closes it."""
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str) -> File:
+        return await sync_to_async(self.generate, thread_sensitive=False)(prompt)
+
+
+class OpenAIImageProvider(ImageProvider):
+    model = "dall-e-2"
+    size = "512x512"
+
+    def __init__(self):
+        self.client = get_openai_client()
+
+    def generate(self, prompt):
+        response = self.client.images.generate(
+            model=self.model,
+            prompt=prompt,
+            size=self.size,
+            response_format="url",
+            n=1,
+        )
+        return download_to_temp_file(response.data[0].url)
+
+    async def agenerate(self, prompt):
+        response = await get_async_openai_client().images.generate(
+            model=self.model,
+            prompt=prompt,
+            size=self.size,
+            response_format="url",
+            n=1,
+        )
+        return await adownload_to_temp_file(response.data[0].url)
+
+
+class StubImageProvider(ImageProvider):
+    """
+    Renders a small solid-colour PNG derived from the prompt, so the pipeline
+    can run in tests without calling DALL-E.
+    """
+
+    model = "stub"
+    size = (64, 64)
+
+    def generate(self, prompt):
+        color = tuple(hashlib.sha256(prompt.encode()).digest()[:3])
+        buffer = io.BytesIO()
+        Image.new("RGB", self.size, color).save(buffer, format="PNG")
+        return ContentFile(buffer.getvalue())
+
+
+_provider: ImageProvider | None = None
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_image_provider() -> ImageProvider:
+    global _provider
+    if _provider is None:
+        _provider = import_string(settings.IMAGE_PROVIDER)()
+    return _provider
+
+
+def get_image_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_GENERATION_CONCURRENCY,
+            thread_name_prefix="image-generation",
+        )
+    return _executor
+
+
+def link_post_image(post: Post, name: str):
+    """Points ``post`` at the stored image ``name`` and queues its variants."""
+    post.post_image = name
+    post.image_variants = {}
+    post.image_status = ImageStatus.done
+    post.image_error = None
+    post.save()
+    enqueue_image_variants(post)
+
+
+def store_post_image(post: Post, image: File):
+    with image:
+        post.post_image.save(f"{post.id}.png", image, save=False)
+    link_post_image(post, post.post_image.name)
+
+
+def generate_post_image(post: Post, prompt: str):
+    provider = get_image_provider()
+    name = get_cached_image(provider, prompt)
+    if name is not None:
+        link_post_image(post, name)
+        return
+    store_post_image(post, provider.generate(prompt))
+    cache_image(provider, prompt, post.post_image.name, post.post_image.size)
+
+
+async def agenerate_post_image(post: Post, prompt: str):
+    provider = get_image_provider()
+    name = await sync_to_async(get_cached_image)(provider, prompt)
+    if name is not None:
+        await sync_to_async(link_post_image)(post, name)
+        return
+    image = await provider.agenerate(prompt)
+
+    def store():
+        store_post_image(post, image)
+        cache_image(provider, prompt, post.post_image.name, post.post_image.size)
+
+    await sync_to_async(store)()
+
+
+def claim_post_image(post_id: int, *conditions, **filters) -> bool:
+    """Moves a post's image to ``running`` if it still matches the filters."""
+    now = timezone.now()
+    return bool(
+        Post.objects.filter(*conditions, id=post_id, **filters).update(
+            image_status=ImageStatus.running, image_updated_at=now
+        )
+    )
+
+
+def run_post_image(post_id: int, prompt: str):
+    """Renders the image of a post claimed with ``claim_post_image``."""
+    try:
+        post = Post.objects.select_related("workspace").get(id=post_id)
+        generate_post_image(post, prompt)
+    except Exception as e:
+        logger.exception("Image generation failed for post %s", post_id)
+        Post.objects.filter(id=post_id).update(
+            image_status=ImageStatus.failed, image_error=str(e)
+        )
+
+
+def _generate_image_task(post_id: int, prompt: str, claimed: bool = False):
+    try:
+        # requeue_stale_images may have taken it over already.
+        if claimed or claim_post_image(post_id, image_status=ImageStatus.pending):
+            run_post_image(post_id, prompt)
+    finally:
+        connection.close()
+
+
+def enqueue_post_images(posts: list[Post]) -> list[Post]:
+    """
+    Marks every post with an image prompt as pending and schedules its image
+    on the shared pool once the current transaction commits. At most
+    ``IMAGE_GENERATION_CONCURRENCY`` provider calls run at the same time.
+    Images lost with this process are picked up by ``requeue_stale_images``.
+    """
+    posts = [post for post in posts if post.img_prompt]
+    now = timezone.now()
+    Post.objects.filter(id__in=[post.id for post in posts]).update(
+        image_status=ImageStatus.pending, image_error=None, image_updated_at=now
+    )
+    executor = get_image_executor()
+    for post in posts:
+        post.image_status = ImageStatus.pending
+        post.image_error = None
+        post.image_updated_at = now
+        transaction.on_commit(
+            lambda post=post: executor.submit(
+                _generate_image_task, post.id, post.img_prompt
+            )
+        )
+    return posts
+
+
+def requeue_stale_images(limit: int = 100) -> int:
+    """
+    Claims up to ``limit`` images that stayed pending or running past
+    IMAGE_GENERATION_STALE_AFTER, because the process that queued or rendered
+    them stopped, and renders them on this process's pool. Returns the number
+    claimed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.IMAGE_GENERATION_STALE_AFTER)
+    stale = Q(image_status__in=[ImageStatus.pending, ImageStatus.running]) & (
+        Q(image_updated_at__lt=cutoff) | Q(image_updated_at__isnull=True)
+    )
+    claimed = 0
+    executor = get_image_executor()
+    for post_id, prompt in Post.objects.filter(stale).values_list(
+        "id", "img_prompt"
+    )[:limit]:
+        if claim_post_image(post_id, stale):
+            executor.submit(_generate_image_task, post_id, prompt, claimed=True)
+            claimed += 1
+    if claimed:
+        logger.warning("Requeued %d stale post images", claimed)
+    return claimed
@@ -0,0 +1,165 @@
+import logging
+import multiprocessing
+import posixpath
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from main.image_encoding import encode_variants
+from main.media_refs import release, retain
+from main.models import Post
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = {
+    # name: (longest side in px or None to keep the size, format, extension)
+    "thumb": (256, "JPEG", "jpg"),
+    "medium": (640, "JPEG", "jpg"),
+    "webp": (None, "WEBP", "webp"),
+}
+
+_process_pool: ProcessPoolExecutor | None = None
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_image_storage():
+    return Post._meta.get_field("post_image").storage
+
+
+def variant_name(name: str, variant: str) -> str:
+    """``workspace/1/posts/2/2.png`` -> ``workspace/1/posts/2/variants/thumb/2.jpg``"""
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    extension = VARIANTS[variant][2]
+    return posixpath.join(directory, "variants", variant, f"{stem}.{extension}")
+
+
+def get_variant_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # Forked workers would inherit the parent's threads, locks and
+        # database connections; image_encoding only needs Pillow, so start
+        # them from a clean forkserver instead.
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_PROCESSES,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _process_pool
+
+
+def get_variant_executor() -> ThreadPoolExecutor:
+    # Threads only read the original, wait on the process pool and store the
+    # result; the CPU-bound encoding never holds the GIL of this process.
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_PROCESSES,
+            thread_name_prefix="image-variants",
+        )
+    return _executor
+
+
+def build_variants(name: str) -> dict[str, str]:
+    """
+    Encodes every variant of the stored image ``name`` in the process pool and
+    saves them. Returns the storage name of each variant.
+    """
+    storage = get_image_storage()
+    with storage.open(name) as f:
+        data = f.read()
+    specs = {variant: spec[:2] for variant, spec in VARIANTS.items()}
+    encoded = get_variant_process_pool().submit(encode_variants, data, specs).result()
+    return {
+        variant: storage.save(variant_name(name, variant), ContentFile(content))
+        for variant, content in encoded.items()
+    }
+
+
+def get_or_build_variants(name: str) -> dict[str, str]:
+    """
+    Like build_variants, but reuses the variants of another post with the same
+    image. Identical bytes share a name, so a re-rendered or re-uploaded image
+    is not encoded twice.
+    """
+    variants = (
+        Post.objects.filter(post_image=name)
+        .exclude(image_variants={})
+        .values_list("image_variants", flat=True)
+        .first()
+    )
+    return variants or build_variants(name)
+
+
+def set_image_variants(
+    name: str, variants: dict[str, str], replace: bool = False, **filters
+) -> int:
+    """
+    Attaches ``variants`` to the posts showing ``name`` that have none yet, or
+    to all of them with ``replace``.
+    """
+    posts = Post.objects.filter(post_image=name, **filters)
+    if replace:
+        release(
+            [
+                old
+                for old_variants in posts.values_list("image_variants", flat=True)
+                for old in old_variants.values()
+            ]
+        )
+    else:
+        posts = posts.filter(image_variants={})
+    updated = posts.update(image_variants=variants)
+    # update() skips the signals that count references.
+    retain(list(variants.values()) * updated)
+    return updated
+
+
+def _build_variants_task(post_id: int, name: str):
+    try:
+        # Skipped if the image was replaced in the meantime.
+        set_image_variants(name, get_or_build_variants(name), id=post_id)
+    except Exception:
+        logger.exception("Building image variants failed for post %s", post_id)
+    finally:
+        connection.close()
+
+
+def enqueue_image_variants(post: Post):
+    """Builds the variants of ``post.post_image`` once the transaction commits."""
+    if not post.post_image:
+        return
+    name = post.post_image.name
+    transaction.on_commit(
+        lambda: get_variant_executor().submit(_build_variants_task, post.id, name)
+    )
+
+
+def requeue_missing_variants(limit: int = 20) -> int:
+    """
+    Queues variant builds for up to ``limit`` posts whose image has gone
+    without variants for IMAGE_VARIANT_STALE_AFTER, because the process that
+    was building them stopped or the build failed. Each post is picked up at
+    most once per IMAGE_VARIANT_STALE_AFTER. Returns the number queued.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.IMAGE_VARIANT_STALE_AFTER)
+    missing = Q(image_variants={}, post_image__gt="", updated_at__lt=cutoff) & (
+        Q(variants_queued_at__lt=cutoff) | Q(variants_queued_at__isnull=True)
+    )
+    queued = 0
+    executor = get_variant_executor()
+    for post_id, name in Post.objects.filter(missing).values_list(
+        "id", "post_image"
+    )[:limit]:
+        # Conditional, so concurrent sweeps queue each post once.
+        if Post.objects.filter(missing, id=post_id).update(variants_queued_at=now):
+            executor.submit(_build_variants_task, post_id, name)
+            queued += 1
+    if queued:
+        logger.warning("Requeued variant builds for %d posts", queued)
+    return queued
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+from main.lru_cache import LRUCache
+
+
+def response_key(
+    model_name: str, system_instruction: str, history: list[dict], prompt: str
+) -> str:
+    """Identifies a model call by everything the model sees."""
+    payload = json.dumps(
+        [model_name, system_instruction, history, prompt],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Exact-match cache of raw model response text. Entries live in a local LRU
+    and, with ``alias``, also in that Django cache so every process shares
+    them. Both tiers expire entries ``ttl`` seconds after they were stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, alias: str = ""):
+        self.local = LRUCache(maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.alias = alias
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "bypasses": 0}
+
+    def shared(self):
+        return caches[self.alias] if self.alias else None
+
+    @staticmethod
+    def shared_key(key: str) -> str:
+        return f"llm-response:{key}"
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, key: str, use_cache: bool = True) -> str | None:
+        """With ``use_cache=False`` always misses, so the caller refreshes the entry."""
+        if not use_cache:
+            self._count("bypasses")
+            return None
+        text = self.local.get(key)
+        if text is None and (shared := self.shared()) is not None:
+            text = shared.get(self.shared_key(key))
+            if text is not None:
+                self.local.set(key, text)
+        self._count("misses" if text is None else "hits")
+        return text
+
+    def set(self, key: str, text: str):
+        self.local.set(key, text)
+        if (shared := self.shared()) is not None:
+            shared.set(self.shared_key(key), text, self.ttl)
+
+    async def aget(self, key: str, use_cache: bool = True) -> str | None:
+        if not use_cache:
+            self._count("bypasses")
+            return None
+        text = self.local.get(key)
+        if text is None and (shared := self.shared()) is not None:
+            text = await shared.aget(self.shared_key(key))
+            if text is not None:
+                self.local.set(key, text)
+        self._count("misses" if text is None else "hits")
+        return text
+
+    async def aset(self, key: str, text: str):
+        self.local.set(key, text)
+        if (shared := self.shared()) is not None:
+            await shared.aset(self.shared_key(key), text, self.ttl)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": stats["hits"] / lookups if lookups else None,
+            "local_size": len(self.local),
+            "local_maxsize": self.local.maxsize,
+            "ttl": self.ttl,
+            "shared": self.alias or None,
+        }
+
+    def clear(self):
+        # Only the local tier; shared entries still expire by TTL.
+        self.local.clear()
+        with self._lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+
+response_cache = ResponseCache(
+    settings.LLM_RESPONSE_CACHE_SIZE,
+    settings.LLM_RESPONSE_CACHE_TTL,
+    settings.LLM_RESPONSE_CACHE_SHARED,
+)
@@ -0,0 +1,155 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.db.models import Count
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from main.models import Post, Reminder
+from main.reminder_dispatch import due_by
+
+# The indexes migration 0016 replaced, as they were before it.
+OLD_INDEXES = [
+    (Post, ["workspace", "schedule_time", "id"], "event_workspa_f698f0_idx"),
+    (
+        Post,
+        ["workspace", "assignee", "schedule_time", "id"],
+        "event_workspa_dfaa7c_idx",
+    ),
+    (Post, ["is_completed"], "event_is_comp_04bfdf_idx"),
+    (Post, ["is_deleted"], "event_is_dele_5ebfe1_idx"),
+    (Reminder, ["reminder_time"], "reminder_reminde_d65b1b_idx"),
+    (Reminder, ["is_notified"], "reminder_is_noti_c1d6d4_idx"),
+    (Reminder, ["snooze_time"], "reminder_snooze__05e229_idx"),
+]
+NEW_INDEXES = [
+    (Post, "event_live_schedule_idx"),
+    (Post, "event_live_assignee_idx"),
+    (Reminder, "reminder_pending_idx"),
+    (Reminder, "reminder_snoozed_idx"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAINs and times the scheduler and calendar queries with the current "
+        "indexes, then with the indexes they replaced. The index swap happens in "
+        "a transaction that is rolled back. Run it on seeded data (seed_data)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--explain", action="store_true", help="Print the query plans."
+        )
+
+    def handle(self, *args, **options):
+        workspace_id, assignee_id = self.busiest_workspace()
+        now = timezone.now()
+        queries = {
+            "scheduler: claim due chunk": Reminder.objects.filter(due_by(now))
+            .order_by(Coalesce("snooze_time", "reminder_time"))
+            .values_list("id")[: settings.REMINDER_DISPATCH_CHUNK_SIZE],
+            "scheduler: timer window": Reminder.objects.filter(
+                due_by(now + timedelta(seconds=settings.REMINDER_TIMER_HORIZON))
+            )
+            .order_by()
+            .values_list("id", "reminder_time", "snooze_time"),
+            "calendar: next page": self.calendar(workspace_id, now),
+            "calendar: assignee page": self.calendar(
+                workspace_id, now, assignee_id=assignee_id
+            ),
+        }
+
+        # SQLite's schema editor refuses to run inside a transaction with
+        # foreign key checks on; elsewhere this is a no-op.
+        disabled = connection.disable_constraint_checking()
+        try:
+            with transaction.atomic():
+                self.analyze()
+                after = self.measure(queries, options)
+                with connection.schema_editor() as editor:
+                    for model, name in NEW_INDEXES:
+                        editor.remove_index(
+                            model,
+                            next(i for i in model._meta.indexes if i.name == name),
+                        )
+                    for model, fields, name in OLD_INDEXES:
+                        editor.add_index(
+                            model, models.Index(fields=fields, name=name)
+                        )
+                self.analyze()
+                before = self.measure(queries, options)
+                transaction.set_rollback(True)
+        finally:
+            if disabled:
+                connection.enable_constraint_checking()
+
+        for label in queries:
+            (before_time, before_plan), (after_time, after_plan) = (
+                before[label],
+                after[label],
+            )
+            self.stdout.write(
+                f"{label}: before {before_time * 1000:.2f} ms, "
+                f"after {after_time * 1000:.2f} ms "
+                f"({before_time / after_time:.1f}x)"
+            )
+            if options["explain"]:
+                self.stdout.write(f"  before:\n{self.indent(before_plan)}")
+                self.stdout.write(f"  after:\n{self.indent(after_plan)}")
+
+    @staticmethod
+    def busiest_workspace() -> tuple[int, int]:
+        row = (
+            Post.objects.values("workspace_id", "assignee_id")
+            .annotate(posts=Count("id"))
+            .order_by("-posts")
+            .first()
+        )
+        if row is None:
+            raise CommandError("No posts found; run seed_data first.")
+        return row["workspace_id"], row["assignee_id"]
+
+    @staticmethod
+    def calendar(workspace_id, now, **filters):
+        return (
+            Post.objects.filter(
+                workspace_id=workspace_id,
+                is_deleted=False,
+                schedule_time__gte=now,
+                **filters,
+            )
+            .order_by("schedule_time", "id")
+            .values_list("id", "schedule_time")[:101]
+        )
+
+    @staticmethod
+    def analyze():
+        # Refresh planner statistics for the swapped indexes.
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def measure(self, queries, options):
+        explain_options = {}
+        if connection.vendor == "postgresql":
+            explain_options["analyze"] = True
+        results = {}
+        for label, queryset in queries.items():
+            queryset = queryset.all()
+            plan = queryset.explain(**explain_options)
+            best = None
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                list(queryset.all())
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results[label] = (best, plan)
+        return results
+
+    @staticmethod
+    def indent(text):
+        return "\n".join(f"    {line}" for line in text.splitlines())
@@ -0,0 +1,104 @@
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+
+from main.models import Post, Reminder, User, Workspace
+from main.notification_transport import FakeTransport
+from main.reminder_dispatch import dispatch_due_reminders, due_by
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures reminder dispatch throughput against the in-process fake "
+        "transport. The rows it creates are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reminders", type=int, default=5000)
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument(
+            "--invalid-users",
+            type=int,
+            default=10,
+            help="Users whose token the fake transport reports as unregistered.",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=None,
+            help="Seconds per batch round trip (FAKE_NOTIFICATION_LATENCY).",
+        )
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if Reminder.objects.filter(due_by(now)).exists():
+            raise CommandError(
+                "There are due reminders in this database; the benchmark would "
+                "mark them as notified. Run it against an empty database."
+            )
+
+        User.objects.bulk_create(
+            [
+                User(
+                    email=f"benchmark-dispatch-{i}@example.com",
+                    username=f"benchmark-dispatch-{i}",
+                    fcm_token=f"benchmark-token-{i}",
+                )
+                for i in range(options["users"])
+            ]
+        )
+        users = list(User.objects.filter(username__startswith="benchmark-dispatch-"))
+        workspace = Workspace.objects.create(name="Benchmark", owner=users[0])
+        try:
+            due = now - timedelta(seconds=1)
+            posts = Post.objects.bulk_create(
+                [
+                    Post(
+                        workspace=workspace,
+                        creator=users[i % len(users)],
+                        assignee=users[i % len(users)],
+                        schedule_time=now,
+                        post_text=f"Benchmark post {i}",
+                    )
+                    for i in range(options["reminders"])
+                ],
+                batch_size=5000,
+            )
+            posts = Post.objects.filter(workspace=workspace).select_related("creator")
+            Reminder.objects.bulk_create(
+                [
+                    Reminder(creator=post.creator, post=post, reminder_time=due)
+                    for post in posts
+                ],
+                batch_size=5000,
+            )
+
+            transport = FakeTransport(
+                latency=options["latency"],
+                invalid_tokens=[
+                    user.fcm_token for user in users[: options["invalid_users"]]
+                ],
+            )
+            start = time.perf_counter()
+            dispatched = dispatch_due_reminders(
+                chunk_size=options["chunk_size"],
+                workers=options["workers"],
+                transport=transport,
+            )
+            elapsed = time.perf_counter() - start
+
+            cleared = User.objects.filter(
+                id__in=[user.id for user in users], fcm_token__isnull=True
+            ).count()
+            self.stdout.write(
+                f"{dispatched} reminders in {elapsed:.2f} s "
+                f"({dispatched / elapsed:.0f}/s), {transport.batches} batches, "
+                f"{len(transport.delivered)} delivered, {cleared} tokens cleared"
+            )
+        finally:
+            workspace.delete()
+            User.objects.filter(id__in=[user.id for user in users]).delete()
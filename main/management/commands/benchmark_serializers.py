@@ -0,0 +1,100 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from main.models import Post, PostType, Reminder, User, Workspace
+from main.serializers.post_serializer import PostSerializer
+from main.serializers.reminder_serializer import ReminderSerializer
+from main.serializers.values_serializer import (
+    PostValuesSerializer,
+    ReminderValuesSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the ModelSerializer and .values() list serializers for posts "
+        "and reminders. Rows are created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        # Absolute file URLs validate the request's host, which is
+        # "testserver" for RequestFactory and rarely allowed in production.
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            self.run(options["rows"], options["repeat"])
+
+    def run(self, rows, repeat):
+        context = {"request": RequestFactory().get("/api/")}
+        with transaction.atomic():
+            user = User.objects.create(
+                email="benchmark-serializers@example.com", username="benchmark"
+            )
+            workspace = Workspace.objects.create(name="Benchmark", owner=user)
+            now = timezone.now()
+            posts = Post.objects.bulk_create(
+                [
+                    Post(
+                        workspace=workspace,
+                        creator=user,
+                        assignee=user,
+                        schedule_time=now,
+                        post_type=PostType.image,
+                        post_image=f"workspace/{workspace.id}/posts/{i}/{i}.png",
+                        post_text="Benchmark post",
+                        description="Benchmark description",
+                    )
+                    for i in range(rows)
+                ],
+                batch_size=5000,
+            )
+            Reminder.objects.bulk_create(
+                [
+                    Reminder(creator=user, post=post, reminder_time=now)
+                    for post in posts
+                ],
+                batch_size=5000,
+            )
+
+            posts = Post.objects.filter(workspace=workspace)
+            reminders = Reminder.objects.filter(post__workspace=workspace)
+            self.compare(
+                "posts",
+                lambda: PostSerializer(posts, many=True, context=context).data,
+                lambda: PostValuesSerializer(posts, context=context).data,
+                repeat,
+            )
+            self.compare(
+                "reminders",
+                lambda: ReminderSerializer(reminders, many=True, context=context).data,
+                lambda: ReminderValuesSerializer(reminders, context=context).data,
+                repeat,
+            )
+            transaction.set_rollback(True)
+
+    def compare(self, label, model_serializer, values_serializer, repeat):
+        model_time, model_data = self.best_of(model_serializer, repeat)
+        values_time, values_data = self.best_of(values_serializer, repeat)
+        same = [dict(row) for row in model_data] == values_data
+        self.stdout.write(
+            f"{label}: {len(values_data)} rows, ModelSerializer {model_time * 1000:.0f} ms, "
+            f"values {values_time * 1000:.0f} ms ({model_time / values_time:.1f}x), "
+            f"identical output: {same}"
+        )
+
+    @staticmethod
+    def best_of(func, repeat):
+        best, data = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, data
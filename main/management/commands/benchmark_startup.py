@@ -0,0 +1,71 @@
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "content_chronicle.settings")
+{code}
+print(time.perf_counter() - start)
+"""
+
+PROFILES = {
+    "web worker": (
+        "from content_chronicle.wsgi import application\n"
+        "from django.urls import resolve\n"
+        "resolve('/api/user/login')"
+    ),
+    "scheduler": (
+        "import django\n"
+        "django.setup()\n"
+        "import main.management.commands.start_scheduler"
+    ),
+}
+
+# What every process used to load at startup: the SDKs, the Gemini response
+# schema and faker. Firebase initialization itself is left out because it
+# needs a service account file.
+EAGER = (
+    "import firebase_admin.messaging, google.generativeai, openai, faker\n"
+    "from main.generate_post_ai import get_generation_config\n"
+    "get_generation_config()"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Times cold startup of a web worker and the scheduler in fresh "
+        "interpreters, with SDK clients loaded lazily and eagerly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        for name, code in PROFILES.items():
+            lazy = self.time(code, options["repeat"])
+            eager = self.time(f"{code}\n{EAGER}", options["repeat"])
+            self.stdout.write(
+                f"{name}: lazy {lazy * 1000:.0f} ms, eager {eager * 1000:.0f} ms "
+                f"({eager - lazy:.2f} s saved per boot)"
+            )
+
+    @staticmethod
+    def time(code: str, repeat: int) -> float:
+        script = SCRIPT.format(code=code)
+        samples = []
+        for _ in range(repeat):
+            result = subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            samples.append(float(result.stdout.strip().splitlines()[-1]))
+        return statistics.median(samples)
@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from main.image_variants import (
+    build_variants,
+    get_or_build_variants,
+    set_image_variants,
+)
+from main.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the thumbnail, medium and WebP variants of post images that do "
+        "not have them yet. Posts sharing an image share its variants, so each "
+        "distinct file is encoded once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Re-encode the variants of every post image.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.IMAGE_VARIANT_PROCESSES,
+            help="Images encoded at the same time.",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(post_image="").exclude(post_image__isnull=True)
+        if not options["rebuild"]:
+            posts = posts.filter(image_variants={})
+        names = list(posts.values_list("post_image", flat=True).distinct())
+        self.stdout.write(f"{len(names)} images to encode")
+        build = build_variants if options["rebuild"] else get_or_build_variants
+
+        def build_one(name):
+            try:
+                return name, build(name), None
+            except Exception as e:
+                return name, None, e
+
+        start = time.perf_counter()
+        updated = failed = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            for name, variants, error in executor.map(build_one, names):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f"{name}: {error}")
+                    continue
+                updated += set_image_variants(
+                    name, variants, replace=options["rebuild"]
+                )
+        self.stdout.write(
+            f"Encoded {len(names) - failed} images for {updated} posts in "
+            f"{time.perf_counter() - start:.2f} s ({failed} failed)"
+        )
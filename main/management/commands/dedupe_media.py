@@ -0,0 +1,79 @@
+import time
+
+from django.core.management import BaseCommand
+
+from main.media_refs import collect_garbage, recount_references
+from main.media_storage import get_media_storage
+from main.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves post images, videos and image variants saved before media was "
+        "content-addressed into the content-addressed store, so identical files "
+        "are kept once, then rebuilds the reference counts and deletes media "
+        "nothing references. Run it while posts are not being written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-originals",
+            action="store_true",
+            help="Leave the files that were copied into the store in place.",
+        )
+        parser.add_argument(
+            "--grace",
+            type=float,
+            default=None,
+            help="Seconds unreferenced media is kept (MEDIA_GC_GRACE).",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        storage = get_media_storage()
+        moved = {}
+        missing = set()
+        before = 0
+
+        def move(name):
+            nonlocal before
+            if not name or storage.is_content_addressed(name) or name in missing:
+                return name
+            if name not in moved:
+                if not storage.exists(name):
+                    missing.add(name)
+                    self.stderr.write(f"missing: {name}")
+                    return name
+                before += storage.size(name)
+                with storage.open(name) as f:
+                    moved[name] = storage.save(name, f)
+            return moved[name]
+
+        rows = Post.objects.values_list(
+            "id", "post_image", "post_video", "image_variants"
+        )
+        updated = 0
+        for post_id, image, video, variants in rows.iterator(chunk_size=2000):
+            new_variants = {variant: move(name) for variant, name in variants.items()}
+            new = (move(image), move(video), new_variants)
+            if new != (image, video, variants):
+                # update() keeps the reference signals out; counts are rebuilt below.
+                updated += Post.objects.filter(id=post_id).update(
+                    post_image=new[0], post_video=new[1], image_variants=new[2]
+                )
+
+        blobs = recount_references()
+        after = sum(storage.size(name) for name in set(moved.values()))
+        if not options["keep_originals"]:
+            for name in moved:
+                storage.delete(name)
+        files, freed = collect_garbage(options["grace"])
+        self.stdout.write(
+            f"Moved {len(moved)} files ({before / 2**20:.1f} MiB) into "
+            f"{len(set(moved.values()))} blobs ({after / 2**20:.1f} MiB) for "
+            f"{updated} posts; {blobs} blobs referenced, {len(missing)} files missing."
+        )
+        self.stdout.write(
+            f"Deleted {files} unreferenced blobs ({freed / 2**20:.1f} MiB) in "
+            f"{time.perf_counter() - start:.2f} s"
+        )
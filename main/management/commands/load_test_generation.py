@@ -0,0 +1,131 @@
+import asyncio
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import httpx
+from django.core.management import BaseCommand, CommandError
+
+ENDPOINTS = {
+    # name: (async path, sync path), relative to the workspace
+    "generate": ("generate-posts-ai/async", None),
+    "regenerate": (
+        "posts/{post_id}/regenerate-ai/async",
+        "posts/{post_id}/regenerate-ai",
+    ),
+    "image": (
+        "posts/{post_id}/generate-post-image-ai/async",
+        "posts/{post_id}/generate-post-image-ai",
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires concurrent requests at an AI endpoint and reports throughput and "
+        "latency. Run it against the WSGI and the ASGI deployment, with "
+        "GENERATION_BACKEND=main.generation_backends.FakeBackend and "
+        "FAKE_GENERATION_LATENCY set on the server, to compare how many "
+        "generations each holds in flight."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument(
+            "--in-process",
+            action="store_true",
+            help="Serve requests from content_chronicle.asgi in this process.",
+        )
+        parser.add_argument("--endpoint", choices=ENDPOINTS, default="generate")
+        parser.add_argument(
+            "--sync", action="store_true", help="Hit the sync view instead."
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--timeout", type=float, default=300)
+
+    def handle(self, *args, **options):
+        async_path, sync_path = ENDPOINTS[options["endpoint"]]
+        path = sync_path if options["sync"] else async_path
+        if path is None:
+            raise CommandError(
+                f"{options['endpoint']} has no sync variant; that view queues a job."
+            )
+        asyncio.run(self.run(path, options))
+
+    async def run(self, path, options):
+        transport = None
+        base_url = options["base_url"]
+        if options["in_process"]:
+            from content_chronicle.asgi import application
+
+            transport = httpx.ASGITransport(app=application)
+            base_url = "http://localhost"
+        async with httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            timeout=options["timeout"],
+            limits=httpx.Limits(max_connections=options["concurrency"]),
+        ) as client:
+            url = await self.setup(client, path)
+            latencies, statuses, elapsed = await self.fire(
+                client, url, options["requests"], options["concurrency"]
+            )
+        self.report(latencies, statuses, elapsed, options)
+
+    async def setup(self, client, path):
+        # A throwaway user gets its own workspace on registration.
+        name = f"load-test-{uuid.uuid4().hex[:12]}"
+        response = await client.post(
+            "/api/user/register",
+            json={"username": name, "email": f"{name}@example.com", "password": name},
+        )
+        response.raise_for_status()
+        body = response.json()
+        client.headers["Authorization"] = f"Token {body['token']}"
+        workspace_id = body["user"]["workspaces"][0]["id"]
+        post_id = None
+        if "{post_id}" in path:
+            response = await client.post(
+                f"/api/workspace/{workspace_id}/generate-posts-ai/async", json={}
+            )
+            response.raise_for_status()
+            post_id = response.json()[0]["id"]
+        return f"/api/workspace/{workspace_id}/" + path.format(post_id=post_id)
+
+    async def fire(self, client, url, total, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        statuses = Counter()
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(url, json={"prompt": "load test"})
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return latencies, statuses, time.perf_counter() - start
+
+    def report(self, latencies, statuses, elapsed, options):
+        latencies.sort()
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        self.stdout.write(
+            f"{options['endpoint']} ({'sync' if options['sync'] else 'async'}): "
+            f"{len(latencies)} requests at concurrency {options['concurrency']} "
+            f"in {elapsed:.2f} s, {len(latencies) / elapsed:.1f} req/s"
+        )
+        self.stdout.write(
+            f"latency ms: p50 {percentile(0.5):.0f}, p95 {percentile(0.95):.0f}, "
+            f"p99 {percentile(0.99):.0f}, mean {statistics.mean(latencies) * 1000:.0f}"
+        )
+        self.stdout.write(f"responses: {dict(statuses)}")
@@ -0,0 +1,367 @@
+import json
+import logging
+import multiprocessing
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import faker
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from main.models import (
+    Post,
+    PostGenerationSession,
+    PostGenerationSessionHistory,
+    PostType,
+    Reminder,
+    User,
+    Workspace,
+)
+from main.media_refs import post_media_names, retain
+from main.post_seeding import get_image_pool
+
+logger = logging.getLogger(__name__)
+
+ROLES = [
+    "designer",
+    "copywriter",
+    "social media manager",
+    "marketing manager",
+    "video editor",
+    None,
+]
+ROLE_WEIGHTS = [25, 25, 20, 10, 10, 10]
+INDUSTRIES = ["retail", "food", "fitness", "fashion", "education", "tech", "travel"]
+POST_TYPE_WEIGHTS = {PostType.image: 70, PostType.text: 20, PostType.video: 10}
+TEXT_POOL_SIZE = 500
+
+
+class Seeder:
+    """
+    Generates one workspace at a time. Every workspace draws from its own RNG
+    seeded with ``(seed, workspace index)``, so the data set only depends on
+    ``--seed`` and the sizes, not on how work is split across processes.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.seed = options["seed"]
+        # Shared by all workers so every workspace sees the same "now".
+        self.now = options["now"]
+        self.password = make_password("password")
+        self.use_copy = options["copy"] and connection.vendor == "postgresql"
+        self.images = options["image_pool"]
+
+        f = faker.Faker()
+        f.seed_instance(self.seed)
+        self.sentences = [f.sentence(nb_words=12) for _ in range(TEXT_POOL_SIZE)]
+        self.paragraphs = [f.paragraph(nb_sentences=4) for _ in range(TEXT_POOL_SIZE)]
+        self.names = [f.name() for _ in range(TEXT_POOL_SIZE)]
+        self.companies = [f.company() for _ in range(TEXT_POOL_SIZE)]
+
+    def seed_workspaces(self, indexes) -> dict:
+        counts = {
+            "users": 0,
+            "workspaces": 0,
+            "posts": 0,
+            "reminders": 0,
+            "media": Counter(),
+        }
+        with transaction.atomic():
+            for index in indexes:
+                for key, value in self.seed_workspace(index).items():
+                    counts[key] += value
+        return counts
+
+    def seed_workspace(self, index) -> dict:
+        options = self.options
+        rng = random.Random(f"{self.seed}:{index}")
+
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f"seed{self.seed}.w{index}.u{j}@example.com",
+                    username=rng.choice(self.names),
+                    password=self.password,
+                    role=rng.choices(ROLES, ROLE_WEIGHTS)[0],
+                    # No fcm_token: the reminder dispatcher would send made-up
+                    # tokens to FCM. benchmark_reminder_dispatch brings its own.
+                )
+                for j in range(options["members"])
+            ]
+        )
+        workspace = Workspace.objects.create(
+            name=rng.choice(self.companies),
+            owner=users[0],
+            industry=rng.choice(INDUSTRIES),
+            description=rng.choice(self.sentences),
+        )
+        self.insert(
+            User.workspaces.through,
+            [
+                User.workspaces.through(user_id=user.id, workspace_id=workspace.id)
+                for user in users
+            ],
+        )
+
+        sessions = PostGenerationSession.objects.bulk_create(
+            [
+                PostGenerationSession(workspace=workspace, creator=rng.choice(users))
+                for _ in range(options["sessions"])
+            ]
+        )
+        self.insert(
+            PostGenerationSessionHistory,
+            [
+                PostGenerationSessionHistory(
+                    session=session,
+                    prompt=rng.choice(self.sentences),
+                    response=json.dumps({"response": [rng.choice(self.paragraphs)]}),
+                )
+                for session in sessions
+                for _ in range(rng.randint(1, 4))
+            ],
+        )
+
+        # A few members do most of the work.
+        assignee_weights = [1 / (rank + 1) for rank in range(len(users))]
+        post_types = list(POST_TYPE_WEIGHTS)
+        posts = []
+        for _ in range(options["posts"]):
+            schedule_time = self.now + timedelta(
+                days=rng.triangular(-options["past_days"], options["future_days"], 0),
+                hours=rng.gauss(0, 3),
+            )
+            post_type = rng.choices(post_types, POST_TYPE_WEIGHTS.values())[0]
+            image, variants = (
+                rng.choice(self.images) if post_type == PostType.image else (None, {})
+            )
+            is_past = schedule_time < self.now
+            is_completed = is_past and rng.random() < 0.85
+            posts.append(
+                Post(
+                    workspace=workspace,
+                    creator=rng.choice(users),
+                    assignee=rng.choices(users, assignee_weights)[0],
+                    schedule_time=schedule_time,
+                    post_type=post_type,
+                    post_image=image,
+                    image_variants=variants,
+                    post_text=rng.choice(self.sentences),
+                    description=rng.choice(self.paragraphs),
+                    is_completed=is_completed,
+                    completed_at=schedule_time if is_completed else None,
+                    is_deleted=rng.random() < 0.03,
+                    session=(
+                        rng.choice(sessions)
+                        if sessions and rng.random() < 0.3
+                        else None
+                    ),
+                )
+            )
+        self.insert(Post, posts, with_ids=True)
+
+        reminders = []
+        for post in posts:
+            for _ in range(self.reminder_count(rng)):
+                reminder_time = post.schedule_time - timedelta(
+                    minutes=rng.choice([10, 30, 60, 120, 1440])
+                )
+                reminders.append(
+                    Reminder(
+                        creator=rng.choice(users),
+                        post_id=post.id,
+                        reminder_time=reminder_time,
+                        is_notified=reminder_time < self.now,
+                        snooze_time=(
+                            reminder_time + timedelta(minutes=15)
+                            if rng.random() < 0.05
+                            else None
+                        ),
+                    )
+                )
+        self.insert(Reminder, reminders)
+
+        return {
+            "users": len(users),
+            "workspaces": 1,
+            "posts": len(posts),
+            "reminders": len(reminders),
+            "media": Counter(name for post in posts for name in post_media_names(post)),
+        }
+
+    def reminder_count(self, rng) -> int:
+        mean = self.options["reminders"]
+        count = int(mean)
+        return count + (rng.random() < mean - count)
+
+    def insert(self, model, objs, with_ids=False):
+        if not objs:
+            return
+        if not self.use_copy:
+            model.objects.bulk_create(objs, batch_size=self.options["batch_size"])
+            return
+        if with_ids:
+            for obj, pk in zip(objs, self.allocate_ids(model, len(objs))):
+                obj.pk = pk
+        fields = [
+            field
+            for field in model._meta.concrete_fields
+            if with_ids or not field.primary_key
+        ]
+        columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(
+                f"COPY {connection.ops.quote_name(model._meta.db_table)} "
+                f"({columns}) FROM STDIN"
+            ) as copy:
+                for obj in objs:
+                    copy.write_row(
+                        [
+                            field.get_db_prep_save(
+                                field.pre_save(obj, True), connection
+                            )
+                            for field in fields
+                        ]
+                    )
+
+    @staticmethod
+    def allocate_ids(model, count) -> list[int]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+                "FROM generate_series(1, %s)",
+                [model._meta.db_table, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def parse_now(value: str) -> datetime:
+    now = parse_datetime(value)
+    if now is None:
+        raise ValueError(value)
+    if timezone.is_naive(now):
+        now = timezone.make_aware(now)
+    return now
+
+
+_seeder: Seeder | None = None
+
+
+def _init_worker(options):
+    global _seeder
+    # Connections inherited from the parent must not be shared.
+    connections.close_all()
+    _seeder = Seeder(options)
+
+
+def _seed_chunk(indexes) -> dict:
+    return _seeder.seed_workspaces(indexes)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with synthetic workspaces, members, posts, reminders "
+        "and generation sessions for load testing and profiling."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--now",
+            type=parse_now,
+            default=None,
+            help=(
+                "ISO 8601 time the schedule is built around, e.g. "
+                "2026-01-01T12:00:00Z. Defaults to the current time; pass it to "
+                "reproduce a data set."
+            ),
+        )
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="Use generated placeholder images instead of downloading them.",
+        )
+        parser.add_argument("--workspaces", type=int, default=100)
+        parser.add_argument(
+            "--members", type=int, default=8, help="Members per workspace."
+        )
+        parser.add_argument(
+            "--posts", type=int, default=1000, help="Posts per workspace."
+        )
+        parser.add_argument(
+            "--reminders",
+            type=float,
+            default=1.5,
+            help="Average reminders per post.",
+        )
+        parser.add_argument(
+            "--sessions", type=int, default=5, help="Generation sessions per workspace."
+        )
+        parser.add_argument("--past-days", type=int, default=180)
+        parser.add_argument("--future-days", type=int, default=90)
+        parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+        parser.add_argument(
+            "--chunk", type=int, default=5, help="Workspaces per transaction."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--no-copy",
+            dest="copy",
+            action="store_false",
+            help="Use bulk_create instead of COPY on PostgreSQL.",
+        )
+
+    def handle(self, *args, **options):
+        indexes = list(range(options["workspaces"]))
+        chunks = [
+            indexes[i : i + options["chunk"]]
+            for i in range(0, len(indexes), options["chunk"])
+        ]
+        totals = {
+            "users": 0,
+            "workspaces": 0,
+            "posts": 0,
+            "reminders": 0,
+            "media": Counter(),
+        }
+        start = time.monotonic()
+        # Demo images and their variants, already in the content-addressed
+        # store. Workers pick from this list by position, so it must be
+        # loaded before forking.
+        options["image_pool"] = list(get_image_pool(options["offline"]).items())
+        if options["now"] is None:
+            options["now"] = timezone.now()
+        self.stdout.write(f"Seeding around --now {options['now'].isoformat()}")
+
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(
+            processes=options["processes"],
+            initializer=_init_worker,
+            initargs=(options,),
+        ) as pool:
+            for counts in pool.imap_unordered(_seed_chunk, chunks):
+                for key, value in counts.items():
+                    totals[key] += value
+                self.stdout.write(
+                    f"{totals['workspaces']}/{len(indexes)} workspaces, "
+                    f"{totals['posts']} posts, {totals['reminders']} reminders "
+                    f"({time.monotonic() - start:.1f}s)"
+                )
+        # Rows were written without signals; count the references once here
+        # rather than contending on the same blob rows from every worker.
+        retain(list(totals["media"].elements()))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {totals['users']} users, {totals['workspaces']} workspaces, "
+                f"{totals['posts']} posts and {totals['reminders']} reminders "
+                f"in {time.monotonic() - start:.1f}s."
+            )
+        )
@@ -0,0 +1,54 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from main.db_pool import check_pool_size
+from main.generation_jobs import work
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Runs a pool of workers processing queued AI post generation jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.GENERATION_WORKERS,
+            help="Number of worker threads in this process.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.GENERATION_JOB_POLL_INTERVAL,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        check_pool_size(options["workers"], "start_generation_workers")
+        stop_event = threading.Event()
+        threads = [
+            threading.Thread(
+                target=work,
+                args=(stop_event, options["poll_interval"]),
+                name=f"generation-worker-{i}",
+                daemon=True,
+            )
+            for i in range(options["workers"])
+        ]
+        for thread in threads:
+            thread.start()
+        logger.info("Started %d generation workers.", len(threads))
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            logger.info("Stopping generation workers.")
+            stop_event.set()
+            for thread in threads:
+                thread.join()
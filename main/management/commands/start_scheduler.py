@@ -1,64 +1,68 @@
+import functools
 import logging
+import signal
+import threading
 
-import firebase_admin.messaging
-from apscheduler.schedulers.blocking import BlockingScheduler
-from apscheduler.triggers.cron import CronTrigger
 from django.core.management import BaseCommand
-from django.utils import timezone
-from django_apscheduler.jobstores import DjangoJobStore
+from django.db import connection
 
 from content_chronicle import settings
-from main.models import Reminder
+from main.db_pool import check_pool_size
+from main.reminder_dispatch import dispatch_due_reminders
+from main.reminder_timer import ReminderTimer
 
 logger = logging.getLogger(__name__)
 
-def send_reminder_notification(reminder: Reminder):
 
-    fcm_token = reminder.post.creator.fcm_token
-    if not fcm_token:
-        return
-    firebase_admin.messaging.send(
-        firebase_admin.messaging.Message(
-            notification=firebase_admin.messaging.Notification(
-                title="Reminder",
-                body=f"Reminder: {reminder.post.post_text}",
-            ),
-            token=fcm_token,
-        )
-    )
-
-
-def check_reminders():
-    reminders = Reminder.objects.filter(
-        is_notified=False, reminder_time__lte=timezone.now()
+class Command(BaseCommand):
+    help = (
+        "Sends reminders as their reminder or snooze time arrives. Deadlines "
+        "are held in an in-memory timer instead of polling every minute."
     )
-    sent_reminders = []
-
-    for reminder in reminders:
-        send_reminder_notification(reminder)
-        reminder.is_notified = True
-        sent_reminders.append(reminder)
-
-    Reminder.objects.bulk_update(sent_reminders, ["is_notified"])
-
 
-
-class Command(BaseCommand):
-    help = "Runs APScheduler."
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.REMINDER_DISPATCH_WORKERS,
+            help="Threads claiming reminder chunks in this process.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.REMINDER_DISPATCH_CHUNK_SIZE,
+            help="Reminders claimed and marked per transaction.",
+        )
+        parser.add_argument(
+            "--reload-interval",
+            type=float,
+            default=settings.REMINDER_TIMER_RELOAD_INTERVAL,
+            help="Seconds between re-reads of the upcoming deadlines.",
+        )
 
     def handle(self, *args, **options):
-
-        scheduler = BlockingScheduler(timezone=settings.TIME_ZONE)
-        scheduler.add_jobstore(DjangoJobStore(), "default")
-
-        scheduler.add_job(
-            check_reminders,
-            trigger=CronTrigger(minute="*"),
-            id="check_reminders",
-            max_instances=1,
-            replace_existing=True,
+        # Dispatch threads plus the timer thread; LISTEN uses its own connection.
+        check_pool_size(options["workers"] + 1, "start_scheduler")
+        timer = ReminderTimer(
+            dispatch=functools.partial(
+                dispatch_due_reminders,
+                chunk_size=options["chunk_size"],
+                workers=options["workers"],
+            ),
+            reload_interval=options["reload_interval"],
         )
-        logger.info('Added job "check_reminders".')
-
-        scheduler.start()
-        logger.info("Scheduler started!")
+        if connection.vendor == "postgresql":
+            threading.Thread(
+                target=timer.listen, name="reminder-listen", daemon=True
+            ).start()
+        else:
+            logger.info(
+                "LISTEN/NOTIFY unavailable; reminder changes are picked up "
+                "every %s s.",
+                timer.reload_interval,
+            )
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: timer.stop())
+        logger.info("Reminder timer started!")
+        timer.run()
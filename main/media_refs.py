@@ -0,0 +1,162 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from main.media_storage import get_media_storage
+from main.models import ImageCacheEntry, MediaBlob, Post
+
+MEDIA_FIELDS = ("post_image", "post_video", "image_variants")
+
+
+def media_names(post_image, post_video, image_variants) -> list[str]:
+    """Content-addressed names referenced by one post's media columns."""
+    storage = get_media_storage()
+    names = [post_image, post_video, *(image_variants or {}).values()]
+    return [name for name in names if name and storage.is_content_addressed(name)]
+
+
+def post_media_names(post: Post) -> list[str]:
+    return media_names(
+        post.post_image.name, post.post_video.name, post.image_variants
+    )
+
+
+def _by_count(names) -> dict[int, list[str]]:
+    groups = {}
+    for name, count in Counter(names).items():
+        groups.setdefault(count, []).append(name)
+    return groups
+
+
+def retain(names):
+    """Adds one reference per occurrence of each name, creating missing blobs."""
+    if not names:
+        return
+    storage = get_media_storage()
+    MediaBlob.objects.bulk_create(
+        [
+            MediaBlob(name=name, size=storage.size(name))
+            for name in set(names)
+            if storage.exists(name)
+        ],
+        ignore_conflicts=True,
+    )
+    now = timezone.now()
+    for count, group in _by_count(names).items():
+        MediaBlob.objects.filter(name__in=group).update(
+            refcount=F("refcount") + count, updated_at=now
+        )
+
+
+def release(names):
+    """
+    Drops one reference per occurrence of each name. Files are left in place
+    until collect_garbage finds them unreferenced past MEDIA_GC_GRACE.
+    """
+    now = timezone.now()
+    for count, group in _by_count(names).items():
+        MediaBlob.objects.filter(name__in=group).update(
+            refcount=Greatest(F("refcount") - count, 0), updated_at=now
+        )
+
+
+def retain_posts(posts):
+    """For rows written without signals, e.g. with bulk_create or update()."""
+    retain([name for post in posts for name in post_media_names(post)])
+
+
+def recount_references() -> int:
+    """
+    Rebuilds every refcount from the post rows and image cache entries;
+    returns the number of blobs.
+    Run it while nothing else writes posts, or counts changed meanwhile drift.
+    """
+    counts = Counter()
+    for row in Post.objects.values_list(*MEDIA_FIELDS).iterator(chunk_size=2000):
+        counts.update(media_names(*row))
+    storage = get_media_storage()
+    # Cached generated images hold a reference of their own.
+    for image in ImageCacheEntry.objects.values_list("image", flat=True).iterator():
+        if storage.is_content_addressed(image):
+            counts[image] += 1
+    with transaction.atomic():
+        MediaBlob.objects.bulk_create(
+            [
+                MediaBlob(name=name, size=storage.size(name))
+                for name in counts
+                if storage.exists(name)
+            ],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+        MediaBlob.objects.update(refcount=0, updated_at=timezone.now())
+        for count, group in _by_count(counts.elements()).items():
+            for start in range(0, len(group), 1000):
+                MediaBlob.objects.filter(name__in=group[start : start + 1000]).update(
+                    refcount=count
+                )
+    return len(counts)
+
+
+def collect_garbage(grace: float | None = None) -> tuple[int, int]:
+    """Deletes blobs unreferenced for ``grace`` seconds; returns (files, bytes)."""
+    if grace is None:
+        grace = settings.MEDIA_GC_GRACE
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    storage = get_media_storage()
+    files = size = 0
+    with transaction.atomic():
+        blobs = list(
+            MediaBlob.objects.select_for_update(skip_locked=True).filter(
+                refcount=0, updated_at__lt=cutoff
+            )
+        )
+        for blob in blobs:
+            # Saving the same bytes again touches the file; leave it for
+            # the reference that save is about to add.
+            if storage.exists(blob.name):
+                if storage.get_modified_time(blob.name) >= cutoff:
+                    continue
+                storage.delete(blob.name)
+            files += 1
+            size += blob.size
+            blob.delete()
+    return files, size
+
+
+def _post_saving(sender, instance, raw, update_fields, **kwargs):
+    if raw or update_fields is not None and not set(update_fields) & set(MEDIA_FIELDS):
+        # Media columns are untouched; skip the lookup of the old names.
+        instance._old_media_names = None
+        return
+    old = None
+    if instance.pk is not None:
+        old = Post.objects.filter(pk=instance.pk).values_list(*MEDIA_FIELDS).first()
+    instance._old_media_names = media_names(*old) if old else []
+
+
+def _post_saved(sender, instance, **kwargs):
+    old_names = getattr(instance, "_old_media_names", None)
+    if old_names is None:
+        return
+    old = Counter(old_names)
+    new = Counter(post_media_names(instance))
+    retain(list((new - old).elements()))
+    release(list((old - new).elements()))
+
+
+def _post_deleted(sender, instance, **kwargs):
+    release(post_media_names(instance))
+
+
+pre_save.connect(_post_saving, sender=Post, dispatch_uid="media_refs_post_saving")
+post_save.connect(_post_saved, sender=Post, dispatch_uid="media_refs_post_saved")
+post_delete.connect(
+    _post_deleted, sender=Post, dispatch_uid="media_refs_post_deleted"
+)
@@ -0,0 +1,170 @@
+import mimetypes
+import os
+import re
+from email.utils import parsedate_to_datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_etags
+
+from main.image_variants import VARIANTS
+from main.lru_cache import LRUCache
+from main.media_storage import get_media_storage
+from main.models import Post
+
+# (user id, name) pairs that passed the membership check. Only grants are
+# cached, so new posts are visible at once and the TTL bounds how long a
+# removed member keeps access.
+media_access_cache = LRUCache(
+    settings.MEDIA_ACCESS_CACHE_SIZE, ttl=settings.MEDIA_ACCESS_CACHE_TTL
+)
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def can_access(user, name: str) -> bool:
+    """Whether ``name`` belongs to a post in one of ``user``'s workspaces."""
+    key = (user.id, name)
+    if media_access_cache.get(key):
+        return True
+    references = Q(post_image=name) | Q(post_video=name)
+    for variant in VARIANTS:
+        references |= Q(**{f"image_variants__{variant}": name})
+    allowed = Post.objects.filter(
+        references, workspace__in=user.workspaces.all()
+    ).exists()
+    if allowed:
+        media_access_cache.set(key, True)
+    return allowed
+
+
+def file_etag(name: str, stat) -> str:
+    storage = get_media_storage()
+    if storage.is_content_addressed(name):
+        # The name is the SHA-256 of the bytes.
+        return '"%s"' % name.rsplit("/", 1)[-1].split(".", 1)[0]
+    return '"%x-%x"' % (stat.st_mtime_ns, stat.st_size)
+
+
+def parse_range(header: str | None, size: int):
+    """
+    Returns (start, end) inclusive for a single ``bytes=`` range, None to
+    send the whole file, or False if the range cannot be satisfied. Multiple
+    ranges are answered with the whole file, which RFC 9110 allows.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last ``last`` bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        # Syntactically invalid, so the header is ignored (RFC 9110 14.1.1).
+        return None
+    if start >= size:
+        return False
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _if_range_matches(header: str | None, etag: str, last_modified: str) -> bool:
+    if not header:
+        return True
+    header = header.strip()
+    if header.startswith('"'):
+        return header == etag
+    return header == last_modified
+
+
+def _not_modified(request, etag: str, mtime: float) -> bool:
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match is not None:
+        etags = parse_etags(if_none_match)
+        # Weak comparison, as If-None-Match requires.
+        return "*" in etags or etag in etags or f"W/{etag}" in etags
+    if_modified_since = request.META.get("HTTP_IF_MODIFIED_SINCE")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+def _iter_range(path: str, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _offload(response, path: str, name: str, content_type: str):
+    # The front-end server streams the body and handles Range itself.
+    mode = settings.MEDIA_SERVE_MODE
+    if mode == "x-accel":
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + name
+    else:
+        response["X-Sendfile"] = path
+    response["Content-Type"] = content_type
+    return response
+
+
+def serve_media(request, name: str):
+    """
+    Serves a media file with strong ETags, Last-Modified, conditional GET and
+    single byte ranges. With MEDIA_SERVE_MODE "x-accel" or "x-sendfile" only
+    the headers are produced here and the body is left to the web server.
+    """
+    storage = get_media_storage()
+    path = storage.path(name)
+    stat = os.stat(path)
+    etag = file_etag(name, stat)
+    last_modified = http_date(stat.st_mtime)
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponse(status=304)
+    elif settings.MEDIA_SERVE_MODE != "django":
+        response = _offload(HttpResponse(), path, name, content_type)
+    else:
+        byte_range = None
+        if _if_range_matches(request.META.get("HTTP_IF_RANGE"), etag, last_modified):
+            byte_range = parse_range(request.META.get("HTTP_RANGE"), stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+        elif byte_range is None:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _iter_range(path, start, end - start + 1),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Length"] = str(end - start + 1)
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        response["Accept-Ranges"] = "bytes"
+
+    response["ETag"] = etag
+    response["Last-Modified"] = last_modified
+    if storage.is_content_addressed(name):
+        response["Cache-Control"] = "private, max-age=31536000, immutable"
+    else:
+        response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,51 @@
+import hashlib
+import os
+import posixpath
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every file under the SHA-256 of its bytes, so identical uploads
+    share one file and a name never changes content. The requested name only
+    contributes its extension. Saving bytes that are already stored returns
+    the existing name without writing anything.
+    """
+
+    prefix = "cas"
+
+    def hashed_name(self, digest: str, extension: str) -> str:
+        return f"{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+    def is_content_addressed(self, name: str) -> bool:
+        return name.startswith(f"{self.prefix}/")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        target = self.hashed_name(
+            digest.hexdigest(), posixpath.splitext(name)[1].lower()
+        )
+        if self.exists(target):
+            # Marks the file as in use for media garbage collection.
+            os.utime(self.path(target))
+            return target
+        # Write under a unique name and rename into place, so two writers of
+        # the same bytes never expose a partial file under the final name.
+        temporary = super()._save(f"{self.prefix}/tmp/{uuid.uuid4()}", content)
+        os.makedirs(os.path.dirname(self.path(target)), exist_ok=True)
+        os.replace(self.path(temporary), self.path(target))
+        return target
+
+
+def get_media_storage():
+    return storages["media"]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_postgenerationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workspace',
+            name='roster_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
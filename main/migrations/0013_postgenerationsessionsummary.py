@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_workspace_roster_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostGenerationSessionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('summary', models.TextField(default='')),
+                ('through_history_id', models.BigIntegerField(default=0)),
+                ('elided_tokens', models.PositiveBigIntegerField(default=0)),
+                ('summary_tokens', models.PositiveIntegerField(default=0)),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='main.postgenerationsession')),
+            ],
+            options={
+                'db_table': 'post_generation_session_summary',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_post_image_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['workspace', 'schedule_time', 'id'], name='event_workspa_f698f0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['workspace', 'assignee', 'schedule_time', 'id'], name='event_workspa_dfaa7c_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_event_calendar_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='event_is_comp_04bfdf_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='event_is_dele_5ebfe1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='event_workspa_f698f0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='event_workspa_dfaa7c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reminder',
+            name='reminder_reminde_d65b1b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reminder',
+            name='reminder_is_noti_c1d6d4_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reminder',
+            name='reminder_snooze__05e229_idx',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['workspace', 'schedule_time', 'id'], name='event_live_schedule_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['workspace', 'assignee', 'schedule_time', 'id'], name='event_live_assignee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(condition=models.Q(('is_notified', False), ('snooze_time__isnull', True)), fields=['reminder_time'], name='reminder_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(condition=models.Q(('snooze_time__isnull', False)), fields=['snooze_time'], name='reminder_snoozed_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:49
+
+import main.media_storage
+import main.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='post_image',
+            field=models.ImageField(null=True, storage=main.media_storage.get_media_storage, upload_to=main.models.post_media_path),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='post_video',
+            field=models.FileField(null=True, storage=main.media_storage.get_media_storage, upload_to=main.models.post_media_path),
+        ),
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('size', models.PositiveBigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'media_blob',
+                'indexes': [models.Index(condition=models.Q(('refcount', 0)), fields=['updated_at'], name='media_blob_unreferenced_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_media_name_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageCacheEntry',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('prompt', models.TextField()),
+                ('model', models.CharField(max_length=100)),
+                ('size', models.CharField(max_length=20)),
+                ('image', models.CharField(max_length=255)),
+                ('bytes', models.PositiveBigIntegerField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'image_cache_entry',
+                'indexes': [models.Index(fields=['last_used_at'], name='image_cache_last_us_25d44f_idx'), models.Index(fields=['created_at'], name='image_cache_created_7e4c3c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0021_post_generation_job_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_updated_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('image_status__in', ['pending', 'running'])), fields=['image_updated_at'], name='event_image_inflight_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from main.media_storage import get_media_storage
+
 
 class BaseModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -33,6 +35,7 @@ class Workspace(BaseModel):
 
     industry = models.CharField(max_length=100, null=True)
     description = models.TextField(null=True)
+    roster_version = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = "workspace"
@@ -48,6 +51,13 @@ class PostType(models.TextChoices):
     text = "text", "Text"
 
 
+class ImageStatus(models.TextChoices):
+    pending = "pending", "Pending"
+    running = "running", "Running"
+    done = "done", "Done"
+    failed = "failed", "Failed"
+
+
 def post_media_path(instance, filename):
     return f"workspace/{instance.workspace.id}/posts/{instance.id}/{filename}"
 
@@ -64,8 +74,22 @@ class Post(BaseModel):
         User, on_delete=models.CASCADE, related_name="assigned_events"
     )
     post_type = models.CharField(max_length=100, choices=PostType.choices)
-    post_image = models.ImageField(null=True, upload_to=post_media_path)
-    post_video = models.FileField(null=True, upload_to=post_media_path)
+    post_image = models.ImageField(
+        null=True, upload_to=post_media_path, storage=get_media_storage
+    )
+    # Storage names of the resized copies of post_image, keyed by variant.
+    image_variants = models.JSONField(default=dict, blank=True)
+    # When requeue_missing_variants last picked the post up.
+    variants_queued_at = models.DateTimeField(null=True)
+    image_status = models.CharField(
+        max_length=20, choices=ImageStatus.choices, null=True
+    )
+    image_error = models.TextField(null=True)
+    # When image_status last became pending or running.
+    image_updated_at = models.DateTimeField(null=True)
+    post_video = models.FileField(
+        null=True, upload_to=post_media_path, storage=get_media_storage
+    )
     post_text = models.TextField(null=True)
 
     is_completed = models.BooleanField(default=False)
@@ -89,12 +113,73 @@ class Post(BaseModel):
         db_table = "event"
         indexes = [
             models.Index(fields=["schedule_time"]),
-            models.Index(fields=["is_completed"]),
-            models.Index(fields=["is_deleted"]),
+            # Media access checks and blob reuse look posts up by file name.
+            models.Index(fields=["post_image"]),
+            models.Index(fields=["post_video"]),
+            # Calendar pages only ever read live posts.
+            models.Index(
+                fields=["workspace", "schedule_time", "id"],
+                condition=models.Q(is_deleted=False),
+                name="event_live_schedule_idx",
+            ),
+            models.Index(
+                fields=["workspace", "assignee", "schedule_time", "id"],
+                condition=models.Q(is_deleted=False),
+                name="event_live_assignee_idx",
+            ),
+            # Finds images lost with the process that was rendering them.
+            models.Index(
+                fields=["image_updated_at"],
+                condition=models.Q(image_status__in=["pending", "running"]),
+                name="event_image_inflight_idx",
+            ),
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(image_variants={}, post_image__gt=""),
+                name="event_missing_variants_idx",
+            ),
         ]
         ordering = ["schedule_time"]
 
 
+class MediaBlob(BaseModel):
+    """A content-addressed media file and the number of post fields using it."""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "media_blob"
+        indexes = [
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(refcount=0),
+                name="media_blob_unreferenced_idx",
+            ),
+        ]
+
+
+class ImageCacheEntry(BaseModel):
+    """A generated image stored for its prompt, so the same prompt is rendered once."""
+
+    key = models.CharField(max_length=64, primary_key=True)
+    prompt = models.TextField()
+    model = models.CharField(max_length=100)
+    size = models.CharField(max_length=20)
+    image = models.CharField(max_length=255)
+    bytes = models.PositiveBigIntegerField()
+    hits = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "image_cache_entry"
+        indexes = [
+            models.Index(fields=["last_used_at"]),
+            models.Index(fields=["created_at"]),
+        ]
+
+
 class Reminder(BaseModel):
     creator = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="created_reminders"
@@ -106,10 +191,19 @@ class Reminder(BaseModel):
 
     class Meta:
         db_table = "reminder"
+        # One index per branch of reminder_dispatch.due_by, each covering
+        # only the rows that branch can match.
         indexes = [
-            models.Index(fields=["reminder_time"]),
-            models.Index(fields=["is_notified"]),
-            models.Index(fields=["snooze_time"]),
+            models.Index(
+                fields=["reminder_time"],
+                condition=models.Q(is_notified=False, snooze_time__isnull=True),
+                name="reminder_pending_idx",
+            ),
+            models.Index(
+                fields=["snooze_time"],
+                condition=models.Q(snooze_time__isnull=False),
+                name="reminder_snoozed_idx",
+            ),
         ]
         ordering = ["reminder_time"]
 
@@ -143,3 +237,54 @@ class PostGenerationSessionHistory(BaseModel):
             models.Index(fields=["created_at"]),
         ]
         ordering = ["created_at"]
+
+
+class PostGenerationSessionSummary(BaseModel):
+    session = models.OneToOneField(
+        PostGenerationSession, on_delete=models.CASCADE, related_name="summary"
+    )
+    summary = models.TextField(default="")
+    through_history_id = models.BigIntegerField(default=0)
+    elided_tokens = models.PositiveBigIntegerField(default=0)
+    summary_tokens = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "post_generation_session_summary"
+
+
+class GenerationJobStatus(models.TextChoices):
+    queued = "queued", "Queued"
+    running = "running", "Running"
+    succeeded = "succeeded", "Succeeded"
+    failed = "failed", "Failed"
+
+
+class PostGenerationJob(BaseModel):
+    creator = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="post_generation_jobs"
+    )
+    workspace = models.ForeignKey(
+        Workspace, on_delete=models.CASCADE, related_name="post_generation_jobs"
+    )
+    session = models.ForeignKey(
+        PostGenerationSession, on_delete=models.CASCADE, related_name="jobs"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=GenerationJobStatus.choices,
+        default=GenerationJobStatus.queued,
+    )
+    params = models.JSONField(default=dict)
+    post_ids = models.JSONField(default=list)
+    error = models.TextField(null=True)
+    # Times the job was claimed; more than one means a worker was lost.
+    attempts = models.PositiveSmallIntegerField(default=0)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = "post_generation_job"
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+        ordering = ["created_at"]
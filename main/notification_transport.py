@@ -0,0 +1,200 @@
+import functools
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import NamedTuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from main.clients import get_firebase_app
+from main.models import User
+
+logger = logging.getLogger(__name__)
+
+# FCM rejects send_each / multicast requests with more than 500 messages.
+FCM_BATCH_LIMIT = 500
+
+
+class PushMessage(NamedTuple):
+    key: object  # Caller's id for the message, e.g. the reminder id.
+    token: str
+    title: str
+    body: str
+
+
+class DeliveryReport:
+    def __init__(self):
+        self.sent: list = []
+        self.failed: list = []
+        self.invalid_tokens: set[str] = set()
+        # Keys whose token was invalid; retrying them can never succeed.
+        self.dropped: list = []
+
+    def merge(self, other: "DeliveryReport"):
+        self.sent += other.sent
+        self.failed += other.failed
+        self.dropped += other.dropped
+        self.invalid_tokens |= other.invalid_tokens
+
+
+class NotificationTransport:
+    batch_size = FCM_BATCH_LIMIT
+
+    def send(self, messages: list[PushMessage]) -> DeliveryReport:
+        """
+        Delivers ``messages`` in batches of at most ``batch_size``. Tokens the
+        push service reports as invalid are cleared from ``User.fcm_token`` so
+        they are not tried again.
+        """
+        report = DeliveryReport()
+        for start in range(0, len(messages), self.batch_size):
+            report.merge(self.send_batch(messages[start : start + self.batch_size]))
+        if report.invalid_tokens:
+            cleared = User.objects.filter(
+                fcm_token__in=report.invalid_tokens
+            ).update(fcm_token=None)
+            logger.info("Cleared %d invalid FCM tokens.", cleared)
+        return report
+
+    def send_batch(self, messages: list[PushMessage]) -> DeliveryReport:
+        raise NotImplementedError
+
+
+class FirebaseTransport(NotificationTransport):
+    def __init__(self):
+        import firebase_admin.exceptions
+        import firebase_admin.messaging
+
+        self.messaging = firebase_admin.messaging
+        self.invalid_token_errors = (
+            firebase_admin.messaging.UnregisteredError,
+            firebase_admin.exceptions.NotFoundError,
+        )
+        self.invalid_argument_error = firebase_admin.exceptions.InvalidArgumentError
+
+    def is_invalid_token(self, error) -> bool:
+        if isinstance(error, self.invalid_token_errors):
+            return True
+        # INVALID_ARGUMENT also covers malformed payloads, e.g. an oversized
+        # data field; only a rejected registration token condemns the token.
+        return isinstance(
+            error, self.invalid_argument_error
+        ) and "registration token" in str(error)
+
+    def send_batch(self, messages):
+        messaging = self.messaging
+        app = get_firebase_app()
+        # Identical notifications share one multicast message; the rest go out
+        # together through send_each. Either way it is one HTTP round trip.
+        groups = defaultdict(list)
+        for message in messages:
+            groups[(message.title, message.body)].append(message)
+        report = DeliveryReport()
+        singles = []
+        for (title, body), group in groups.items():
+            if len(group) == 1:
+                singles += group
+                continue
+            response = self.call(
+                functools.partial(messaging.send_each_for_multicast, app=app),
+                messaging.MulticastMessage(
+                    tokens=[message.token for message in group],
+                    notification=messaging.Notification(title=title, body=body),
+                ),
+                group,
+                report,
+            )
+            self.collect(group, response, report)
+        if singles:
+            response = self.call(
+                functools.partial(messaging.send_each, app=app),
+                [
+                    messaging.Message(
+                        notification=messaging.Notification(
+                            title=message.title, body=message.body
+                        ),
+                        token=message.token,
+                    )
+                    for message in singles
+                ],
+                singles,
+                report,
+            )
+            self.collect(singles, response, report)
+        return report
+
+    @staticmethod
+    def call(send, payload, messages, report):
+        try:
+            return send(payload)
+        except Exception:
+            logger.exception("FCM batch of %d messages failed", len(messages))
+            report.failed += [message.key for message in messages]
+            return None
+
+    def collect(self, messages, response, report):
+        if response is None:
+            return
+        for message, result in zip(messages, response.responses):
+            if result.success:
+                report.sent.append(message.key)
+            elif self.is_invalid_token(result.exception):
+                report.invalid_tokens.add(message.token)
+                report.dropped.append(message.key)
+            else:
+                logger.warning(
+                    "FCM delivery of %s failed: %s", message.key, result.exception
+                )
+                report.failed.append(message.key)
+
+
+class FakeTransport(NotificationTransport):
+    """
+    In-process transport for tests and offline benchmarks. Each batch sleeps
+    for ``latency`` seconds to stand in for the FCM round trip; tokens in
+    ``invalid_tokens`` are reported as unregistered and those in
+    ``failing_tokens`` as failed deliveries that may be retried.
+    """
+
+    def __init__(
+        self, latency: float | None = None, invalid_tokens=(), failing_tokens=()
+    ):
+        if latency is None:
+            latency = settings.FAKE_NOTIFICATION_LATENCY
+        self.latency = latency
+        self.invalid_tokens = set(invalid_tokens)
+        self.failing_tokens = set(failing_tokens)
+        self.delivered: list[PushMessage] = []
+        self.batches = 0
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages):
+        if self.latency:
+            time.sleep(self.latency)
+        report = DeliveryReport()
+        delivered = []
+        for message in messages:
+            if message.token in self.invalid_tokens:
+                report.invalid_tokens.add(message.token)
+                report.dropped.append(message.key)
+            elif message.token in self.failing_tokens:
+                report.failed.append(message.key)
+            else:
+                report.sent.append(message.key)
+                delivered.append(message)
+        with self._lock:
+            self.batches += 1
+            self.delivered += delivered
+        return report
+
+
+_transport: NotificationTransport | None = None
+
+
+def get_notification_transport() -> NotificationTransport:
+    global _transport
+    if _transport is None:
+        _transport = import_string(settings.NOTIFICATION_TRANSPORT)()
+    return _transport
@@ -0,0 +1,171 @@
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from main.clients import per_event_loop
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class JitteredRetry(Retry):
+    """Retry with "full jitter" backoff so retrying clients don't synchronise."""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff else 0
+
+
+class _HostStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(
+            lambda: {"requests": 0, "errors": 0, "seconds": 0.0, "bytes": 0}
+        )
+
+    def record(self, host, seconds=0.0, nbytes=0, error=False, request=True):
+        with self._lock:
+            stats = self._stats[host]
+            stats["requests"] += int(request)
+            stats["errors"] += int(error)
+            stats["seconds"] += seconds
+            stats["bytes"] += nbytes
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._stats.items()}
+
+
+_stats = _HostStats()
+
+
+class OutboundSession(requests.Session):
+    """
+    ``requests.Session`` with a connection pool per host, default timeouts and
+    jittered retries on idempotent requests. Latency and response sizes are
+    recorded per host.
+    """
+
+    def __init__(self):
+        super().__init__()
+        retry = JitteredRetry(
+            total=settings.HTTP_RETRIES,
+            backoff_factor=settings.HTTP_BACKOFF_FACTOR,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=settings.HTTP_POOL_HOSTS,
+            pool_maxsize=settings.HTTP_POOL_SIZE,
+            max_retries=retry,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault(
+            "timeout", (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+        )
+        host = urlsplit(url).netloc
+        start = time.monotonic()
+        try:
+            response = super().request(method, url, **kwargs)
+        except requests.RequestException:
+            _stats.record(host, time.monotonic() - start, error=True)
+            raise
+        nbytes = 0 if kwargs.get("stream") else len(response.content)
+        _stats.record(
+            host, time.monotonic() - start, nbytes, error=not response.ok
+        )
+        return response
+
+
+_session: OutboundSession | None = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> OutboundSession:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = OutboundSession()
+    return _session
+
+
+@per_event_loop
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Async counterpart of ``get_http_session`` with the same timeouts and pool
+    size. httpx only retries failed connection attempts, not error statuses.
+    """
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT
+        ),
+        limits=httpx.Limits(max_connections=settings.HTTP_POOL_SIZE),
+        transport=httpx.AsyncHTTPTransport(retries=settings.HTTP_RETRIES),
+        follow_redirects=True,
+    )
+
+
+def get_http_stats() -> dict:
+    return _stats.snapshot()
+
+
+def download_to_temp_file(url: str) -> File:
+    """
+    Streams ``url`` into an anonymous temporary file, so the body is never
+    held in memory. The caller owns the returned file and should close it.
+    """
+    host = urlsplit(url).netloc
+    tmp = tempfile.TemporaryFile()
+    try:
+        with get_http_session().get(url, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                tmp.write(chunk)
+                _stats.record(host, nbytes=len(chunk), request=False)
+    except Exception:
+        tmp.close()
+        raise
+    tmp.seek(0)
+    return File(tmp, name=urlsplit(url).path.rsplit("/", 1)[-1] or "download")
+
+
+async def adownload_to_temp_file(url: str) -> File:
+    host = urlsplit(url).netloc
+    tmp = tempfile.TemporaryFile()
+    start = time.monotonic()
+    try:
+        async with get_async_http_client().stream("GET", url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                tmp.write(chunk)
+                _stats.record(host, nbytes=len(chunk), request=False)
+    except Exception:
+        _stats.record(host, time.monotonic() - start, error=True)
+        tmp.close()
+        raise
+    _stats.record(host, time.monotonic() - start)
+    tmp.seek(0)
+    return File(tmp, name=urlsplit(url).path.rsplit("/", 1)[-1] or "download")
+
+
+def download_to_storage(url: str, storage: Storage, name: str) -> str:
+    """
+    Streams ``url`` into ``storage`` under ``name`` through a temporary file;
+    returns the name the storage chose.
+    """
+    with download_to_temp_file(url) as file:
+        return storage.save(name, file)
@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q, QuerySet
+from rest_framework import serializers
+
+from main.models import Post
+from main.serializers.values_serializer import PostValuesSerializer
+
+
+class CalendarParamSerializer(serializers.Serializer):
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    assignee = serializers.IntegerField(required=False)
+    is_completed = serializers.BooleanField(
+        required=False, allow_null=True, default=None
+    )
+    is_deleted = serializers.BooleanField(required=False, default=False)
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(default=100, min_value=1, max_value=500)
+
+    def validate_cursor(self, value):
+        try:
+            return decode_cursor(value)
+        except (ValueError, TypeError):
+            raise serializers.ValidationError("Invalid cursor")
+
+
+def encode_cursor(schedule_time: str, post_id: int) -> str:
+    payload = json.dumps([schedule_time, post_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+# Upper bound of the BigAutoField primary key.
+MAX_POST_ID = 2**63 - 1
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Inverse of ``encode_cursor``. Cursors come back from clients, so anything
+    that could not have been produced by it raises ``ValueError``.
+    """
+    schedule_time, post_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    schedule_time = datetime.fromisoformat(schedule_time)
+    if schedule_time.tzinfo is None:
+        raise ValueError("Cursor time has no timezone")
+    if type(post_id) is not int or not 0 < post_id <= MAX_POST_ID:
+        raise ValueError("Cursor post id out of range")
+    return schedule_time, post_id
+
+
+def calendar_page(
+    workspace_id: int,
+    params: dict,
+    queryset: QuerySet | None = None,
+    context: dict | None = None,
+) -> tuple[list[dict], str | None]:
+    """
+    One page of a workspace's posts in ``(schedule_time, id)`` order. Pages are
+    addressed by the last row seen rather than an offset, so every page is a
+    range scan on the ``(workspace, schedule_time, id)`` index.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    queryset = queryset.filter(workspace_id=workspace_id, is_deleted=params["is_deleted"])
+    if "start" in params:
+        queryset = queryset.filter(schedule_time__gte=params["start"])
+    if "end" in params:
+        queryset = queryset.filter(schedule_time__lt=params["end"])
+    if "assignee" in params:
+        queryset = queryset.filter(assignee_id=params["assignee"])
+    if params.get("is_completed") is not None:
+        queryset = queryset.filter(is_completed=params["is_completed"])
+    if "cursor" in params:
+        schedule_time, post_id = params["cursor"]
+        queryset = queryset.filter(schedule_time__gte=schedule_time).filter(
+            Q(schedule_time__gt=schedule_time) | Q(id__gt=post_id)
+        )
+
+    page_size = params["page_size"]
+    rows = PostValuesSerializer(
+        queryset.order_by("schedule_time", "id")[: page_size + 1], context=context
+    ).data
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1]["schedule_time"], rows[-1]["id"])
+    return rows, next_cursor
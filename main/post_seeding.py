@@ -0,0 +1,141 @@
+import functools
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import requests
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from main.image_variants import get_or_build_variants
+from main.media_refs import retain_posts
+from main.media_storage import get_media_storage
+from main.models import Post, PostType, User, Workspace
+from main.outbound_http import download_to_storage
+
+# generate_post has always drawn from picsum's ?random=0..20, so the set of
+# distinct images is tiny. They are downloaded once and shared by every post.
+IMAGE_POOL_SIZE = 21
+IMAGE_POOL_CONCURRENCY = 8
+PLACEHOLDER_SIZE = (1080, 720)
+
+logger = logging.getLogger(__name__)
+
+_image_pool: dict[str, dict[str, str]] | None = None
+_image_pool_lock = threading.Lock()
+
+
+def pool_image_name(seed: int) -> str:
+    return f"seed/picsum/{seed}.jpg"
+
+
+def placeholder_image(seed: int) -> ContentFile:
+    """A gradient in a colour derived from ``seed``, the same on every run."""
+    red, green, blue = hashlib.sha256(f"picsum:{seed}".encode()).digest()[:3]
+    image = ImageOps.colorize(
+        Image.linear_gradient("L").resize(PLACEHOLDER_SIZE),
+        (red // 4, green // 4, blue // 4),
+        (red, green, blue),
+    )
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return ContentFile(buffer.getvalue())
+
+
+def _fetch_pool_image(seed: int, offline: bool = False) -> tuple[str, dict[str, str]]:
+    # The download is kept under a fixed name; posts point at its
+    # content-addressed copy in the media storage.
+    name = pool_image_name(seed)
+    if not offline and not default_storage.exists(name):
+        try:
+            download_to_storage(
+                f"https://picsum.photos/1080/720?random={seed}", default_storage, name
+            )
+        except requests.RequestException as e:
+            logger.warning("Using a placeholder for pool image %s: %s", seed, e)
+    if default_storage.exists(name):
+        with default_storage.open(name) as f:
+            name = get_media_storage().save(name, f)
+    else:
+        # Placeholders are not kept under the fixed name, so a later online
+        # run still downloads the real image.
+        name = get_media_storage().save(name, placeholder_image(seed))
+    return name, get_or_build_variants(name)
+
+
+def get_image_pool(offline: bool = False) -> dict[str, dict[str, str]]:
+    """
+    Storage names of the shared demo images and their variants, fetched
+    concurrently on first use. Images that cannot be downloaded, or all of
+    them with ``offline``, are replaced by generated placeholders.
+    """
+    global _image_pool
+    with _image_pool_lock:
+        if _image_pool is None:
+            with ThreadPoolExecutor(max_workers=IMAGE_POOL_CONCURRENCY) as executor:
+                _image_pool = dict(
+                    executor.map(
+                        functools.partial(_fetch_pool_image, offline=offline),
+                        range(IMAGE_POOL_SIZE),
+                    )
+                )
+        return _image_pool
+
+
+class FakePostGenerator:
+    """
+    Builds demo posts for a workspace. The member list and image pool are
+    loaded once per generator, and ``generate`` inserts rows with
+    ``bulk_create``.
+    """
+
+    batch_size = 1000
+
+    def __init__(
+        self,
+        workspace: Workspace,
+        creator: User,
+        range_start: datetime | None = None,
+        range_end: datetime | None = None,
+        f=None,
+    ):
+        self.workspace = workspace
+        self.creator = creator
+        self.range_start = range_start or datetime.now(timezone.utc)
+        self.range_end = range_end or self.range_start + timedelta(days=7)
+        if f is None:
+            # faker is slow to import and only this demo generator needs it.
+            import faker
+
+            f = faker.Faker()
+        self.f = f
+        self.members = list(workspace.members.all())
+        self.images = get_image_pool()
+        self.image_names = list(self.images)
+
+    def fill(self, post: Post) -> Post:
+        f = self.f
+        post.description = f.text(50)
+        post.post_text = f.text(50)
+        post.schedule_time = f.date_time_between(
+            self.range_start, self.range_end, tzinfo=timezone.utc
+        )
+        image = f.random_element(self.image_names)
+        post.post_image = image
+        post.image_variants = self.images[image]
+        post.assignee = f.random_element(self.members)
+        post.post_type = PostType.image
+        return post
+
+    def generate(self, count: int) -> list[Post]:
+        posts = [
+            self.fill(Post(workspace=self.workspace, creator=self.creator))
+            for _ in range(count)
+        ]
+        posts = Post.objects.bulk_create(posts, batch_size=self.batch_size)
+        retain_posts(posts)
+        return posts
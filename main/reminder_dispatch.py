@@ -0,0 +1,141 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction, connection
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from main.models import Reminder
+from main.notification_transport import (
+    NotificationTransport,
+    PushMessage,
+    get_notification_transport,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def build_push_message(reminder: Reminder) -> PushMessage | None:
+    fcm_token = reminder.post.creator.fcm_token
+    if not fcm_token:
+        return None
+    return PushMessage(
+        key=reminder.id,
+        token=fcm_token,
+        title="Reminder",
+        body=f"Reminder: {reminder.post.post_text}",
+    )
+
+
+def due_by(moment: datetime) -> Q:
+    """
+    Reminders whose next deadline is at or before ``moment``. A snoozed
+    reminder is due at its snooze time whether or not it has already been
+    notified; otherwise it is due once, at its reminder time.
+    """
+    return Q(snooze_time__lte=moment) | Q(
+        snooze_time__isnull=True, is_notified=False, reminder_time__lte=moment
+    )
+
+
+def next_deadline(reminder: Reminder) -> datetime | None:
+    if reminder.snooze_time is not None:
+        return reminder.snooze_time
+    return None if reminder.is_notified else reminder.reminder_time
+
+
+def claim_due_reminders(
+    now: datetime, limit: int, exclude_ids=()
+) -> list[Reminder]:
+    """
+    Locks up to ``limit`` due reminders for the current transaction. Rows
+    already claimed by another worker are skipped rather than waited on.
+    """
+    return list(
+        Reminder.objects.select_for_update(skip_locked=True, of=("self",))
+        .select_related("post__creator")
+        .filter(due_by(now))
+        .exclude(id__in=exclude_ids)
+        .order_by(Coalesce("snooze_time", "reminder_time"))[:limit]
+    )
+
+
+def dispatch_chunk(
+    now: datetime,
+    chunk_size: int,
+    failed_ids: set,
+    transport: NotificationTransport,
+) -> int:
+    """
+    Claims, sends and marks one chunk in a single transaction, so a crash
+    can only resend the chunk that was in flight. The chunk goes to the
+    transport as one batch. Reminders that fail are added to ``failed_ids``
+    and left for the next run; those without a usable token are marked as
+    notified since retrying them cannot succeed.
+    """
+    with transaction.atomic():
+        reminders = claim_due_reminders(now, chunk_size, failed_ids)
+        done_ids = []
+        messages = []
+        for reminder in reminders:
+            message = build_push_message(reminder)
+            if message is None:
+                done_ids.append(reminder.id)
+            else:
+                messages.append(message)
+        if messages:
+            report = transport.send(messages)
+            done_ids += report.sent + report.dropped
+            failed_ids.update(report.failed)
+        Reminder.objects.filter(id__in=done_ids).update(
+            is_notified=True, snooze_time=None
+        )
+    return len(reminders)
+
+
+def _drain(
+    now: datetime, chunk_size: int, transport: NotificationTransport
+) -> int:
+    total = 0
+    failed_ids = set()
+    try:
+        while True:
+            claimed = dispatch_chunk(now, chunk_size, failed_ids, transport)
+            total += claimed
+            if claimed < chunk_size:
+                return total
+    finally:
+        connection.close()
+
+
+def dispatch_due_reminders(
+    chunk_size: int | None = None,
+    workers: int | None = None,
+    transport: NotificationTransport | None = None,
+) -> int:
+    """
+    Sends every reminder due now using ``workers`` threads that each claim
+    chunks until none are left. Any number of processes or nodes can run
+    this at the same time.
+    """
+    chunk_size = chunk_size or settings.REMINDER_DISPATCH_CHUNK_SIZE
+    workers = workers or settings.REMINDER_DISPATCH_WORKERS
+    transport = transport or get_notification_transport()
+    if not connection.features.has_select_for_update_skip_locked:
+        # Without SKIP LOCKED concurrent workers would claim the same rows.
+        workers = 1
+    now = timezone.now()
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="reminder-dispatch"
+    ) as executor:
+        futures = [
+            executor.submit(_drain, now, chunk_size, transport)
+            for _ in range(workers)
+        ]
+        total = sum(future.result() for future in futures)
+    if total:
+        logger.info("Dispatched %d reminders.", total)
+    return total
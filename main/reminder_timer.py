@@ -0,0 +1,199 @@
+import heapq
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+import psycopg
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from main.models import Reminder
+from main.reminder_dispatch import dispatch_due_reminders, due_by, next_deadline
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "reminder_changed"
+
+
+def notify_reminder_changed(reminder_id: int, deadline: datetime | None):
+    """
+    Tells running timers that a reminder's deadline changed; ``None`` means
+    it no longer needs to fire. NOTIFY is transactional, so listeners only
+    hear about it once the surrounding transaction commits. On databases
+    without LISTEN/NOTIFY the timers pick the change up on their next reload.
+    """
+    if connection.vendor != "postgresql":
+        return
+    payload = json.dumps(
+        {"id": reminder_id, "deadline": deadline.isoformat() if deadline else None}
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+
+
+def notify_reminder_saved(reminder: Reminder):
+    notify_reminder_changed(reminder.id, next_deadline(reminder))
+
+
+class ReminderTimer:
+    """
+    Keeps the deadlines of reminders due within ``horizon`` in a heap and
+    sleeps until the earliest one, then runs ``dispatch``. The window is
+    reloaded every ``reload_interval``, which also retries failed sends;
+    between reloads it is kept current by ``schedule`` calls from the
+    LISTEN thread.
+    """
+
+    def __init__(
+        self,
+        dispatch=dispatch_due_reminders,
+        horizon: timedelta | None = None,
+        reload_interval: float | None = None,
+    ):
+        self.dispatch = dispatch
+        self.horizon = horizon or timedelta(
+            seconds=settings.REMINDER_TIMER_HORIZON
+        )
+        self.reload_interval = (
+            reload_interval or settings.REMINDER_TIMER_RELOAD_INTERVAL
+        )
+        self._heap: list[tuple[datetime, int]] = []
+        # Live deadline per reminder; heap entries that disagree are stale.
+        self._deadlines: dict[int, datetime] = {}
+        self._loaded_until: datetime | None = None
+        # Changes heard while a reload query is running, replayed over it.
+        self._changes_during_reload: dict[int, datetime | None] | None = None
+        self._wakeup = threading.Condition()
+        self._reload_requested = False
+        self._stopped = False
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def schedule(self, reminder_id: int, deadline: datetime | None):
+        with self._wakeup:
+            if self._changes_during_reload is not None:
+                self._changes_during_reload[reminder_id] = deadline
+            self._set(reminder_id, deadline)
+            self._wakeup.notify()
+
+    def _set(self, reminder_id, deadline):
+        if deadline is None or (
+            self._loaded_until is not None and deadline > self._loaded_until
+        ):
+            # Outside the window; a later reload will pick it up.
+            self._deadlines.pop(reminder_id, None)
+            return
+        self._deadlines[reminder_id] = deadline
+        heapq.heappush(self._heap, (deadline, reminder_id))
+
+    def request_reload(self):
+        with self._wakeup:
+            self._reload_requested = True
+            self._wakeup.notify()
+
+    def reload(self):
+        until = timezone.now() + self.horizon
+        with self._wakeup:
+            self._changes_during_reload = {}
+        try:
+            rows = list(
+                Reminder.objects.filter(due_by(until))
+                .order_by()
+                .values_list("id", "reminder_time", "snooze_time")
+            )
+        except Exception:
+            with self._wakeup:
+                self._changes_during_reload = None
+            raise
+        finally:
+            connection.close()
+        with self._wakeup:
+            self._loaded_until = until
+            self._deadlines = {
+                reminder_id: snooze_time or reminder_time
+                for reminder_id, reminder_time, snooze_time in rows
+            }
+            self._heap = [
+                (deadline, reminder_id)
+                for reminder_id, deadline in self._deadlines.items()
+            ]
+            heapq.heapify(self._heap)
+            for reminder_id, deadline in self._changes_during_reload.items():
+                self._set(reminder_id, deadline)
+            self._changes_during_reload = None
+            self._wakeup.notify()
+        logger.debug("Loaded %d reminder deadlines until %s.", len(rows), until)
+
+    def _pop_due(self, now: datetime) -> bool:
+        due = False
+        while self._heap and self._heap[0][0] <= now:
+            deadline, reminder_id = heapq.heappop(self._heap)
+            if self._deadlines.get(reminder_id) == deadline:
+                del self._deadlines[reminder_id]
+                due = True
+        return due
+
+    def _seconds_until_next(self, now: datetime) -> float | None:
+        while self._heap:
+            deadline, reminder_id = self._heap[0]
+            if self._deadlines.get(reminder_id) == deadline:
+                return max((deadline - now).total_seconds(), 0)
+            heapq.heappop(self._heap)
+        return None
+
+    def run(self):
+        next_reload = 0.0
+        while not self._stopped:
+            if self._reload_requested or time.monotonic() >= next_reload:
+                self._reload_requested = False
+                try:
+                    self.reload()
+                except Exception:
+                    logger.exception("Failed to load reminder deadlines")
+                next_reload = time.monotonic() + self.reload_interval
+            with self._wakeup:
+                now = timezone.now()
+                if not self._pop_due(now):
+                    timeout = next_reload - time.monotonic()
+                    until_next = self._seconds_until_next(now)
+                    if until_next is not None:
+                        timeout = min(timeout, until_next)
+                    if timeout > 0 and not self._reload_requested:
+                        self._wakeup.wait(timeout)
+                    continue
+            try:
+                self.dispatch()
+            except Exception:
+                logger.exception("Reminder dispatch failed")
+
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+
+    def listen(self, retry_delay: float = 5):
+        """
+        Feeds ``schedule`` from NOTIFY messages on ``CHANNEL``. Reconnects after
+        a dropped connection and requests a reload, so nothing sent while
+        disconnected is missed.
+        """
+        params = connection.get_connection_params()
+        while not self._stopped:
+            try:
+                with psycopg.connect(**params, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {CHANNEL}")
+                    while not self._stopped:
+                        for notify in conn.notifies(timeout=1):
+                            payload = json.loads(notify.payload)
+                            deadline = payload["deadline"]
+                            if deadline is not None:
+                                deadline = datetime.fromisoformat(deadline)
+                            self.schedule(payload["id"], deadline)
+            except psycopg.Error:
+                logger.exception("Reminder LISTEN connection failed")
+                time.sleep(retry_delay)
+                self.request_reload()
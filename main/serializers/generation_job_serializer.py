@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+from main.models import PostGenerationJob, GenerationJobStatus, Post
+from main.serializers.post_serializer import PostSerializer
+
+
+class PostGenerationJobSerializer(serializers.ModelSerializer):
+    posts = serializers.SerializerMethodField()
+
+    def get_posts(self, obj):
+        if obj.status != GenerationJobStatus.succeeded:
+            return []
+        return PostSerializer(
+            Post.objects.filter(id__in=obj.post_ids), many=True, context=self.context
+        ).data
+
+    class Meta:
+        model = PostGenerationJob
+        fields = "__all__"
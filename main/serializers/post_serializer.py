@@ -1,8 +1,26 @@
+from rest_framework import serializers
+
+from main.image_variants import get_image_storage
 from main.models import Post
 from main.serializers.workspace_serializer import RemoveFieldSerializer
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Maps the stored variant names of post_image to URLs, like ImageField does."""
+
+    def to_representation(self, value):
+        storage = get_image_storage()
+        request = self.context.get("request")
+        urls = {}
+        for variant, name in value.items():
+            url = storage.url(name)
+            urls[variant] = request.build_absolute_uri(url) if request else url
+        return urls
+
+
 class PostSerializer(RemoveFieldSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Post
         fields = "__all__"
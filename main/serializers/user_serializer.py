@@ -1,5 +1,3 @@
-from rest_framework import serializers
-
 from main.models import User
 from main.serializers.workspace_serializer import WorkspaceSerializer, RemoveFieldSerializer
 
@@ -7,6 +5,10 @@ from main.serializers.workspace_serializer import WorkspaceSerializer, RemoveFie
 class UserSerializer(RemoveFieldSerializer):
     workspaces = WorkspaceSerializer(many=True, read_only=True, remove_fields=['members'])
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.prefetch_related("groups", "user_permissions", "workspaces")
+
     class Meta:
         model = User
         fields = "__all__"
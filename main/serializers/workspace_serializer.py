@@ -1,6 +1,7 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 
-from main.models import Workspace
+from main.models import Workspace, User
 
 
 class RemoveFieldSerializer(serializers.ModelSerializer):
@@ -15,14 +16,27 @@ class RemoveFieldSerializer(serializers.ModelSerializer):
                     self.fields.pop(field_name)
 
 
-class WorkspaceSerializer(RemoveFieldSerializer):
-    members = serializers.SerializerMethodField()
+class MemberSerializer(serializers.ModelSerializer):
+    """UserSerializer without the nested workspaces, as shown inside a workspace."""
+
+    class Meta:
+        model = User
+        exclude = ["workspaces"]
 
-    def get_members(self, obj):
-        from main.serializers.user_serializer import UserSerializer
 
-        return UserSerializer(obj.members.all(), many=True, remove_fields=['workspaces']).data
+class WorkspaceSerializer(RemoveFieldSerializer):
+    members = MemberSerializer(many=True, read_only=True)
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.prefetch_related(
+            Prefetch(
+                "members",
+                queryset=User.objects.prefetch_related("groups", "user_permissions"),
+            )
+        )
 
     class Meta:
         model = Workspace
         fields = "__all__"
+        read_only_fields = ["roster_version"]
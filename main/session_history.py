@@ -0,0 +1,135 @@
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from main.models import PostGenerationSession, PostGenerationSessionSummary
+
+logger = logging.getLogger(__name__)
+
+_metrics_lock = threading.Lock()
+_metrics = {"replays": 0, "tokens_replayed": 0, "tokens_saved": 0}
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough chars-per-token ratio for English text; good enough for metrics.
+    return len(text) // 4 + 1
+
+
+def get_history_metrics() -> dict:
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def _record_replay(tokens_replayed: int, tokens_saved: int):
+    with _metrics_lock:
+        _metrics["replays"] += 1
+        _metrics["tokens_replayed"] += tokens_replayed
+        _metrics["tokens_saved"] += tokens_saved
+
+
+def summarize_turn(prompt: str, response: str) -> str:
+    lines = [f"request: {prompt[:200]}"]
+    try:
+        posts = json.loads(response)["response"]
+    except (ValueError, KeyError, TypeError):
+        return "\n".join(lines + [f"response: {response[:200]}"])
+    for post in posts:
+        lines.append(
+            f"- {post.get('post_time')} assignee={post.get('assignee_id')}: "
+            f"{str(post.get('descr', ''))[:120]}"
+        )
+    return "\n".join(lines)
+
+
+def build_chat_history(session: PostGenerationSession | None) -> list[dict]:
+    """
+    Chat history to replay for ``session``: the rolling summary of older turns
+    followed by the last ``GENERATION_HISTORY_WINDOW`` turns verbatim.
+    """
+    if session is None:
+        return []
+    rows = list(
+        session.history.order_by("-id").values("prompt", "response")[
+            : settings.GENERATION_HISTORY_WINDOW
+        ]
+    )
+    rows.reverse()
+    summary = PostGenerationSessionSummary.objects.filter(session=session).first()
+
+    history = []
+    tokens_saved = 0
+    if summary is not None and summary.summary:
+        history += [
+            {
+                "role": "user",
+                "parts": [f"Summary of earlier requests in this session:\n{summary.summary}"],
+            },
+            {"role": "model", "parts": ["ok"]},
+        ]
+        tokens_saved = max(summary.elided_tokens - summary.summary_tokens, 0)
+    for row in rows:
+        history += [
+            {"role": "user", "parts": [row["prompt"]]},
+            {"role": "model", "parts": [row["response"]]},
+        ]
+
+    tokens_replayed = sum(estimate_tokens(item["parts"][0]) for item in history)
+    _record_replay(tokens_replayed, tokens_saved)
+    logger.debug(
+        "Replaying %d tokens for session %s (%d saved by compaction)",
+        tokens_replayed,
+        session.id,
+        tokens_saved,
+    )
+    return history
+
+
+def compact_session_history(session: PostGenerationSession):
+    """
+    Folds history rows that have dropped out of the replay window into the
+    session's rolling summary, trimming the oldest lines past
+    ``GENERATION_HISTORY_SUMMARY_CHARS``.
+    """
+    if session.history.count() <= settings.GENERATION_HISTORY_WINDOW:
+        return
+    with transaction.atomic():
+        PostGenerationSessionSummary.objects.get_or_create(session=session)
+        # Concurrent turns of one session queue on the summary row; each reads
+        # the window and cutoff only once it holds the lock, so no turn is
+        # folded twice or skipped.
+        summary = PostGenerationSessionSummary.objects.select_for_update().get(
+            session=session
+        )
+        window_ids = list(
+            session.history.order_by("-id").values_list("id", flat=True)[
+                : settings.GENERATION_HISTORY_WINDOW
+            ]
+        )
+        stale = list(
+            session.history.filter(
+                id__gt=summary.through_history_id, id__lt=min(window_ids)
+            )
+            .order_by("id")
+            .values("id", "prompt", "response")
+        )
+        if not stale:
+            return
+
+        parts = [summary.summary] if summary.summary else []
+        for row in stale:
+            parts.append(summarize_turn(row["prompt"], row["response"]))
+            summary.elided_tokens += estimate_tokens(row["prompt"])
+            summary.elided_tokens += estimate_tokens(row["response"])
+        text = "\n".join(parts)
+        limit = settings.GENERATION_HISTORY_SUMMARY_CHARS
+        if len(text) > limit:
+            text = text[-limit:]
+            text = text[text.find("\n") + 1 :]
+
+        summary.summary = text
+        summary.summary_tokens = estimate_tokens(text)
+        summary.through_history_id = stale[-1]["id"]
+        summary.save()
@@ -0,0 +1,56 @@
+import json
+
+
+class ResponseArrayParser:
+    """
+    Incrementally extracts the items of the top-level ``response`` array from
+    a JSON document that arrives in arbitrary text chunks, e.g.
+    ``{"response": [{...}, {...}]}``. Each item is returned from ``feed`` as
+    soon as its closing brace has been received.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._item_start = None
+        self._chunks = []
+
+    def feed(self, chunk: str) -> list[dict]:
+        self._chunks.append(chunk)
+        self._buffer += chunk
+        items = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._stack == ["{", "["]:
+                    self._item_start = i
+                self._stack.append(char)
+            elif char in "}]":
+                self._stack.pop()
+                if char == "}" and self._stack == ["{", "["]:
+                    items.append(json.loads(buffer[self._item_start : i + 1]))
+                    self._item_start = None
+
+        # Drop everything that can no longer be part of a pending item.
+        keep_from = self._item_start if self._item_start is not None else len(buffer)
+        self._buffer = buffer[keep_from:]
+        if self._item_start is not None:
+            self._item_start = 0
+        self._pos = len(self._buffer)
+        return items
+
+    def get_text(self) -> str:
+        return "".join(self._chunks)
@@ -0,0 +1,75 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from main.authentication import CachedTokenAuthentication, shared_key, token_cache
+from main.tests.utils import create_user, create_workspace
+
+SHARED_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "auth-token-tests",
+    },
+}
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = create_user("owner@example.com")
+        create_workspace(self.user)
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def get(self):
+        return self.client.get("/api/workspace/").status_code
+
+    def assertCached(self):
+        self.assertEqual(self.get(), 200)
+        self.assertIsNotNone(token_cache.get(self.token.key))
+
+    def test_logout_rejects_the_token_immediately(self):
+        self.assertCached()
+        self.assertEqual(self.client.post("/api/user/logout").status_code, 204)
+        self.assertEqual(self.get(), 401)
+
+    def test_deleted_token_is_rejected_immediately(self):
+        self.assertCached()
+        self.token.delete()
+        self.assertEqual(self.get(), 401)
+
+    def test_deactivated_user_is_rejected_immediately(self):
+        self.assertCached()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get(), 401)
+
+    def test_cached_user_is_not_shared_between_requests(self):
+        self.assertCached()
+        cached = token_cache.get(self.token.key)
+        self.assertEqual(self.get(), 200)
+        self.assertIs(token_cache.get(self.token.key), cached)
+        with self.assertNumQueries(0):
+            user, _ = CachedTokenAuthentication().authenticate_credentials(
+                self.token.key
+            )
+        self.assertIsNot(user, cached.user)
+
+    @override_settings(CACHES=SHARED_CACHES, AUTH_TOKEN_SHARED_CACHE="shared")
+    def test_logout_clears_the_shared_tier(self):
+        shared = caches["shared"]
+        self.addCleanup(shared.clear)
+        self.assertCached()
+        self.assertIsNotNone(shared.get(shared_key(self.token.key)))
+
+        self.assertEqual(self.client.post("/api/user/logout").status_code, 204)
+
+        self.assertIsNone(shared.get(shared_key(self.token.key)))
+        self.assertEqual(self.get(), 401)
@@ -0,0 +1,16 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from main.models import Post
+
+
+class BenchmarkSerializersTests(TestCase):
+    @override_settings(DEBUG=False, ALLOWED_HOSTS=["api.example.com"])
+    def test_runs_with_production_hosts(self):
+        out = StringIO()
+        call_command("benchmark_serializers", rows=3, repeat=1, stdout=out)
+        self.assertIn("posts: 3 rows", out.getvalue())
+        self.assertIn("reminders: 3 rows", out.getvalue())
+        self.assertFalse(Post.objects.exists())
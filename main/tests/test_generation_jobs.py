@@ -0,0 +1,171 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main import generation_backends
+from main.generation_backends import FakeBackend
+from main.generation_jobs import (
+    claim_next_job,
+    enqueue_generation_job,
+    requeue_stale_jobs,
+    run_job,
+)
+from main.models import (
+    GenerationJobStatus,
+    Post,
+    PostGenerationJob,
+    PostGenerationSession,
+)
+from main.tests.utils import create_user, create_workspace
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    GENERATION_BACKEND="main.generation_backends.FakeBackend",
+    FAKE_GENERATION_LATENCY=0,
+    GENERATION_JOB_STALE_AFTER=60,
+    GENERATION_JOB_MAX_ATTEMPTS=2,
+)
+class GenerationJobTests(TestCase):
+    def setUp(self):
+        generation_backends._backend = None
+        self.addCleanup(setattr, generation_backends, "_backend", None)
+        self.user = create_user("owner@example.com")
+        self.workspace = create_workspace(self.user, create_user("b@example.com"))
+        self.session = PostGenerationSession.objects.create(
+            workspace=self.workspace, creator=self.user
+        )
+
+    def enqueue(self):
+        return enqueue_generation_job(
+            self.workspace,
+            self.user,
+            self.session,
+            range_start="2026-01-01",
+            range_end="2026-01-08",
+        )
+
+    def age(self, job, seconds):
+        PostGenerationJob.objects.filter(pk=job.pk).update(
+            started_at=timezone.now() - timedelta(seconds=seconds)
+        )
+
+    def test_claims_oldest_queued_job_once(self):
+        first, second = self.enqueue(), self.enqueue()
+
+        claimed = claim_next_job()
+        self.assertEqual(claimed.pk, first.pk)
+        first.refresh_from_db()
+        self.assertEqual(first.status, GenerationJobStatus.running)
+        self.assertEqual(first.attempts, 1)
+        self.assertIsNotNone(first.started_at)
+
+        self.assertEqual(claim_next_job().pk, second.pk)
+        self.assertIsNone(claim_next_job())
+
+    def test_run_saves_posts(self):
+        self.enqueue()
+        job = claim_next_job()
+        run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJobStatus.succeeded)
+        self.assertEqual(len(job.post_ids), FakeBackend.posts_per_plan)
+        self.assertEqual(
+            Post.objects.filter(id__in=job.post_ids, session=self.session).count(),
+            FakeBackend.posts_per_plan,
+        )
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(self.session.history.count(), 1)
+
+    def test_backend_failure_fails_job(self):
+        self.enqueue()
+        job = claim_next_job()
+        with mock.patch.object(
+            FakeBackend, "generate_posts", side_effect=RuntimeError("model down")
+        ), self.assertLogs("main.generation_jobs", "ERROR"):
+            run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJobStatus.failed)
+        self.assertEqual(job.error, "model down")
+        self.assertEqual(job.post_ids, [])
+        self.assertFalse(Post.objects.exists())
+
+    def test_stale_running_job_is_requeued(self):
+        self.enqueue()
+        job = claim_next_job()
+        self.age(job, 30)
+        self.assertEqual(requeue_stale_jobs(), 0)
+
+        self.age(job, 120)
+        with self.assertLogs("main.generation_jobs", "WARNING"):
+            self.assertEqual(requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJobStatus.queued)
+        self.assertIsNone(job.started_at)
+
+        self.assertEqual(claim_next_job().attempts, 2)
+
+    def test_stale_job_fails_after_max_attempts(self):
+        self.enqueue()
+        for _ in range(2):
+            job = claim_next_job()
+            self.age(job, 120)
+            with self.assertLogs("main.generation_jobs", "WARNING"):
+                requeue_stale_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJobStatus.failed)
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNone(claim_next_job())
+
+    def test_reclaimed_job_ignores_late_result(self):
+        self.enqueue()
+        lost = claim_next_job()
+        self.age(lost, 120)
+        with self.assertLogs("main.generation_jobs", "WARNING"):
+            requeue_stale_jobs()
+        current = claim_next_job()
+
+        with self.assertLogs("main.generation_jobs", "WARNING"):
+            run_job(lost)
+        current.refresh_from_db()
+        self.assertEqual(current.status, GenerationJobStatus.running)
+        run_job(current)
+        current.refresh_from_db()
+        self.assertEqual(current.status, GenerationJobStatus.succeeded)
+
+    def events(self, job):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(
+            f"/api/workspace/{self.workspace.id}/generation-jobs/{job.id}/events"
+        )
+        self.assertEqual(response.status_code, 200)
+        body = b"".join(response).decode()
+        return [
+            (lines[0].removeprefix("event: "), json.loads(lines[1][6:]))
+            for lines in (event.split("\n") for event in body.split("\n\n") if event)
+        ]
+
+    def test_events_end_with_finished_job(self):
+        self.enqueue()
+        job = claim_next_job()
+        run_job(job)
+
+        [(event, data)] = self.events(job)
+        self.assertEqual(event, "status")
+        self.assertEqual(data["status"], GenerationJobStatus.succeeded)
+        self.assertEqual(len(data["posts"]), FakeBackend.posts_per_plan)
+
+    @override_settings(GENERATION_JOB_STREAM_TIMEOUT=0)
+    def test_events_time_out(self):
+        job = self.enqueue()
+        events = self.events(job)
+        self.assertEqual([event for event, _ in events], ["status", "timeout"])
+        self.assertEqual(events[0][1]["status"], GenerationJobStatus.queued)
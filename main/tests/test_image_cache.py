@@ -0,0 +1,139 @@
+import os
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from main import image_generation
+from main.image_cache import (
+    cache_image,
+    evict_expired,
+    get_cached_image,
+    image_cache_key,
+)
+from main.image_generation import StubImageProvider, generate_post_image
+from main.media_refs import collect_garbage
+from main.media_storage import get_media_storage
+from main.models import ImageCacheEntry, MediaBlob, Post, PostType
+from main.tests.utils import (
+    TemporaryMediaMixin,
+    create_user,
+    create_workspace,
+    image_file,
+)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    IMAGE_PROVIDER="main.image_generation.StubImageProvider",
+    IMAGE_CACHE_ENABLED=True,
+    IMAGE_CACHE_MAX_AGE=3600,
+    IMAGE_CACHE_MAX_BYTES=10**6,
+)
+class ImageCacheTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        image_generation._provider = None
+        self.addCleanup(setattr, image_generation, "_provider", None)
+        self.provider = StubImageProvider()
+        self.storage = get_media_storage()
+        user = create_user("owner@example.com")
+        self.workspace = create_workspace(user)
+        self.user = user
+
+    def stored(self, color):
+        name = self.storage.save("image.png", image_file(color))
+        return name, self.storage.size(name)
+
+    def cache(self, prompt, color="red", size=None):
+        name, stored_size = self.stored(color)
+        cache_image(self.provider, prompt, name, size or stored_size)
+        return name
+
+    def refcount(self, name):
+        return MediaBlob.objects.get(name=name).refcount
+
+    def backdate(self, prompt, **fields):
+        key = image_cache_key(prompt, self.provider.model, str(self.provider.size))
+        ImageCacheEntry.objects.filter(key=key).update(**fields)
+
+    def test_hit_counts_and_prompt_normalization(self):
+        name = self.cache("A red  bicycle")
+
+        self.assertEqual(get_cached_image(self.provider, " a RED bicycle\n"), name)
+        self.assertIsNone(get_cached_image(self.provider, "a blue bicycle"))
+        other = StubImageProvider()
+        other.model = "other"
+        self.assertIsNone(get_cached_image(other, "a red bicycle"))
+        self.assertEqual(ImageCacheEntry.objects.get().hits, 1)
+        self.assertEqual(self.refcount(name), 1)
+
+    def test_expired_entries_are_evicted_and_released(self):
+        name = self.cache("old")
+        self.backdate("old", created_at=timezone.now() - timedelta(hours=2))
+
+        self.assertIsNone(get_cached_image(self.provider, "old"))
+        self.assertEqual(evict_expired(), 1)
+        self.assertFalse(ImageCacheEntry.objects.exists())
+        self.assertEqual(self.refcount(name), 0)
+
+    @override_settings(IMAGE_CACHE_MAX_BYTES=250)
+    def test_least_recently_used_entries_are_evicted_past_the_byte_limit(self):
+        now = timezone.now()
+        first = self.cache("first", "red", size=100)
+        second = self.cache("second", "green", size=100)
+        self.backdate("first", last_used_at=now - timedelta(minutes=1))
+        self.backdate("second", last_used_at=now - timedelta(minutes=2))
+
+        third = self.cache("third", "blue", size=100)
+
+        self.assertEqual(
+            set(ImageCacheEntry.objects.values_list("prompt", flat=True)),
+            {"first", "third"},
+        )
+        self.assertEqual(self.refcount(second), 0)
+        self.assertEqual(self.refcount(first), 1)
+        self.assertEqual(self.refcount(third), 1)
+
+    def test_recaching_a_prompt_replaces_the_entry(self):
+        old = self.cache("prompt", "red")
+        new = self.cache("prompt", "blue")
+
+        self.assertEqual(ImageCacheEntry.objects.get().image, new)
+        self.assertEqual(self.refcount(old), 0)
+        self.assertEqual(self.refcount(new), 1)
+
+    def test_evicted_image_survives_while_posts_use_it(self):
+        posts = [
+            Post.objects.create(
+                workspace=self.workspace,
+                creator=self.user,
+                assignee=self.user,
+                schedule_time=timezone.now(),
+                post_type=PostType.image,
+            )
+            for _ in range(2)
+        ]
+        for post in posts:
+            generate_post_image(post, "a red bicycle")
+        name = posts[0].post_image.name
+        self.assertEqual(posts[1].post_image.name, name)
+        self.assertEqual(ImageCacheEntry.objects.get().hits, 1)
+        # Two posts and the cache entry.
+        self.assertEqual(self.refcount(name), 3)
+
+        self.backdate("a red bicycle", created_at=timezone.now() - timedelta(hours=2))
+        evict_expired()
+        self.assertEqual(self.refcount(name), 2)
+
+        past = timezone.now() - timedelta(hours=2)
+        MediaBlob.objects.update(updated_at=past)
+        os.utime(self.storage.path(name), (past.timestamp(),) * 2)
+        self.assertEqual(collect_garbage(grace=60), (0, 0))
+        self.assertTrue(self.storage.exists(name))
+
+        for post in posts:
+            post.delete()
+        MediaBlob.objects.update(updated_at=past)
+        self.assertEqual(collect_garbage(grace=60)[0], 1)
+        self.assertFalse(self.storage.exists(name))
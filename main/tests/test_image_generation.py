@@ -0,0 +1,130 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from main import image_generation
+from main.image_generation import (
+    StubImageProvider,
+    _generate_image_task,
+    claim_post_image,
+    enqueue_post_images,
+    requeue_stale_images,
+    run_post_image,
+)
+from main.models import ImageStatus, Post, PostType
+from main.tests.utils import (
+    RecordingExecutor,
+    TemporaryMediaMixin,
+    create_user,
+    create_workspace,
+)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    IMAGE_PROVIDER="main.image_generation.StubImageProvider",
+    IMAGE_GENERATION_STALE_AFTER=60,
+)
+class PostImageTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        image_generation._provider = None
+        self.addCleanup(setattr, image_generation, "_provider", None)
+        self.executor = RecordingExecutor()
+        patcher = mock.patch.object(
+            image_generation, "get_image_executor", return_value=self.executor
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        user = create_user("owner@example.com")
+        self.workspace = create_workspace(user)
+        self.user = user
+
+    def create_post(self, prompt="a red bicycle", **kwargs):
+        return Post.objects.create(
+            workspace=self.workspace,
+            creator=self.user,
+            assignee=self.user,
+            schedule_time=timezone.now(),
+            post_type=PostType.image,
+            img_prompt=prompt,
+            **kwargs,
+        )
+
+    def test_enqueue_marks_pending_and_submits_on_commit(self):
+        post = self.create_post()
+        without_prompt = self.create_post(prompt=None)
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueued = enqueue_post_images([post, without_prompt])
+
+        self.assertEqual(enqueued, [post])
+        post.refresh_from_db()
+        self.assertEqual(post.image_status, ImageStatus.pending)
+        self.assertIsNotNone(post.image_updated_at)
+        self.assertEqual(
+            self.executor.calls,
+            [(_generate_image_task, (post.id, post.img_prompt), {})],
+        )
+
+    def test_claim_only_once(self):
+        post = self.create_post(image_status=ImageStatus.pending)
+        self.assertTrue(claim_post_image(post.id, image_status=ImageStatus.pending))
+        self.assertFalse(claim_post_image(post.id, image_status=ImageStatus.pending))
+        post.refresh_from_db()
+        self.assertEqual(post.image_status, ImageStatus.running)
+
+    def test_run_stores_rendered_image(self):
+        post = self.create_post(image_status=ImageStatus.running)
+        run_post_image(post.id, post.img_prompt)
+
+        post.refresh_from_db()
+        self.assertEqual(post.image_status, ImageStatus.done)
+        self.assertIsNone(post.image_error)
+        self.assertTrue(post.post_image.name.startswith("cas/"))
+        self.assertEqual(post.post_image.width, StubImageProvider.size[0])
+
+    def test_provider_error_fails_image(self):
+        post = self.create_post(image_status=ImageStatus.running)
+        with mock.patch.object(
+            StubImageProvider, "generate", side_effect=RuntimeError("quota")
+        ), self.assertLogs("main.image_generation", "ERROR"):
+            run_post_image(post.id, post.img_prompt)
+
+        post.refresh_from_db()
+        self.assertEqual(post.image_status, ImageStatus.failed)
+        self.assertEqual(post.image_error, "quota")
+        self.assertFalse(post.post_image)
+
+    def test_requeue_stale_images(self):
+        old = timezone.now() - timedelta(seconds=120)
+        lost_pending = self.create_post(
+            image_status=ImageStatus.pending, image_updated_at=old
+        )
+        lost_running = self.create_post(
+            image_status=ImageStatus.running, image_updated_at=old
+        )
+        fresh = self.create_post(
+            image_status=ImageStatus.running, image_updated_at=timezone.now()
+        )
+        self.create_post(image_status=ImageStatus.failed, image_updated_at=old)
+
+        with self.assertLogs("main.image_generation", "WARNING"):
+            self.assertEqual(requeue_stale_images(), 2)
+        self.assertCountEqual(
+            self.executor.calls,
+            [
+                (_generate_image_task, (post.id, post.img_prompt), {"claimed": True})
+                for post in (lost_pending, lost_running)
+            ],
+        )
+        for post in (lost_pending, lost_running):
+            post.refresh_from_db()
+            self.assertEqual(post.image_status, ImageStatus.running)
+            self.assertGreater(post.image_updated_at, old)
+        fresh_updated_at = fresh.image_updated_at
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.image_updated_at, fresh_updated_at)
+
+        self.assertEqual(requeue_stale_images(), 0)
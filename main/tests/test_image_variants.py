@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from main import image_variants
+from main.image_variants import (
+    _build_variants_task,
+    get_or_build_variants,
+    requeue_missing_variants,
+    set_image_variants,
+)
+from main.models import MediaBlob, Post, PostType
+from main.tests.utils import (
+    RecordingExecutor,
+    TemporaryMediaMixin,
+    create_user,
+    create_workspace,
+    image_file,
+)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    IMAGE_VARIANT_STALE_AFTER=60,
+)
+class ImageVariantTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.executor = RecordingExecutor()
+        # Encoding is the same in a thread; tests skip starting processes.
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        for name, value in [
+            ("get_variant_executor", self.executor),
+            ("get_variant_process_pool", pool),
+        ]:
+            patcher = mock.patch.object(image_variants, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = create_user("owner@example.com")
+        self.workspace = create_workspace(self.user)
+
+    def create_post(self, age=0, **kwargs):
+        post = Post(
+            workspace=self.workspace,
+            creator=self.user,
+            assignee=self.user,
+            schedule_time=timezone.now(),
+            post_type=PostType.image,
+            **kwargs,
+        )
+        post.post_image.save("image.png", image_file(size=(800, 400)), save=False)
+        post.save()
+        Post.objects.filter(pk=post.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=age)
+        )
+        return post
+
+    def test_build_and_share_variants(self):
+        first, second = self.create_post(), self.create_post()
+        name = first.post_image.name
+        self.assertEqual(second.post_image.name, name)
+
+        variants = get_or_build_variants(name)
+        self.assertEqual(set(variants), set(image_variants.VARIANTS))
+        with first.post_image.storage.open(variants["thumb"]) as f:
+            self.assertEqual(Image.open(f).size, (256, 128))
+
+        self.assertEqual(set_image_variants(name, variants, id=first.id), 1)
+        # The second post reuses the stored variants instead of encoding again.
+        with mock.patch.object(image_variants, "build_variants") as build:
+            self.assertEqual(get_or_build_variants(name), variants)
+        build.assert_not_called()
+        self.assertEqual(set_image_variants(name, variants), 1)
+        self.assertEqual(MediaBlob.objects.get(name=variants["webp"]).refcount, 2)
+
+    def test_requeue_missing_variants(self):
+        lost = self.create_post(age=120)
+        fresh = self.create_post(age=0)
+        done = self.create_post(age=120, image_variants={"thumb": "cas/x.jpg"})
+
+        with self.assertLogs("main.image_variants", "WARNING"):
+            self.assertEqual(requeue_missing_variants(), 1)
+        self.assertEqual(
+            self.executor.calls,
+            [(_build_variants_task, (lost.id, lost.post_image.name), {})],
+        )
+        self.assertNotIn(fresh.id, [args[0] for _, args, _ in self.executor.calls])
+        self.assertNotIn(done.id, [args[0] for _, args, _ in self.executor.calls])
+
+        # A post whose build keeps failing is retried once per interval.
+        self.assertEqual(requeue_missing_variants(), 0)
+        Post.objects.filter(pk=lost.pk).update(
+            variants_queued_at=timezone.now() - timedelta(seconds=120)
+        )
+        with self.assertLogs("main.image_variants", "WARNING"):
+            self.assertEqual(requeue_missing_variants(), 1)
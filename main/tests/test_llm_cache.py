@@ -0,0 +1,146 @@
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from main import generate_post_ai
+from main.generate_post_ai import generate_posts_ai, stream_generate_posts_ai
+from main.llm_cache import ResponseCache, response_cache
+from main.models import PostGenerationSession
+from main.tests.utils import create_user, create_workspace
+
+
+class FakeChat:
+    """Stands in for a Gemini chat session and answers with numbered replies."""
+
+    def __init__(self, model, history):
+        self.model = model
+        self.history = history
+
+    def send_message(self, prompt, stream=False):
+        self.model.calls.append((self.history, prompt))
+        text = json.dumps({"reply": len(self.model.calls)})
+        if not stream:
+            return SimpleNamespace(text=text)
+        return (SimpleNamespace(text=part) for part in (text[:5], text[5:]))
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def start_chat(self, history):
+        return FakeChat(self, history)
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def test_bypass_misses_and_counts(self):
+        cache = ResponseCache(maxsize=10, ttl=60)
+        cache.set("key", "text")
+
+        self.assertEqual(cache.get("key"), "text")
+        self.assertIsNone(cache.get("key", use_cache=False))
+        self.assertIsNone(cache.get("other"))
+        stats = cache.stats()
+        self.assertEqual(
+            (stats["hits"], stats["misses"], stats["bypasses"]), (1, 1, 1)
+        )
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "shared": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "llm-cache-tests",
+            },
+        }
+    )
+    def test_shared_tier_refills_the_local_one(self):
+        self.addCleanup(caches["shared"].clear)
+        writer = ResponseCache(maxsize=10, ttl=60, alias="shared")
+        reader = ResponseCache(maxsize=10, ttl=60, alias="shared")
+        writer.set("key", "text")
+
+        self.assertEqual(reader.get("key"), "text")
+        self.assertEqual(reader.local.get("key"), "text")
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class GenerationResponseCacheTests(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        self.addCleanup(response_cache.clear)
+        self.model = FakeModel()
+        patcher = mock.patch.object(
+            generate_post_ai, "get_model", return_value=self.model
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = create_user("owner@example.com")
+        self.workspace = create_workspace(self.user)
+        self.session = PostGenerationSession.objects.create(
+            creator=self.user, workspace=self.workspace
+        )
+
+    def generate(self, **kwargs):
+        response, _ = generate_posts_ai(
+            self.workspace, self.user, self.session, "launch week", **kwargs
+        )
+        return response["reply"]
+
+    def stream(self, **kwargs):
+        chunks, _ = stream_generate_posts_ai(
+            self.workspace, self.user, self.session, "launch week", **kwargs
+        )
+        return chunks
+
+    def test_identical_call_hits(self):
+        self.assertEqual(self.generate(), 1)
+        self.assertEqual(self.generate(), 1)
+        self.assertEqual(len(self.model.calls), 1)
+
+    def test_history_change_misses(self):
+        self.assertEqual(self.generate(), 1)
+        self.session.history.create(prompt="launch week", response="{}")
+
+        self.assertEqual(self.generate(), 2)
+        self.assertEqual(len(self.model.calls[1][0]), 2)
+
+    def test_use_cache_false_bypasses_and_refreshes(self):
+        self.assertEqual(self.generate(), 1)
+        self.assertEqual(self.generate(use_cache=False), 2)
+        self.assertEqual(self.generate(), 2)
+        self.assertEqual(len(self.model.calls), 2)
+
+    def test_complete_stream_is_cached(self):
+        text = "".join(self.stream())
+        self.assertEqual(json.loads(text), {"reply": 1})
+
+        self.assertEqual(list(self.stream()), [text])
+        self.assertEqual(self.generate(), 1)
+        self.assertEqual(len(self.model.calls), 1)
+
+    def test_interrupted_stream_is_not_cached(self):
+        chunks = self.stream()
+        next(chunks)
+        # The client went away before the last chunk.
+        chunks.close()
+
+        self.assertEqual(self.generate(), 2)
+        self.assertEqual(len(self.model.calls), 2)
+
+    def test_failed_stream_is_not_cached(self):
+        def broken(prompt, stream=False):
+            yield SimpleNamespace(text="{")
+            raise RuntimeError("connection reset")
+
+        with mock.patch.object(FakeChat, "send_message", side_effect=broken):
+            with self.assertRaises(RuntimeError):
+                list(self.stream())
+
+        self.assertEqual(self.generate(), 1)
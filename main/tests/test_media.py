@@ -0,0 +1,127 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.media_serving import media_access_cache
+from main.models import Post, PostType
+from main.tests.utils import (
+    TemporaryMediaMixin,
+    create_user,
+    create_workspace,
+    image_file,
+)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    MEDIA_SERVE_MODE="django",
+)
+class MediaViewTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media_access_cache.clear()
+        self.member = create_user("member@example.com")
+        self.outsider = create_user("outsider@example.com")
+        create_workspace(self.outsider, name="Other")
+        workspace = create_workspace(self.member)
+        self.post = Post(
+            workspace=workspace,
+            creator=self.member,
+            assignee=self.member,
+            schedule_time=timezone.now(),
+            post_type=PostType.image,
+        )
+        self.post.post_image.save("image.png", image_file(), save=False)
+        self.post.save()
+        self.name = self.post.post_image.name
+        self.url = f"{settings.MEDIA_URL}{self.name}"
+        self.size = self.post.post_image.size
+
+    def get(self, user=None, **headers):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        return client.get(self.url, **headers)
+
+    def test_url_is_the_plain_content_addressed_path(self):
+        self.assertTrue(self.name.startswith("cas/"))
+        self.assertEqual(self.post.post_image.url, self.url)
+
+    def test_member_gets_the_file(self):
+        response = self.get(self.member)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            b"".join(response.streaming_content), self.post.post_image.read()
+        )
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_unauthenticated_is_rejected(self):
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_non_member_gets_not_found(self):
+        self.assertEqual(self.get(self.outsider).status_code, 404)
+
+    def test_login_cookie_authenticates_media(self):
+        client = APIClient()
+        response = client.post(
+            "/api/user/login",
+            {"email": self.member.email, "password": "password"},
+            format="json",
+        )
+        cookie = response.cookies[settings.MEDIA_AUTH_COOKIE]
+        self.assertEqual(cookie["path"], settings.MEDIA_URL)
+        self.assertTrue(cookie["httponly"])
+        self.assertEqual(client.get(self.url).status_code, 200)
+
+        client.post("/api/user/logout", HTTP_AUTHORIZATION=f"Token {cookie.value}")
+        self.assertEqual(client.get(self.url).status_code, 401)
+
+    def test_range(self):
+        response = self.get(self.member, HTTP_RANGE="bytes=2-9")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 2-9/{self.size}")
+        self.post.post_image.open()
+        self.assertEqual(
+            b"".join(response.streaming_content), self.post.post_image.read()[2:10]
+        )
+
+    def test_suffix_range(self):
+        response = self.get(self.member, HTTP_RANGE="bytes=-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(
+            response["Content-Range"],
+            f"bytes {self.size - 4}-{self.size - 1}/{self.size}",
+        )
+
+    def test_unsatisfiable_range(self):
+        response = self.get(self.member, HTTP_RANGE=f"bytes={self.size}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{self.size}")
+
+    def test_invalid_range_sends_whole_file(self):
+        response = self.get(self.member, HTTP_RANGE="bytes=5-3")
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_range_mismatch_sends_whole_file(self):
+        response = self.get(
+            self.member, HTTP_RANGE="bytes=0-3", HTTP_IF_RANGE='"stale"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_none_match(self):
+        etag = self.get(self.member)["ETag"]
+        self.assertEqual(etag.strip('"'), self.name.rsplit("/", 1)[-1].split(".")[0])
+        response = self.get(self.member, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_if_modified_since(self):
+        last_modified = self.get(self.member)["Last-Modified"]
+        response = self.get(self.member, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_not_modified_still_checks_access(self):
+        etag = self.get(self.member)["ETag"]
+        response = self.get(self.outsider, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,185 @@
+import os
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from main.media_refs import collect_garbage
+from main.media_storage import get_media_storage
+from main.models import MediaBlob, Post, PostType
+from main.tests.utils import (
+    TemporaryMediaMixin,
+    create_user,
+    create_workspace,
+    image_file,
+)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class MediaRefsTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = get_media_storage()
+        self.user = create_user("owner@example.com")
+        self.workspace = create_workspace(self.user)
+
+    def post(self, image=None, **kwargs):
+        post = Post(
+            workspace=self.workspace,
+            creator=self.user,
+            assignee=self.user,
+            schedule_time=timezone.now(),
+            post_type=PostType.image,
+            **kwargs,
+        )
+        if image is not None:
+            post.post_image.save("image.png", image, save=False)
+        post.save()
+        return post
+
+    def refcounts(self):
+        return dict(MediaBlob.objects.values_list("name", "refcount"))
+
+    def age(self, *names, seconds=3600):
+        """Backdates blobs and their files past the GC grace period."""
+        past = timezone.now() - timedelta(seconds=seconds)
+        MediaBlob.objects.filter(name__in=names).update(updated_at=past)
+        for name in names:
+            if self.storage.exists(name):
+                os.utime(self.storage.path(name), (past.timestamp(),) * 2)
+
+    def test_saves_and_deletes_adjust_refcounts(self):
+        first = self.post(image_file("red"))
+        second = self.post(image_file("red"))
+        red = first.post_image.name
+        self.assertEqual(second.post_image.name, red)
+        self.assertEqual(self.refcounts(), {red: 2})
+
+        second.post_image.save("image.png", image_file("blue"), save=False)
+        second.image_variants = {"thumb": red}
+        second.save()
+        blue = second.post_image.name
+        self.assertEqual(self.refcounts(), {red: 2, blue: 1})
+
+        second.post_image = None
+        second.save()
+        self.assertEqual(self.refcounts(), {red: 2, blue: 0})
+
+        first.delete()
+        second.delete()
+        self.assertEqual(self.refcounts(), {red: 0, blue: 0})
+
+    def test_saves_without_media_fields_skip_the_lookup(self):
+        post = self.post(image_file())
+        post.post_text = "Edited"
+        with self.assertNumQueries(1):
+            post.save(update_fields=["post_text"])
+        self.assertEqual(self.refcounts(), {post.post_image.name: 1})
+
+    def test_collect_garbage_keeps_referenced_and_recent_blobs(self):
+        kept = self.post(image_file("red")).post_image.name
+        released = self.post(image_file("blue"))
+        stale = released.post_image.name
+        recent = self.post(image_file("green"))
+        touched = recent.post_image.name
+        released.delete()
+        recent.delete()
+        stale_size = self.storage.size(stale)
+        self.age(kept, stale, touched)
+        # Saving the same bytes again touches the file before the reference
+        # is added.
+        self.storage.save("image.png", image_file("green"))
+
+        self.assertEqual(collect_garbage(grace=60), (1, stale_size))
+
+        self.assertFalse(self.storage.exists(stale))
+        self.assertTrue(self.storage.exists(kept))
+        self.assertTrue(self.storage.exists(touched))
+        self.assertEqual(self.refcounts(), {kept: 1, touched: 0})
+
+    def test_collect_garbage_respects_the_grace_period(self):
+        post = self.post(image_file())
+        name = post.post_image.name
+        post.delete()
+        self.assertEqual(collect_garbage(grace=60), (0, 0))
+        self.assertTrue(self.storage.exists(name))
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class DedupeMediaCommandTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = get_media_storage()
+        user = create_user("owner@example.com")
+        workspace = create_workspace(user)
+        self.posts = Post.objects.bulk_create(
+            Post(
+                workspace=workspace,
+                creator=user,
+                assignee=user,
+                schedule_time=timezone.now(),
+                post_type=PostType.image,
+            )
+            for _ in range(3)
+        )
+
+    def legacy_file(self, name, content):
+        path = self.storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content.read())
+        return name
+
+    def test_moves_legacy_files_and_rebuilds_refcounts(self):
+        red = image_file("red").read()
+        first = self.legacy_file("posts/1/image.png", image_file("red"))
+        copy = self.legacy_file("posts/2/image.png", image_file("red"))
+        thumb = self.legacy_file("posts/2/thumb.png", image_file("blue", (8, 8)))
+        Post.objects.filter(id=self.posts[0].id).update(post_image=first)
+        Post.objects.filter(id=self.posts[1].id).update(
+            post_image=copy, image_variants={"thumb": thumb}
+        )
+        Post.objects.filter(id=self.posts[2].id).update(post_image="posts/3/gone.png")
+        # Referenced by nothing; the command should collect it.
+        orphan = self.storage.save("orphan.png", image_file("green"))
+        MediaBlob.objects.create(name=orphan, size=self.storage.size(orphan))
+        past = (timezone.now() - timedelta(hours=1)).timestamp()
+        os.utime(self.storage.path(orphan), (past, past))
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command("dedupe_media", grace=0, stdout=stdout, stderr=stderr)
+
+        names = dict(Post.objects.values_list("id", "post_image"))
+        shared = names[self.posts[0].id]
+        self.assertTrue(self.storage.is_content_addressed(shared))
+        self.assertEqual(names[self.posts[1].id], shared)
+        with self.storage.open(shared) as f:
+            self.assertEqual(f.read(), red)
+        self.assertEqual(names[self.posts[2].id], "posts/3/gone.png")
+        variants = Post.objects.get(id=self.posts[1].id).image_variants
+        self.assertTrue(self.storage.is_content_addressed(variants["thumb"]))
+
+        self.assertEqual(MediaBlob.objects.get(name=shared).refcount, 2)
+        self.assertEqual(MediaBlob.objects.get(name=variants["thumb"]).refcount, 1)
+        self.assertFalse(MediaBlob.objects.filter(name=orphan).exists())
+        self.assertFalse(self.storage.exists(orphan))
+        for name in (first, copy, thumb):
+            self.assertFalse(self.storage.exists(name))
+        self.assertIn("missing: posts/3/gone.png", stderr.getvalue())
+        self.assertIn("into 2 blobs", stdout.getvalue())
+        self.assertIn("Deleted 1 unreferenced blobs", stdout.getvalue())
+
+    def test_keep_originals(self):
+        name = self.legacy_file("posts/1/image.png", image_file())
+        Post.objects.filter(id=self.posts[0].id).update(post_image=name)
+
+        call_command("dedupe_media", keep_originals=True, stdout=StringIO())
+
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get().refcount, 1)
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+from django.test import TestCase, override_settings
+from firebase_admin import exceptions, messaging
+
+from main.notification_transport import (
+    DeliveryReport,
+    FakeTransport,
+    FirebaseTransport,
+    PushMessage,
+)
+from main.tests.utils import create_user
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class NotificationTransportTests(TestCase):
+    def message(self, key, token):
+        return PushMessage(key=key, token=token, title="Reminder", body="Post")
+
+    def test_batches_and_clears_invalid_tokens(self):
+        good = create_user("good@example.com", fcm_token="good-token")
+        gone = create_user("gone@example.com", fcm_token="gone-token")
+        transport = FakeTransport(latency=0, invalid_tokens={"gone-token"})
+        transport.batch_size = 2
+
+        report = transport.send(
+            [
+                self.message(1, "good-token"),
+                self.message(2, "gone-token"),
+                self.message(3, "good-token"),
+            ]
+        )
+
+        self.assertEqual(transport.batches, 2)
+        self.assertEqual(report.sent, [1, 3])
+        self.assertEqual(report.dropped, [2])
+        self.assertEqual(report.invalid_tokens, {"gone-token"})
+        good.refresh_from_db()
+        gone.refresh_from_db()
+        self.assertEqual(good.fcm_token, "good-token")
+        self.assertIsNone(gone.fcm_token)
+
+    def test_all_delivered_clears_nothing(self):
+        user = create_user("user@example.com", fcm_token="token")
+        with self.assertNumQueries(0):
+            report = FakeTransport(latency=0).send([self.message(1, "token")])
+        self.assertEqual(report.sent, [1])
+        user.refresh_from_db()
+        self.assertEqual(user.fcm_token, "token")
+
+    def test_firebase_errors_that_condemn_the_token(self):
+        transport = FirebaseTransport()
+        errors = {
+            "unregistered": messaging.UnregisteredError("Token unregistered"),
+            "not-found": exceptions.NotFoundError("Requested entity not found"),
+            "bad-token": exceptions.InvalidArgumentError(
+                "The registration token is not a valid FCM registration token"
+            ),
+            "bad-payload": exceptions.InvalidArgumentError(
+                "Message.data must not exceed 4096 bytes"
+            ),
+            "sender": messaging.SenderIdMismatchError("Sender id mismatch"),
+            "unavailable": exceptions.UnavailableError("Try again later"),
+        }
+        messages = [self.message(key, f"{key}-token") for key in errors]
+        response = SimpleNamespace(
+            responses=[
+                SimpleNamespace(success=False, exception=error)
+                for error in errors.values()
+            ]
+        )
+        report = DeliveryReport()
+        with self.assertLogs("main.notification_transport", "WARNING"):
+            transport.collect(messages, response, report)
+
+        self.assertEqual(report.dropped, ["unregistered", "not-found", "bad-token"])
+        self.assertEqual(
+            report.invalid_tokens,
+            {"unregistered-token", "not-found-token", "bad-token-token"},
+        )
+        self.assertEqual(report.failed, ["bad-payload", "sender", "unavailable"])
@@ -0,0 +1,69 @@
+import io
+from unittest import mock
+
+import requests
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase
+from requests.adapters import BaseAdapter
+
+from main import outbound_http
+from main.outbound_http import (
+    DOWNLOAD_CHUNK_SIZE,
+    OutboundSession,
+    download_to_storage,
+    get_http_stats,
+)
+from main.tests.utils import TemporaryMediaMixin
+
+
+class StaticAdapter(BaseAdapter):
+    """Answers every request with ``body``, or ``status`` without one."""
+
+    def __init__(self, body=b"", status=200):
+        super().__init__()
+        self.body = body
+        self.status = status
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status
+        response.raw = io.BytesIO(self.body)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class DownloadTests(TemporaryMediaMixin, SimpleTestCase):
+    def use_adapter(self, adapter):
+        session = OutboundSession()
+        session.mount("https://", adapter)
+        patcher = mock.patch.object(
+            outbound_http, "get_http_session", return_value=session
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_download_to_storage_streams_the_body(self):
+        body = bytes(range(256)) * (DOWNLOAD_CHUNK_SIZE // 128)
+        self.use_adapter(StaticAdapter(body))
+        before = get_http_stats().get("download.test", {}).get("bytes", 0)
+
+        name = download_to_storage(
+            "https://download.test/a.jpg", default_storage, "seed/a.jpg"
+        )
+
+        self.assertEqual(name, "seed/a.jpg")
+        with default_storage.open(name) as f:
+            self.assertEqual(f.read(), body)
+        self.assertEqual(get_http_stats()["download.test"]["bytes"] - before, len(body))
+
+    def test_error_status_stores_nothing(self):
+        self.use_adapter(StaticAdapter(status=404))
+        with self.assertRaises(requests.HTTPError):
+            download_to_storage(
+                "https://download.test/missing.jpg", default_storage, "seed/b.jpg"
+            )
+        self.assertFalse(default_storage.exists("seed/b.jpg"))
@@ -0,0 +1,124 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.models import Post, PostType
+from main.post_calendar import encode_cursor
+from main.tests.utils import create_user, create_workspace
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class PostCalendarTests(TestCase):
+    def setUp(self):
+        self.start = timezone.now().replace(microsecond=0)
+        self.owner = create_user("owner@example.com")
+        self.member = create_user("member@example.com")
+        self.workspace = create_workspace(self.owner, self.member)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = f"/api/workspace/{self.workspace.id}/posts/calendar"
+
+    def post(self, hours=0, assignee=None, **kwargs):
+        return Post.objects.create(
+            workspace=self.workspace,
+            creator=self.owner,
+            assignee=assignee or self.owner,
+            schedule_time=self.start + timedelta(hours=hours),
+            post_type=PostType.text,
+            post_text="Post",
+            **kwargs,
+        )
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        ids = [row["id"] for row in response.data["results"]]
+        return ids, response.data["next_cursor"]
+
+    def test_pages_through_equal_timestamps(self):
+        posts = [self.post(hours=1) for _ in range(5)] + [self.post(hours=0)]
+        expected = [posts[-1].id] + [post.id for post in posts[:-1]]
+
+        seen, cursor = [], None
+        while True:
+            params = {"page_size": 2}
+            if cursor:
+                params["cursor"] = cursor
+            ids, cursor = self.get(**params)
+            seen += ids
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, expected)
+
+    def test_exact_final_page_has_no_cursor(self):
+        self.post()
+        self.post()
+        self.assertEqual(len(self.get(page_size=2)[0]), 2)
+        self.assertIsNone(self.get(page_size=2)[1])
+
+    def test_filters(self):
+        early = self.post(hours=0)
+        late = self.post(hours=5, assignee=self.member)
+        done = self.post(hours=2, is_completed=True)
+        deleted = self.post(hours=3, is_deleted=True)
+
+        self.assertEqual(self.get()[0], [early.id, done.id, late.id])
+        self.assertEqual(
+            self.get(
+                start=(self.start + timedelta(hours=1)).isoformat(),
+                end=(self.start + timedelta(hours=5)).isoformat(),
+            )[0],
+            [done.id],
+        )
+        self.assertEqual(self.get(assignee=self.member.id)[0], [late.id])
+        self.assertEqual(self.get(is_completed="true")[0], [done.id])
+        self.assertEqual(self.get(is_completed="false")[0], [early.id, late.id])
+        self.assertEqual(self.get(is_deleted="true")[0], [deleted.id])
+
+    def test_invalid_cursors_are_rejected(self):
+        self.post()
+        moment = self.start.isoformat()
+        cursors = [
+            "not base64!",
+            raw_cursor("not json"),
+            base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+            raw_cursor("5"),
+            raw_cursor('"ab"'),
+            raw_cursor(json.dumps([moment, 1, 2])),
+            raw_cursor(json.dumps([1, 1])),
+            raw_cursor(json.dumps(["yesterday", 1])),
+            raw_cursor(json.dumps([moment, "one"])),
+            raw_cursor(json.dumps([moment, None])),
+            raw_cursor(json.dumps([moment, 1.5])),
+            raw_cursor(json.dumps([moment, 0])),
+            raw_cursor(json.dumps([moment, 2**80])),
+            raw_cursor(f'["{moment}", 1e400]'),
+            raw_cursor(f'["{moment}", NaN]'),
+            raw_cursor(json.dumps([self.start.replace(tzinfo=None).isoformat(), 1])),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("cursor", response.data)
+
+    def test_valid_cursor_round_trips(self):
+        first = self.post(hours=0)
+        second = self.post(hours=1)
+        cursor = encode_cursor(self.start.isoformat(), first.id)
+        self.assertEqual(self.get(cursor=cursor)[0], [second.id])
+
+    def test_non_member_gets_404(self):
+        self.client.force_authenticate(create_user("outsider@example.com"))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
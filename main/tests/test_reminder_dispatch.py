@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from main.models import Post, PostType, Reminder
+from main.notification_transport import FakeTransport
+from main.reminder_dispatch import dispatch_chunk, due_by, next_deadline
+from main.tests.utils import create_user, create_workspace
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class ReminderDispatchTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.users = {
+            token: create_user(f"{token}@example.com", fcm_token=token)
+            for token in ("good", "gone", "flaky")
+        }
+        self.users["none"] = create_user("none@example.com")
+        self.workspace = create_workspace(*self.users.values())
+
+    def reminder(self, token="good", minutes=-1, **kwargs):
+        user = self.users[token]
+        post = Post.objects.create(
+            workspace=self.workspace,
+            creator=user,
+            assignee=user,
+            schedule_time=self.now,
+            post_type=PostType.text,
+            post_text=f"Post for {token}",
+        )
+        return Reminder.objects.create(
+            creator=user,
+            post=post,
+            reminder_time=self.now + timedelta(minutes=minutes),
+            **kwargs,
+        )
+
+    def due_ids(self):
+        due = Reminder.objects.filter(due_by(self.now))
+        return set(due.values_list("id", flat=True))
+
+    def test_due_by(self):
+        due = self.reminder(minutes=-5)
+        snoozed_due = self.reminder(
+            minutes=-60, is_notified=True, snooze_time=self.now - timedelta(minutes=1)
+        )
+        self.reminder(minutes=5)
+        self.reminder(minutes=-5, is_notified=True)
+        self.reminder(minutes=-5, snooze_time=self.now + timedelta(minutes=10))
+
+        self.assertEqual(self.due_ids(), {due.id, snoozed_due.id})
+        self.assertEqual(next_deadline(snoozed_due), snoozed_due.snooze_time)
+        self.assertEqual(next_deadline(due), due.reminder_time)
+
+    def test_chunks_in_deadline_order_and_marks_sent(self):
+        reminders = [self.reminder(minutes=-minutes) for minutes in (1, 5, 3, 4, 2)]
+        transport = FakeTransport(latency=0)
+
+        self.assertEqual(dispatch_chunk(self.now, 2, set(), transport), 2)
+        self.assertEqual(transport.batches, 1)
+        self.assertEqual(
+            [message.key for message in transport.delivered],
+            [reminders[1].id, reminders[3].id],
+        )
+        self.assertEqual(dispatch_chunk(self.now, 2, set(), transport), 2)
+        self.assertEqual(dispatch_chunk(self.now, 2, set(), transport), 1)
+        self.assertEqual(dispatch_chunk(self.now, 2, set(), transport), 0)
+
+        self.assertEqual(len(transport.delivered), 5)
+        self.assertFalse(Reminder.objects.filter(is_notified=False).exists())
+
+    def test_sent_snoozed_reminder_is_unsnoozed(self):
+        reminder = self.reminder(
+            is_notified=True, snooze_time=self.now - timedelta(minutes=1)
+        )
+        dispatch_chunk(self.now, 10, set(), FakeTransport(latency=0))
+        reminder.refresh_from_db()
+        self.assertIsNone(reminder.snooze_time)
+        self.assertTrue(reminder.is_notified)
+
+    def test_failure_bookkeeping(self):
+        sent = self.reminder("good")
+        failed = self.reminder("flaky")
+        dropped = self.reminder("gone")
+        no_token = self.reminder("none")
+        transport = FakeTransport(
+            latency=0, invalid_tokens={"gone"}, failing_tokens={"flaky"}
+        )
+        failed_ids = set()
+
+        self.assertEqual(dispatch_chunk(self.now, 10, failed_ids, transport), 4)
+
+        self.assertEqual(failed_ids, {failed.id})
+        self.assertEqual(self.due_ids(), {failed.id})
+        for reminder in (sent, dropped, no_token):
+            reminder.refresh_from_db()
+            self.assertTrue(reminder.is_notified)
+        self.users["gone"].refresh_from_db()
+        self.assertIsNone(self.users["gone"].fcm_token)
+
+        # The failed reminder is left for the next run, not retried in this one.
+        self.assertEqual(dispatch_chunk(self.now, 10, failed_ids, transport), 0)
+        self.assertEqual(dispatch_chunk(self.now, 10, set(), transport), 1)
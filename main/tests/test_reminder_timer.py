@@ -0,0 +1,191 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main import reminder_timer
+from main.models import Post, PostType, Reminder
+from main.reminder_timer import ReminderTimer, notify_reminder_saved
+from main.tests.utils import create_user, create_workspace
+
+
+class ReminderTimerHeapTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.timer = ReminderTimer(
+            dispatch=mock.Mock(), horizon=timedelta(minutes=10), reload_interval=60
+        )
+        self.timer._loaded_until = self.now + timedelta(minutes=10)
+
+    def at(self, minutes):
+        return self.now + timedelta(minutes=minutes)
+
+    def test_pops_only_due_deadlines(self):
+        self.timer.schedule(1, self.at(-1))
+        self.timer.schedule(2, self.at(5))
+
+        self.assertTrue(self.timer._pop_due(self.now))
+        self.assertEqual(list(self.timer._deadlines), [2])
+        self.assertFalse(self.timer._pop_due(self.now))
+        self.assertEqual(self.timer._seconds_until_next(self.now), 300)
+
+    def test_reschedule_replaces_heap_entry(self):
+        self.timer.schedule(1, self.at(-1))
+        self.timer.schedule(1, self.at(5))
+
+        self.assertEqual(len(self.timer), 1)
+        # The stale entry is still in the heap but no longer fires.
+        self.assertFalse(self.timer._pop_due(self.now))
+        self.assertEqual(self.timer._seconds_until_next(self.now), 300)
+
+        self.timer.schedule(1, self.at(2))
+        self.assertEqual(self.timer._seconds_until_next(self.now), 120)
+
+    def test_delete_and_out_of_window_drop_the_reminder(self):
+        self.timer.schedule(1, self.at(1))
+        self.timer.schedule(2, self.at(2))
+        self.timer.schedule(1, None)
+        self.timer.schedule(2, self.at(60))
+
+        self.assertEqual(len(self.timer), 0)
+        self.assertFalse(self.timer._pop_due(self.at(120)))
+        self.assertIsNone(self.timer._seconds_until_next(self.now))
+
+    def test_run_dispatches_when_a_deadline_passes(self):
+        self.timer.dispatch.side_effect = self.timer.stop
+        self.timer.schedule(1, self.at(-1))
+
+        with mock.patch.object(self.timer, "reload"):
+            self.timer.run()
+
+        self.timer.dispatch.assert_called_once_with()
+        self.assertEqual(len(self.timer), 0)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class ReminderTimerReloadTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.user = create_user("owner@example.com")
+        workspace = create_workspace(self.user)
+        self.post = Post.objects.create(
+            workspace=workspace,
+            creator=self.user,
+            assignee=self.user,
+            schedule_time=self.now,
+            post_type=PostType.text,
+            post_text="Reminded",
+        )
+        self.timer = ReminderTimer(
+            dispatch=mock.Mock(), horizon=timedelta(minutes=10), reload_interval=60
+        )
+        # reload() closes the connection for its worker thread, which would
+        # end the test transaction.
+        patcher = mock.patch.object(reminder_timer.connection, "close")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def reminder(self, minutes, **kwargs):
+        return Reminder.objects.create(
+            creator=self.user,
+            post=self.post,
+            reminder_time=self.now + timedelta(minutes=minutes),
+            **kwargs,
+        )
+
+    def test_reload_loads_the_window(self):
+        due = self.reminder(-1)
+        snoozed = self.reminder(
+            -30, is_notified=True, snooze_time=self.now + timedelta(minutes=5)
+        )
+        self.reminder(60)
+        self.reminder(-1, is_notified=True)
+
+        self.timer.reload()
+
+        self.assertEqual(
+            self.timer._deadlines,
+            {due.id: due.reminder_time, snoozed.id: snoozed.snooze_time},
+        )
+
+    def test_changes_heard_during_reload_are_replayed(self):
+        moved = self.reminder(-1)
+        deleted = self.reminder(-2)
+        query = Reminder.objects.filter
+
+        def filter_and_schedule(*args, **kwargs):
+            rows = query(*args, **kwargs)
+            list(rows)
+            self.timer.schedule(moved.id, self.now + timedelta(minutes=3))
+            self.timer.schedule(deleted.id, None)
+            return rows
+
+        with mock.patch.object(
+            Reminder.objects, "filter", side_effect=filter_and_schedule
+        ):
+            self.timer.reload()
+
+        self.assertEqual(
+            self.timer._deadlines, {moved.id: self.now + timedelta(minutes=3)}
+        )
+        self.assertIsNone(self.timer._changes_during_reload)
+
+    def test_notify_reminder_saved_sends_next_deadline(self):
+        reminder = self.reminder(
+            -30, is_notified=True, snooze_time=self.now + timedelta(minutes=5)
+        )
+        connection = mock.MagicMock(vendor="postgresql")
+
+        with mock.patch.object(reminder_timer, "connection", connection):
+            notify_reminder_saved(reminder)
+
+        cursor = connection.cursor.return_value.__enter__.return_value
+        sql, (channel, payload) = cursor.execute.call_args.args
+        self.assertEqual(channel, reminder_timer.CHANNEL)
+        self.assertEqual(
+            json.loads(payload),
+            {"id": reminder.id, "deadline": reminder.snooze_time.isoformat()},
+        )
+
+    def test_views_notify_on_save_and_delete(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = f"/api/workspace/{self.post.workspace_id}/posts/{self.post.id}/reminders"
+        reminder_time = self.now + timedelta(minutes=5)
+
+        with mock.patch.object(reminder_timer, "connection") as connection:
+            connection.vendor = "postgresql"
+            response = client.post(
+                url, {"reminder_time": reminder_time.isoformat()}, format="json"
+            )
+            self.assertEqual(response.status_code, 201)
+            reminder_id = response.data["id"]
+            response = client.put(
+                f"{url}/{reminder_id}",
+                {"snooze_time": (reminder_time + timedelta(minutes=1)).isoformat()},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 200)
+            response = client.delete(f"{url}/{reminder_id}")
+            self.assertEqual(response.status_code, 204)
+
+        cursor = connection.cursor.return_value.__enter__.return_value
+        payloads = [
+            json.loads(call.args[1][1]) for call in cursor.execute.call_args_list
+        ]
+        self.assertEqual(
+            payloads,
+            [
+                {"id": reminder_id, "deadline": reminder_time.isoformat()},
+                {
+                    "id": reminder_id,
+                    "deadline": (reminder_time + timedelta(minutes=1)).isoformat(),
+                },
+                {"id": reminder_id, "deadline": None},
+            ],
+        )
@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.test import TestCase
+
+from main import image_variants, post_seeding
+from main.management.commands.seed_data import Seeder, parse_now
+from main.models import Post, Reminder, User
+from main.post_seeding import get_image_pool, pool_image_name
+from main.tests.utils import InlineExecutor, TemporaryMediaMixin
+
+NOW = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+
+class SeedDataTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        for target, name, value in [
+            (image_variants, "get_variant_process_pool", mock.Mock(return_value=pool)),
+            (post_seeding, "IMAGE_POOL_SIZE", 3),
+            (post_seeding, "_image_pool", None),
+            (post_seeding, "ThreadPoolExecutor", InlineExecutor),
+        ]:
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def options(self, **overrides):
+        return {
+            "seed": 7,
+            "now": NOW,
+            "copy": False,
+            "members": 3,
+            "posts": 20,
+            "reminders": 1.5,
+            "sessions": 2,
+            "past_days": 30,
+            "future_days": 30,
+            "batch_size": 100,
+            "image_pool": list(get_image_pool(offline=True).items()),
+            **overrides,
+        }
+
+    def snapshot(self):
+        return (
+            list(User.objects.order_by("email").values_list("email", "fcm_token")),
+            list(
+                Post.objects.order_by("schedule_time").values_list(
+                    "schedule_time", "post_type", "post_image", "is_completed"
+                )
+            ),
+            sorted(Reminder.objects.values_list("reminder_time", "is_notified")),
+        )
+
+    def seed(self, **overrides):
+        with transaction.atomic():
+            Seeder(self.options(**overrides)).seed_workspaces([0, 1])
+            snapshot = self.snapshot()
+            transaction.set_rollback(True)
+        return snapshot
+
+    def test_same_seed_and_now_reproduce_the_data(self):
+        first = self.seed()
+        self.assertEqual(len(first[1]), 40)
+        self.assertEqual(self.seed(), first)
+
+        users, posts, reminders = first
+        self.assertTrue(all(token is None for _, token in users))
+        self.assertTrue(any(is_completed for *_, is_completed in posts))
+
+    def test_now_moves_the_schedule(self):
+        later = NOW.replace(year=2027)
+        _, posts, _ = self.seed(now=later)
+        _, original, _ = self.seed()
+        self.assertEqual(
+            [post[0] - later for post in posts],
+            [post[0] - NOW for post in original],
+        )
+
+    def test_offline_pool_uses_placeholders(self):
+        pool = get_image_pool(offline=True)
+        self.assertEqual(len(pool), 3)
+        for name, variants in pool.items():
+            self.assertTrue(name.startswith("cas/"))
+            self.assertEqual(set(variants), set(image_variants.VARIANTS))
+        self.assertFalse(default_storage.exists(pool_image_name(0)))
+
+    def test_unreachable_download_falls_back_to_placeholder(self):
+        with mock.patch.object(
+            post_seeding,
+            "download_to_storage",
+            side_effect=post_seeding.requests.ConnectionError("offline"),
+        ), self.assertLogs("main.post_seeding", "WARNING"):
+            online = get_image_pool()
+        post_seeding._image_pool = None
+        self.assertEqual(get_image_pool(offline=True), online)
+
+    def test_parse_now(self):
+        self.assertEqual(parse_now("2026-01-01T12:00:00Z"), NOW)
+        self.assertTrue(parse_now("2026-01-01T12:00").tzinfo)
+        with self.assertRaises(ValueError):
+            parse_now("yesterday")
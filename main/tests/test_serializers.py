@@ -0,0 +1,75 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from main.models import User, Workspace
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class SerializerQueryCountTests(TestCase):
+    """The workspace/user graph must serialize in a constant number of queries."""
+
+    def create_user(self, email):
+        return User.objects.create_user(
+            email=email, password="password", username=email.split("@")[0]
+        )
+
+    def create_workspaces(self, prefix, workspaces, members):
+        owner = self.create_user(f"{prefix}-owner@example.com")
+        for i in range(workspaces):
+            workspace = Workspace.objects.create(name=f"{prefix} {i}", owner=owner)
+            workspace.members.add(
+                owner,
+                *[
+                    self.create_user(f"{prefix}-{i}-{j}@example.com")
+                    for j in range(members)
+                ],
+            )
+        return owner
+
+    def count_queries(self, user, method, path, data=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(path, data, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(queries)
+
+    def assertConstantQueries(self, method, path, data=None):
+        small = self.create_workspaces("small", workspaces=1, members=1)
+        large = self.create_workspaces("large", workspaces=5, members=4)
+        self.assertEqual(
+            self.count_queries(small, method, path, data and data(small)),
+            self.count_queries(large, method, path, data and data(large)),
+        )
+
+    def test_workspace_list(self):
+        self.assertConstantQueries("get", "/api/workspace/")
+
+    def test_login(self):
+        self.assertConstantQueries(
+            "post",
+            "/api/user/login",
+            lambda user: {"email": user.email, "password": "password"},
+        )
+
+    def test_add_member(self):
+        small = self.create_workspaces("small", workspaces=1, members=1)
+        large = self.create_workspaces("large", workspaces=1, members=8)
+        counts = []
+        for owner in (small, large):
+            new_member = self.create_user(f"new-{owner.email}")
+            workspace = owner.owned_workspaces.get()
+            counts.append(
+                self.count_queries(
+                    owner,
+                    "post",
+                    f"/api/workspace/{workspace.id}/add-member",
+                    {"email": new_member.email},
+                )
+            )
+        self.assertEqual(counts[0], counts[1])
+
@@ -0,0 +1,90 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from main.models import (
+    PostGenerationSession,
+    PostGenerationSessionSummary,
+    User,
+    Workspace,
+)
+from main.session_history import (
+    build_chat_history,
+    compact_session_history,
+    estimate_tokens,
+)
+
+
+class HistoryMetricsTests(TestCase):
+    """Replay metrics recorded while building chat history reach pool-stats."""
+
+    def test_pool_stats_reports_history_metrics(self):
+        admin = User.objects.create_user(
+            email="admin@example.com", username="admin", is_staff=True
+        )
+        workspace = Workspace.objects.create(name="History", owner=admin)
+        session = PostGenerationSession.objects.create(
+            creator=admin, workspace=workspace
+        )
+        session.history.create(prompt="write a post", response="{}")
+        PostGenerationSessionSummary.objects.create(
+            session=session, summary="older", elided_tokens=100, summary_tokens=10
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        before = client.get("/api/admin/pool-stats").data["history"]
+        history = build_chat_history(session)
+        after = client.get("/api/admin/pool-stats").data["history"]
+
+        self.assertEqual(after["replays"] - before["replays"], 1)
+        self.assertEqual(
+            after["tokens_replayed"] - before["tokens_replayed"],
+            sum(estimate_tokens(item["parts"][0]) for item in history),
+        )
+        self.assertEqual(after["tokens_saved"] - before["tokens_saved"], 90)
+
+
+@override_settings(GENERATION_HISTORY_WINDOW=2)
+class CompactSessionHistoryTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(email="owner@example.com", username="owner")
+        workspace = Workspace.objects.create(name="History", owner=user)
+        self.session = PostGenerationSession.objects.create(
+            creator=user, workspace=workspace
+        )
+
+    def add_turns(self, *prompts):
+        for prompt in prompts:
+            self.session.history.create(prompt=prompt, response="{}")
+
+    def summary(self):
+        return PostGenerationSessionSummary.objects.filter(session=self.session).first()
+
+    def test_short_history_is_not_summarized(self):
+        self.add_turns("one", "two")
+        compact_session_history(self.session)
+        self.assertIsNone(self.summary())
+
+    def test_folds_each_turn_once(self):
+        self.add_turns("one", "two", "three", "four")
+        compact_session_history(self.session)
+        compact_session_history(self.session)
+
+        summary = self.summary()
+        self.assertEqual(summary.summary.count("request: one"), 1)
+        self.assertEqual(summary.summary.count("request: two"), 1)
+        self.assertNotIn("three", summary.summary)
+        ids = list(self.session.history.order_by("id").values_list("id", flat=True))
+        self.assertEqual(summary.through_history_id, ids[1])
+        elided = summary.elided_tokens
+
+        self.add_turns("five")
+        compact_session_history(self.session)
+        summary.refresh_from_db()
+        self.assertEqual(summary.summary.count("request: three"), 1)
+        self.assertEqual(summary.summary.count("request: one"), 1)
+        self.assertEqual(
+            summary.elided_tokens,
+            elided + estimate_tokens("three") + estimate_tokens("{}"),
+        )
+
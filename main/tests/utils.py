@@ -0,0 +1,68 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from PIL import Image
+
+from main.models import User, Workspace
+
+
+class TemporaryMediaMixin:
+    """Points MEDIA_ROOT at a fresh directory for each test."""
+
+    def setUp(self):
+        super().setUp()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        media_root = override_settings(MEDIA_ROOT=root)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+
+def create_user(email, **kwargs):
+    return User.objects.create_user(
+        email=email, password="password", username=email.split("@")[0], **kwargs
+    )
+
+
+def create_workspace(owner, *members, name="Workspace"):
+    workspace = Workspace.objects.create(name=name, owner=owner)
+    workspace.members.add(owner, *members)
+    return workspace
+
+
+def image_file(color="red", size=(64, 48), name="image.png") -> ContentFile:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+class RecordingExecutor:
+    """Stands in for a pool executor and records what was submitted."""
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.calls.append((fn, args, kwargs))
+
+
+class InlineExecutor:
+    """
+    Runs ``map`` in the calling thread, so the work shares the test's
+    transaction; a separate thread would find the in-memory database locked.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
@@ -3,10 +3,24 @@ from django.urls import path
 from main.generation_views.post_generation_ai_view import (
     GeneratePostsViewAI,
     RegeneratePostViewAI, GeneratePostImageViewAI,
+    GeneratePostsStreamViewAI,
+    GenerateSessionImagesViewAI,
+    LLMResponseCacheView,
+)
+from main.generation_views.async_post_generation_ai_view import (
+    AsyncGeneratePostImageViewAI,
+    AsyncGeneratePostsViewAI,
+    AsyncRegeneratePostViewAI,
+)
+from main.generation_views.post_generation_job_view import (
+    GenerationJobView,
+    GenerationJobEventsView,
 )
 from main.views import (
     RegisterView,
     LoginView,
+    LogoutView,
+    PoolStatsView,
     UserViewset,
     WorkspaceViewSet,
     GeneratePostsView,
@@ -18,6 +32,9 @@ from main.views import (
 urlpatterns = [
     path("user/register", RegisterView.as_view(), name="register"),
     path("user/login", LoginView.as_view(), name="login"),
+    path("user/logout", LogoutView.as_view(), name="logout"),
+    path("admin/pool-stats", PoolStatsView.as_view(), name="pool-stats"),
+    path("admin/llm-cache", LLMResponseCacheView.as_view(), name="llm-cache"),
     path(
         "user/update",
         UserViewset.as_view({"put": "partial_update"}),
@@ -50,6 +67,31 @@ urlpatterns = [
         GeneratePostsViewAI.as_view(),
         name="generate-posts-ai",
     ),
+    path(
+        "workspace/<int:workspace_id>/generate-posts-ai/async",
+        AsyncGeneratePostsViewAI.as_view(),
+        name="generate-posts-ai-async",
+    ),
+    path(
+        "workspace/<int:workspace_id>/generate-posts-ai/stream",
+        GeneratePostsStreamViewAI.as_view(),
+        name="generate-posts-ai-stream",
+    ),
+    path(
+        "workspace/<int:workspace_id>/sessions/<int:session_id>/generate-images-ai",
+        GenerateSessionImagesViewAI.as_view(),
+        name="generate-session-images-ai",
+    ),
+    path(
+        "workspace/<int:workspace_id>/generation-jobs/<int:job_id>",
+        GenerationJobView.as_view(),
+        name="generation-job",
+    ),
+    path(
+        "workspace/<int:workspace_id>/generation-jobs/<int:job_id>/events",
+        GenerationJobEventsView.as_view(),
+        name="generation-job-events",
+    ),
     path(
         "workspace/<int:workspace_id>/posts/<int:post_id>/regenerate",
         RegeneratePost.as_view(),
@@ -60,11 +102,21 @@ urlpatterns = [
         RegeneratePostViewAI.as_view(),
         name="regenerate-post-ai",
     ),
+    path(
+        "workspace/<int:workspace_id>/posts/<int:post_id>/regenerate-ai/async",
+        AsyncRegeneratePostViewAI.as_view(),
+        name="regenerate-post-ai-async",
+    ),
     path(
         "workspace/<int:workspace_id>/posts/<int:post_id>/generate-post-image-ai",
         GeneratePostImageViewAI.as_view(),
         name="regenerate-post-ai",
     ),
+    path(
+        "workspace/<int:workspace_id>/posts/<int:post_id>/generate-post-image-ai/async",
+        AsyncGeneratePostImageViewAI.as_view(),
+        name="generate-post-image-ai-async",
+    ),
     path(
         "workspace/<int:workspace_id>/posts/<int:post_id>/",
         PostViewSet.as_view(
@@ -72,6 +124,11 @@ urlpatterns = [
         ),
         name="post-detail",
     ),
+    path(
+        "workspace/<int:workspace_id>/posts/calendar",
+        PostViewSet.as_view({"get": "calendar"}),
+        name="post-calendar",
+    ),
     path(
         "workspace/<int:workspace_id>/posts/",
         PostViewSet.as_view({"post": "create", "get": "list"}),
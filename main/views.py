@@ -1,21 +1,45 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-import faker
-import requests
-from django.core.files.base import ContentFile
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from rest_framework import serializers
+from django.utils import timezone
+from rest_framework import serializers, status
 from rest_framework import viewsets
 from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from content_chronicle import logger
+from main.authentication import (
+    CachedTokenAuthentication,
+    MediaCookieAuthentication,
+    delete_media_cookie,
+    set_media_cookie,
+)
+from main.db_pool import get_database_stats
+from main.image_variants import enqueue_image_variants
+from main.media_serving import can_access, serve_media
 from main.models import User, Workspace, Post, Reminder
+from main.outbound_http import get_http_stats
+from main.post_calendar import CalendarParamSerializer, calendar_page
+from main.post_seeding import FakePostGenerator
+from main.reminder_timer import notify_reminder_changed, notify_reminder_saved
 from main.serializers.post_serializer import PostSerializer
 from main.serializers.reminder_serializer import ReminderSerializer
 from main.serializers.user_serializer import UserSerializer
+from main.serializers.values_serializer import (
+    PostValuesSerializer,
+    ReminderValuesSerializer,
+)
 from main.serializers.workspace_serializer import WorkspaceSerializer
+from main.session_history import get_history_metrics
+from main.workspace_roster import bump_roster_version
+
+
+def is_workspace_member(user, workspace_id) -> bool:
+    return user.workspaces.filter(id=workspace_id).exists()
 
 
 # Create your views here.
@@ -46,7 +70,9 @@ class RegisterView(APIView):
         token, _ = Token.objects.get_or_create(user=user)
         user_serializer = UserSerializer(user)
 
-        return Response({"user": user_serializer.data, "token": token.key})
+        return set_media_cookie(
+            Response({"user": user_serializer.data, "token": token.key}), token.key
+        )
 
 
 class LoginView(APIView):
@@ -61,7 +87,9 @@ class LoginView(APIView):
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data["email"]
 
-        user = User.objects.filter(email=email).first()
+        user = UserSerializer.setup_eager_loading(
+            User.objects.filter(email=email)
+        ).first()
         if user is None:
             raise serializers.ValidationError(
                 {"email": "Email does not exist", "code": "email_not_found"}
@@ -75,18 +103,61 @@ class LoginView(APIView):
         token, _ = Token.objects.get_or_create(user=user)
         user_serializer = UserSerializer(user)
 
-        return Response({"user": user_serializer.data, "token": token.key})
+        return set_media_cookie(
+            Response({"user": user_serializer.data, "token": token.key}), token.key
+        )
+
+
+class PoolStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "database": get_database_stats(),
+                "http": get_http_stats(),
+                "history": get_history_metrics(),
+            }
+        )
+
+
+class MediaView(APIView):
+    # The cookie lets browsers load media straight from <img src>.
+    authentication_classes = [CachedTokenAuthentication, MediaCookieAuthentication]
+
+    def get(self, request, name):
+        if not can_access(request.user, name):
+            raise NotFound()
+        try:
+            return serve_media(request, name)
+        except FileNotFoundError:
+            raise NotFound()
+
+
+class LogoutView(APIView):
+    def post(self, request):
+        # Deleting the token also evicts it from the authentication cache.
+        Token.objects.filter(user=request.user).delete()
+        return delete_media_cookie(Response(status=status.HTTP_204_NO_CONTENT))
 
 
 class UserViewset(viewsets.ModelViewSet):
     serializer_class = UserSerializer
 
     def get_queryset(self):
-        return User.objects.filter(id=self.request.user.id)
+        return UserSerializer.setup_eager_loading(
+            User.objects.filter(id=self.request.user.id)
+        )
 
     def get_object(self):
         return self.request.user
 
+    def perform_update(self, serializer):
+        old_role, old_email = serializer.instance.role, serializer.instance.email
+        user = serializer.save()
+        if (user.role, user.email) != (old_role, old_email):
+            bump_roster_version(user.workspaces.values_list("id", flat=True))
+
 
 class WorkspaceViewSet(viewsets.ModelViewSet):
     serializer_class = WorkspaceSerializer
@@ -96,9 +167,9 @@ class WorkspaceViewSet(viewsets.ModelViewSet):
         email = serializers.EmailField()
 
     def get_queryset(self):
-        return Workspace.objects.filter(
-            members__in=[self.request.user]
-        ).prefetch_related("members")
+        return WorkspaceSerializer.setup_eager_loading(
+            Workspace.objects.filter(members__in=[self.request.user])
+        )
 
     def check_object_permissions(self, request, obj):
         super().check_object_permissions(request, obj)
@@ -132,6 +203,8 @@ class WorkspaceViewSet(viewsets.ModelViewSet):
             )
 
         workspace.members.add(user)
+        bump_roster_version([workspace.id])
+        workspace = self.get_queryset().get(id=workspace.id)
 
         return Response(self.serializer_class(workspace).data)
 
@@ -142,8 +215,34 @@ class PostViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         workspace_id = self.kwargs["workspace_id"]
-        return Post.objects.filter(
-            workspace__members__in=[self.request.user], workspace_id=workspace_id
+        if not is_workspace_member(self.request.user, workspace_id):
+            return Post.objects.none()
+        return Post.objects.filter(workspace_id=workspace_id)
+
+    def perform_create(self, serializer):
+        enqueue_image_variants(serializer.save())
+
+    def perform_update(self, serializer):
+        if "post_image" not in serializer.validated_data:
+            serializer.save()
+            return
+        # The old variants belong to the replaced image.
+        enqueue_image_variants(serializer.save(image_variants={}))
+
+    def calendar(self, request, workspace_id):
+        if not is_workspace_member(request.user, workspace_id):
+            raise NotFound()
+        params = CalendarParamSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        posts, next_cursor = calendar_page(
+            workspace_id, params.validated_data, context=self.get_serializer_context()
+        )
+        return Response({"results": posts, "next_cursor": next_cursor})
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(
+            PostValuesSerializer(queryset, context=self.get_serializer_context()).data
         )
 
 
@@ -152,9 +251,12 @@ class GeneratePostsView(APIView):
         custom_instructions = serializers.CharField(
             allow_null=True, allow_blank=True, required=False
         )
-        range_start = serializers.DateTimeField(default=datetime.now)
+        range_start = serializers.DateTimeField(default=timezone.now)
         range_end = serializers.DateTimeField(
-            default=lambda: datetime.now() + timedelta(days=7)
+            default=lambda: timezone.now() + timedelta(days=7)
+        )
+        count = serializers.IntegerField(
+            default=5, min_value=1, max_value=settings.FAKE_POSTS_MAX_COUNT
         )
 
     def post(self, request, workspace_id):
@@ -163,13 +265,13 @@ class GeneratePostsView(APIView):
         serializers.is_valid(raise_exception=True)
         data = serializers.validated_data
         logger.info(data)
-        posts = []
-        f = faker.Faker()
-        for i in range(5):
-            post = Post(workspace=workspace, creator=request.user)
-            generate_post(f, post)
-            post.save()
-            posts.append(post)
+        generator = FakePostGenerator(
+            workspace,
+            request.user,
+            range_start=data["range_start"],
+            range_end=data["range_end"],
+        )
+        posts = generator.generate(data["count"])
         return Response(
             PostSerializer(posts, context=self.get_serializer_context(), many=True).data
         )
@@ -197,29 +299,11 @@ class RegeneratePost(APIView):
         serializer = self.Serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        f = faker.Faker()
-        generate_post(f, post)
+        FakePostGenerator(post.workspace, request.user).fill(post)
         post.save()
         return Response(PostSerializer(post, context={"request": request}).data)
 
 
-def generate_post(f, post):
-    image = requests.get(
-        f"https://picsum.photos/1080/720?random={f.pyint(max_value=20)}"
-    ).content
-    description = f.text(50)
-    text = f.text(50)
-    schedule_datetime = f.date_time_between(
-        datetime.now(), datetime.now() + timedelta(days=7)
-    )
-    assignee = f.random_element(post.workspace.members.all())
-    post.description = description
-    post.schedule_time = schedule_datetime
-    post.post_image = ContentFile(image, f"{f.pystr(min_chars=5, max_chars=10)}.jpg")
-    post.post_text = text
-    post.assignee = assignee
-
-
 class ReminderViewSet(viewsets.ModelViewSet):
     serializer_class = ReminderSerializer
     lookup_url_kwarg = "reminder_id"
@@ -227,6 +311,14 @@ class ReminderViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Reminder.objects.filter(post__workspace__members__in=[self.request.user])
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(
+            ReminderValuesSerializer(
+                queryset, context=self.get_serializer_context()
+            ).data
+        )
+
     def check_object_permissions(self, request, obj: Reminder):
         super().check_object_permissions(request, obj)
         if self.action in ["update", "partial_update", "destroy"]:
@@ -239,3 +331,16 @@ class ReminderViewSet(viewsets.ModelViewSet):
         request.data["creator"] = request.user.id
         request.data["post"] = kwargs["post_id"]
         return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        notify_reminder_saved(serializer.instance)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        notify_reminder_saved(serializer.instance)
+
+    def perform_destroy(self, instance):
+        reminder_id = instance.id
+        super().perform_destroy(instance)
+        notify_reminder_changed(reminder_id, None)
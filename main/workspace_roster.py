@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.db.models import F
+
+from main.lru_cache import LRUCache
+from main.models import Workspace
+
+# Keyed by (workspace_id, roster_version, kind). Bumping the roster version
+# makes old entries unreachable; they are also evicted eagerly below.
+system_instruction_cache = LRUCache(settings.GENERATION_MODEL_CACHE_SIZE)
+model_cache = LRUCache(settings.GENERATION_MODEL_CACHE_SIZE)
+
+
+def roster_key(workspace: Workspace, kind: str):
+    return workspace.id, workspace.roster_version, kind
+
+
+def get_roster(workspace: Workspace) -> list[dict]:
+    return list(workspace.members.all().values("id", "email", "role"))
+
+
+def bump_roster_version(workspace_ids):
+    workspace_ids = set(workspace_ids)
+    if not workspace_ids:
+        return
+    Workspace.objects.filter(id__in=workspace_ids).update(
+        roster_version=F("roster_version") + 1
+    )
+
+    def is_stale(key):
+        return key[0] in workspace_ids
+
+    system_instruction_cache.remove_where(is_stale)
+    model_cache.remove_where(is_stale)